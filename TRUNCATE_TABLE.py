@@ -22,6 +22,8 @@ def change_field_type():
 
 
 def truncate_table():
+    # For removing old seen_properties rows, drop or detach whole months instead:
+    # backend/partition_maintenance.py (drop --before YYYY-MM).
     database_url = os.getenv("DATABASE_URL")
     table_name = os.getenv("TABLENAME")
 
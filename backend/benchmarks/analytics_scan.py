@@ -0,0 +1,188 @@
+"""
+Benchmark for /seen_properties/analytics on a large seen_properties table.
+
+Seeds one owner with --rows matches (1,000,000 by default, plus a share of
+rows for other owners) in a Postgres database, then times three ways of
+producing the analytics payload and counts the SQL statements each issues:
+
+    legacy        the original endpoint: 8 ORM counts + 4 raw aggregates,
+                  each scanning the owner's rows
+    single_scan   rebuilding the owner's owner_stats rollup, a single
+                  GROUPING SETS pass over the owner's rows (the cold path)
+    rollup_read   the current endpoint with the rollup in place (the warm path)
+
+Examples:
+    python backend/benchmarks/analytics_scan.py --db-url postgresql://localhost/rect_bench
+    python backend/benchmarks/analytics_scan.py --db-url ... --rows 200000 --repeats 3 --with-index
+
+WARNING: the benchmark deletes and reseeds seen_properties and owner_stats in
+the target database. Only point --db-url at a disposable database.
+"""
+import argparse
+import contextlib
+import json
+import os
+import statistics
+import sys
+import time
+import types
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The pre-rollup endpoint, statement for statement.
+LEGACY_QUERIES = [
+    "SELECT count(*) FROM seen_properties WHERE crm_owner_id = :user_id",
+    "SELECT count(*) FROM seen_properties WHERE crm_owner_id = :user_id AND created_at >= NOW() - INTERVAL '7 days'",
+    "SELECT count(*) FROM seen_properties WHERE crm_owner_id = :user_id AND created_at >= NOW() - INTERVAL '30 days'",
+    "SELECT count(*) FROM seen_properties WHERE crm_owner_id = :user_id AND created_at >= NOW() - INTERVAL '90 days'",
+    "SELECT count(*) FROM seen_properties WHERE crm_owner_id = :user_id AND contract_date IS NOT NULL",
+    """SELECT count(*) FROM seen_properties WHERE crm_owner_id = :user_id
+       AND contract_date IS NOT NULL AND contract_date >= NOW() - INTERVAL '30 days'""",
+    """SELECT count(*) FROM seen_properties WHERE crm_owner_id = :user_id
+       AND contract_date IS NOT NULL AND contract_date >= NOW() - INTERVAL '60 days'""",
+    """SELECT state, COUNT(*) as count, COUNT(DISTINCT county) as unique_counties,
+              AVG(EXTRACT(DAY FROM (NOW() - created_at))) as avg_days_in_system,
+              COUNT(CASE WHEN contract_date IS NOT NULL THEN 1 END) as properties_with_contracts,
+              AVG(CASE WHEN contract_date IS NOT NULL THEN EXTRACT(DAY FROM (NOW() - contract_date)) END)
+                  as avg_contract_days_old
+       FROM seen_properties WHERE crm_owner_id = :user_id AND state IS NOT NULL
+       GROUP BY state ORDER BY count DESC""",
+    """SELECT county, state, COUNT(*) as count,
+              COUNT(CASE WHEN contract_date IS NOT NULL THEN 1 END) as properties_with_contracts
+       FROM seen_properties WHERE crm_owner_id = :user_id AND county IS NOT NULL
+       GROUP BY county, state ORDER BY count DESC LIMIT 10""",
+    """SELECT DATE_TRUNC('month', created_at) as month, COUNT(*) as count
+       FROM seen_properties WHERE crm_owner_id = :user_id AND created_at >= NOW() - INTERVAL '6 months'
+       GROUP BY DATE_TRUNC('month', created_at) ORDER BY month DESC""",
+    """SELECT CASE
+                WHEN contract_date IS NULL THEN 'No Contract Date'
+                WHEN contract_date >= NOW() - INTERVAL '30 days' THEN 'Last 30 Days'
+                WHEN contract_date >= NOW() - INTERVAL '60 days' THEN '31-60 Days'
+                WHEN contract_date >= NOW() - INTERVAL '90 days' THEN '61-90 Days'
+                ELSE 'Over 90 Days'
+              END as age_group, COUNT(*) as count
+       FROM seen_properties WHERE crm_owner_id = :user_id
+       GROUP BY 1 ORDER BY count DESC""",
+    "SELECT count(*) FROM seen_properties WHERE crm_owner_id = :user_id AND contact_email IS NOT NULL",
+]
+
+SEED_SQL = """
+    INSERT INTO seen_properties (crm_owner_id, property_id, owner_name, street_address, county, state,
+                                 contact_email, contract_date, match_percentage, match_field, created_at)
+    SELECT :owner_id,
+           'P' || :owner_id || '-' || g,
+           'OWNER ' || g,
+           g || ' MAIN ST',
+           'COUNTY ' || (g % 40),
+           (ARRAY['TX', 'CA', 'FL', 'NY', 'GA', 'AZ'])[1 + g % 6],
+           CASE WHEN g % 3 = 0 THEN NULL ELSE 'contact' || g || '@example.com' END,
+           CASE WHEN g % 2 = 0 THEN NULL ELSE NOW() - (g % 400) * INTERVAL '1 day' END,
+           70 + g % 31,
+           'Owner',
+           NOW() - (g % 720) * INTERVAL '1 day' - (g % 86400) * INTERVAL '1 second'
+    FROM generate_series(1, :rows) AS g
+"""
+
+
+class QueryCounter:
+    def __init__(self, engine, event):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+
+def timed(fn, counter, repeats):
+    timings, queries = [], []
+    for _ in range(repeats):
+        counter.count = 0
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+        queries.append(counter.count)
+    return {
+        "queries": max(queries),
+        "best_s": round(min(timings), 4),
+        "median_s": round(statistics.median(timings), 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark /seen_properties/analytics on a large table.")
+    parser.add_argument("--db-url", default=os.getenv("BENCH_DATABASE_URL"), help="Disposable Postgres database URL")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Matches seeded for the benchmarked owner")
+    parser.add_argument("--other-owners", type=int, default=4, help="Other owners seeded with --rows/4 matches each")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed runs per variant")
+    parser.add_argument("--with-index", action="store_true", help="Create an index on seen_properties(crm_owner_id)")
+    parser.add_argument("--skip-seed", action="store_true", help="Reuse the rows from a previous run")
+    parser.add_argument("--output", default=None, help="Write the JSON report to this file instead of stdout")
+    args = parser.parse_args()
+
+    if not args.db_url or not args.db_url.startswith("postgresql"):
+        parser.error("--db-url (or BENCH_DATABASE_URL) must point at a disposable Postgres database")
+
+    os.environ["DATABASE_URL"] = args.db_url
+    os.chdir(BACKEND_DIR)
+    sys.path.insert(0, BACKEND_DIR)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        import main as backend
+    from sqlalchemy import event, text
+
+    owner_id = 1
+    with backend.SessionLocal() as db:
+        if not args.skip_seed:
+            started = time.perf_counter()
+            db.execute(text("DELETE FROM owner_stats"))
+            db.execute(text("DELETE FROM seen_properties"))
+            db.execute(text(SEED_SQL), {"owner_id": owner_id, "rows": args.rows})
+            for other in range(args.other_owners):
+                db.execute(text(SEED_SQL), {"owner_id": owner_id + 1 + other, "rows": args.rows // 4})
+            if args.with_index:
+                db.execute(text("CREATE INDEX IF NOT EXISTS bench_seen_properties_owner ON seen_properties (crm_owner_id)"))
+            # Seeded months older than the existing partitions land in the default one.
+            backend.partitions.ensure_partitions(db.connection())
+            db.commit()
+            db.execute(text("ANALYZE seen_properties"))
+            db.commit()
+            print(f"Seeded {args.rows + args.other_owners * (args.rows // 4)} rows "
+                  f"in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+        seeded = db.execute(text("SELECT count(*) FROM seen_properties WHERE crm_owner_id = :id"),
+                            {"id": owner_id}).scalar()
+
+    counter = QueryCounter(backend.engine, event)
+    user = types.SimpleNamespace(id=owner_id)
+    results = {}
+
+    with backend.SessionLocal() as db:
+        def legacy():
+            for sql in LEGACY_QUERIES:
+                db.execute(text(sql), {"user_id": owner_id}).fetchall()
+        results["legacy"] = timed(legacy, counter, args.repeats)
+
+        results["single_scan"] = timed(lambda: backend.rebuild_owner_stats(db, owner_id), counter, args.repeats)
+
+        no_headers = types.SimpleNamespace(headers={})
+        def rollup_read():
+            backend.detailed_analytics(db, no_headers, types.SimpleNamespace(headers={}), user)
+        results["rollup_read"] = timed(rollup_read, counter, args.repeats)
+
+        rollup_rows = db.execute(text("SELECT count(*) FROM owner_stats WHERE crm_owner_id = :id"),
+                                 {"id": owner_id}).scalar()
+
+    report = {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "owner_rows": seeded,
+        "rollup_rows": rollup_rows,
+        "with_index": args.with_index,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
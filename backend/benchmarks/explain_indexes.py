@@ -0,0 +1,202 @@
+"""
+EXPLAIN check for the seen_properties indexes (migrations 0001 and 0002) and
+monthly partitions (migration 0005).
+
+Seeds a disposable Postgres database, then EXPLAINs the queries behind the
+dashboard endpoints and reports which plan nodes touch seen_properties. Each
+query is explained twice: with the indexes dropped inside a transaction that
+is rolled back afterwards (the "before" plan), and with the indexes in place.
+Exits with status 1 if any query still plans a sequential scan on
+seen_properties (or a non-empty partition of it) with the indexes present,
+or, when the table is partitioned, if the 30-day created_at window reads a
+partition that ends before the window starts.
+
+Examples:
+    python backend/benchmarks/explain_indexes.py --db-url postgresql://localhost/rect_bench
+    python backend/benchmarks/explain_indexes.py --db-url ... --migrate --rows 500000
+
+WARNING: the script deletes and reseeds seen_properties in the target
+database. Only point --db-url at a disposable database.
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+INDEXES = (
+    "ix_seen_properties_owner_contract_created_id",
+    "ix_seen_properties_owner_created",
+)
+# (crm_owner_id, property_id): unique on a plain table, non-unique once partitioned.
+PROPERTY_INDEXES = ("uq_seen_properties_owner_property", "ix_seen_properties_owner_property")
+WINDOW_DAYS = 30
+
+# (endpoint, query) pairs mirroring the SQL the endpoints issue.
+CHECKS = [
+    ("/seen_properties/paginated", """
+        SELECT * FROM seen_properties WHERE crm_owner_id = :owner_id
+        ORDER BY contract_date DESC NULLS LAST, created_at DESC, id DESC LIMIT 20 OFFSET 40
+    """),
+    ("/seen_properties/paginated?cursor= dated", """
+        SELECT * FROM seen_properties WHERE crm_owner_id = :owner_id AND contract_date IS NOT NULL
+          AND (contract_date, created_at, id) < (NOW() - INTERVAL '200 days', NOW(), 2147483647)
+        ORDER BY contract_date DESC, created_at DESC, id DESC LIMIT 21
+    """),
+    ("/seen_properties/paginated?cursor= undated", """
+        SELECT * FROM seen_properties WHERE crm_owner_id = :owner_id AND contract_date IS NULL
+          AND (created_at, id) < (NOW() - INTERVAL '300 days', 2147483647)
+        ORDER BY created_at DESC, id DESC LIMIT 21
+    """),
+    ("/user/activity-summary recent", """
+        SELECT * FROM seen_properties WHERE crm_owner_id = :owner_id
+        ORDER BY contract_date DESC NULLS LAST, created_at DESC LIMIT 5
+    """),
+    ("/user/activity-summary last activity", """
+        SELECT created_at FROM seen_properties WHERE crm_owner_id = :owner_id
+        ORDER BY created_at DESC LIMIT 1
+    """),
+    ("/seen_properties", """
+        SELECT * FROM seen_properties WHERE crm_owner_id = :owner_id ORDER BY created_at DESC
+    """),
+    ("created_at window", f"""
+        SELECT count(*) FROM seen_properties
+        WHERE crm_owner_id = :owner_id AND created_at >= NOW() - INTERVAL '{WINDOW_DAYS} days'
+    """),
+    ("owner count", "SELECT count(*) FROM seen_properties WHERE crm_owner_id = :owner_id"),
+    ("property lookup", """
+        SELECT id FROM seen_properties WHERE crm_owner_id = :owner_id AND property_id = :property_id
+    """),
+]
+
+SEED_SQL = """
+    INSERT INTO seen_properties (crm_owner_id, property_id, county, state, contract_date, match_percentage, created_at)
+    SELECT 1 + g % :owners,
+           'P' || g,
+           'COUNTY ' || (g % 40),
+           (ARRAY['TX', 'CA', 'FL', 'NY'])[1 + g % 4],
+           CASE WHEN g % 2 = 0 THEN NULL ELSE NOW() - (g % 400) * INTERVAL '1 day' END,
+           70 + g % 31,
+           NOW() - (g % 720) * INTERVAL '1 day'
+    FROM generate_series(1, :rows) AS g
+"""
+
+
+def plan_nodes(plan):
+    """Yield every node of an EXPLAIN (FORMAT JSON) plan tree."""
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def is_seen_properties(relation):
+    """seen_properties itself or one of its partitions (seen_properties_p2026_10, seen_properties_default)."""
+    return relation == "seen_properties" or (relation or "").startswith("seen_properties_")
+
+
+def seen_properties_access(db, text, sql, params, indexes):
+    """(node type, relation, index) of each plan node that reads seen_properties or one of its partitions."""
+    plan = db.execute(text("EXPLAIN (FORMAT JSON) " + sql), params).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return [
+        (node["Node Type"], node.get("Relation Name"), node.get("Index Name"))
+        for node in plan_nodes(plan[0]["Plan"])
+        if is_seen_properties(node.get("Relation Name")) or node.get("Index Name") in indexes
+    ]
+
+
+def describe(access):
+    return [node_type + (f" using {index}" if index else f" on {relation}" if relation else "")
+            for node_type, relation, index in access]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EXPLAIN check for the seen_properties indexes.")
+    parser.add_argument("--db-url", default=os.getenv("BENCH_DATABASE_URL"), help="Disposable Postgres database URL")
+    parser.add_argument("--rows", type=int, default=300_000, help="Rows to seed")
+    parser.add_argument("--owners", type=int, default=50, help="Owners the rows are spread over")
+    parser.add_argument("--migrate", action="store_true", help="Run `alembic upgrade head` before checking")
+    parser.add_argument("--skip-seed", action="store_true", help="Reuse the rows already in the table")
+    args = parser.parse_args()
+
+    if not args.db_url or not args.db_url.startswith("postgresql"):
+        parser.error("--db-url (or BENCH_DATABASE_URL) must point at a disposable Postgres database")
+
+    os.environ["DATABASE_URL"] = args.db_url
+    os.chdir(BACKEND_DIR)
+    sys.path.insert(0, BACKEND_DIR)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        import main as backend
+    from sqlalchemy import text
+
+    if args.migrate:
+        from alembic import command
+        from alembic.config import Config
+        command.upgrade(Config(os.path.join(BACKEND_DIR, "alembic.ini")), "head")
+
+    with backend.engine.connect() as db:
+        if not args.skip_seed:
+            db.execute(text("DELETE FROM owner_stats"))
+            db.execute(text("DELETE FROM seen_properties"))
+            db.execute(text(SEED_SQL), {"rows": args.rows, "owners": args.owners})
+            # Seeded months older than the existing partitions land in the default one.
+            backend.partitions.ensure_partitions(db)
+            db.commit()
+        db.execute(text("ANALYZE seen_properties"))
+        db.commit()
+
+        partitioned = backend.partitions.is_partitioned(db)
+        indexes = INDEXES + (PROPERTY_INDEXES[1] if partitioned else PROPERTY_INDEXES[0],)
+        missing = [
+            name for name in indexes
+            if not db.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar()
+        ]
+        if missing:
+            print(f"Missing indexes (run the migration or pass --migrate): {', '.join(missing)}", file=sys.stderr)
+            sys.exit(1)
+
+        db.commit()
+
+        params = {"owner_id": 1, "property_id": f"P{args.owners}"}
+        before = {}
+        # DDL is transactional in Postgres: drop the indexes, plan, and roll the drop back.
+        for name in indexes:
+            db.execute(text(f"DROP INDEX {name}"))
+        for label, sql in CHECKS:
+            before[label] = describe(seen_properties_access(db, text, sql, params, indexes))
+        db.rollback()
+
+        # Empty partitions (months ahead, the default partition) are scanned for free.
+        empty = set(db.execute(text(
+            "SELECT relname FROM pg_class WHERE relname LIKE 'seen\\_properties%' AND reltuples <= 0"
+        )).scalars())
+        window_start = (datetime.now() - timedelta(days=WINDOW_DAYS)).date()
+        outside_window = {partition["name"] for partition in backend.partitions.attached_partitions(db)
+                          if partition["end"] <= window_start}
+
+        results, failures = [], []
+        for label, sql in CHECKS:
+            access = seen_properties_access(db, text, sql, params, indexes)
+            relations = {relation for _, relation, _ in access if relation}
+            result = {"query": label, "without_indexes": before[label], "with_indexes": describe(access)}
+            if partitioned:
+                result["partitions_read"] = len(relations)
+            results.append(result)
+            if any(node_type == "Seq Scan" and relation not in empty for node_type, relation, _ in access):
+                failures.append(label)
+            elif label == "created_at window" and relations & outside_window:
+                failures.append(label + " (not pruned)")
+
+    print(json.dumps({"rows": args.rows, "owners": args.owners, "partitioned": partitioned,
+                      "results": results}, indent=2))
+    if failures:
+        print("Sequential scans or unpruned partitions for: " + ", ".join(failures), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""
+Concurrent load test of the dashboard read endpoints, sync vs async database path.
+
+Seeds --owners agents with --rows matches each in a disposable Postgres
+database, then for each mode starts `uvicorn main:app` (with ASYNC_DB=0 and
+ASYNC_DB=1) and drives it with --concurrency simultaneous clients for
+--duration seconds. Each client loops over the endpoints an agent dashboard
+loads (stats, analytics, a page of matches, the activity summary) as a
+randomly chosen agent. Reports throughput, latency percentiles and errors
+per mode.
+
+Examples:
+    python backend/benchmarks/load_test.py --db-url postgresql://localhost/rect_bench
+    python backend/benchmarks/load_test.py --db-url ... --concurrency 200 --duration 30 --modes async
+
+WARNING: the script deletes and reseeds crm_owners, seen_properties and
+owner_stats in the target database. Only point --db-url at a disposable
+database.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ENDPOINTS = [
+    "/seen_properties/stats",
+    "/seen_properties/analytics",
+    "/seen_properties/paginated?page=1&page_size=20",
+    "/user/activity-summary",
+]
+
+SEED_OWNERS_SQL = """
+    INSERT INTO crm_owners (id, name, email, token, companycode, password, states_counties)
+    SELECT g, 'Agent ' || g, 'agent' || g || '@example.com', 'token', 'BENCH', 'x', '[]'
+    FROM generate_series(1, :owners) AS g
+"""
+
+SEED_ROWS_SQL = """
+    INSERT INTO seen_properties (crm_owner_id, property_id, county, state, contact_email,
+                                 contract_date, match_percentage, created_at)
+    SELECT o, 'P' || o || '-' || g,
+           'COUNTY ' || (g % 40),
+           (ARRAY['TX', 'CA', 'FL', 'NY'])[1 + g % 4],
+           CASE WHEN g % 3 = 0 THEN NULL ELSE 'contact' || g || '@example.com' END,
+           CASE WHEN g % 2 = 0 THEN NULL ELSE NOW() - (g % 400) * INTERVAL '1 day' END,
+           70 + g % 31,
+           NOW() - (g % 720) * INTERVAL '1 day'
+    FROM generate_series(1, :owners) AS o, generate_series(1, :rows) AS g
+"""
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+async def drive(base_url, tokens, concurrency, duration):
+    import httpx
+
+    latencies, errors = [], {}
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        async def worker():
+            while time.perf_counter() < deadline:
+                headers = {"Authorization": f"Bearer {random.choice(tokens)}"}
+                for path in ENDPOINTS:
+                    started = time.perf_counter()
+                    try:
+                        response = await client.get(path, headers=headers)
+                        if response.status_code != 200:
+                            errors[response.status_code] = errors.get(response.status_code, 0) + 1
+                            continue
+                    except httpx.HTTPError as e:
+                        errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+                        continue
+                    latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "requests": len(latencies),
+        "requests_per_s": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 1) if latencies else None,
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1) if latencies else None,
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1) if latencies else None,
+        "errors": errors,
+    }
+
+
+def wait_until_up(base_url, process, timeout=60):
+    import httpx
+
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("uvicorn exited during startup")
+        try:
+            if httpx.get(base_url + "/health", timeout=2).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError("uvicorn did not start in time")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the dashboard endpoints, sync vs async DB path.")
+    parser.add_argument("--db-url", default=os.getenv("BENCH_DATABASE_URL"), help="Disposable Postgres database URL")
+    parser.add_argument("--owners", type=int, default=50, help="Agents to seed")
+    parser.add_argument("--rows", type=int, default=2000, help="Matches seeded per agent")
+    parser.add_argument("--concurrency", type=int, default=100, help="Simultaneous clients")
+    parser.add_argument("--duration", type=float, default=20, help="Seconds per mode")
+    parser.add_argument("--modes", default="sync,async", help="Comma-separated: sync, async")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--skip-seed", action="store_true", help="Reuse the rows from a previous run")
+    parser.add_argument("--output", default=None, help="Write the JSON report to this file instead of stdout")
+    args = parser.parse_args()
+
+    if not args.db_url or not args.db_url.startswith("postgresql"):
+        parser.error("--db-url (or BENCH_DATABASE_URL) must point at a disposable Postgres database")
+
+    os.environ["DATABASE_URL"] = args.db_url
+    os.environ.setdefault("PASSWORD_POOL_SIZE", "0")
+    os.chdir(BACKEND_DIR)
+    sys.path.insert(0, BACKEND_DIR)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        import main as backend
+    from sqlalchemy import text
+
+    if not args.skip_seed:
+        started = time.perf_counter()
+        with backend.engine.begin() as db:
+            db.execute(text("DELETE FROM owner_stats"))
+            db.execute(text("DELETE FROM seen_properties"))
+            db.execute(text("DELETE FROM crm_owners"))
+            db.execute(text(SEED_OWNERS_SQL), {"owners": args.owners})
+            db.execute(text(SEED_ROWS_SQL), {"owners": args.owners, "rows": args.rows})
+            db.execute(text("SELECT setval(pg_get_serial_sequence('crm_owners', 'id'), :owners)"),
+                       {"owners": args.owners})
+            # Seeded months older than the existing partitions land in the default one.
+            backend.partitions.ensure_partitions(db)
+        with backend.engine.connect() as db:
+            db.execute(text("ANALYZE"))
+        print(f"Seeded {args.owners} agents x {args.rows} matches in {time.perf_counter() - started:.1f}s",
+              file=sys.stderr)
+
+    tokens = [backend.create_access_token(data={"user_id": owner_id}) for owner_id in range(1, args.owners + 1)]
+    base_url = f"http://127.0.0.1:{args.port}"
+    results = {}
+
+    for mode in args.modes.split(","):
+        env = dict(os.environ, ASYNC_DB="1" if mode == "async" else "0")
+        process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--port", str(args.port), "--log-level", "warning"],
+            cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL,
+        )
+        try:
+            wait_until_up(base_url, process)
+            # Warm-up: build every agent's rollup so both modes measure the same warm path.
+            asyncio.run(drive(base_url, tokens, min(args.concurrency, 10), 2))
+            results[mode] = asyncio.run(drive(base_url, tokens, args.concurrency, args.duration))
+            print(f"{mode}: {results[mode]}", file=sys.stderr)
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+
+    report = {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "owners": args.owners,
+        "rows_per_owner": args.rows,
+        "concurrency": args.concurrency,
+        "duration_s": args.duration,
+        "endpoints": ENDPOINTS,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Latency check for /seen_properties/search (migration 0004).
+
+Seeds --rows matches spread over --owners agents with generated owner names,
+seller names and street addresses in a Postgres database that has pg_trgm,
+then times search_seen_properties() for terms from very selective (one
+seller's surname) to very common (a street word most rows contain) and
+reports latency percentiles and the plan used for each. Exits with status 1
+if any term's p95 exceeds --target-ms.
+
+Examples:
+    python backend/benchmarks/search_latency.py --db-url postgresql://localhost/rect_bench --migrate
+    python backend/benchmarks/search_latency.py --db-url ... --rows 5000000 --owners 20 --skip-seed
+
+WARNING: the script deletes and reseeds seen_properties in the target
+database. Only point --db-url at a disposable database.
+"""
+import argparse
+import contextlib
+import json
+import os
+import statistics
+import sys
+import time
+import types
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SEED_SQL = """
+    INSERT INTO seen_properties (crm_owner_id, property_id, owner_name, seller_name, street_address,
+                                 county, state, created_at)
+    SELECT 1 + g % :owners,
+           'P' || g,
+           (ARRAY['JOHNSON', 'GARCIA', 'NGUYEN', 'PATEL', 'OKAFOR'])[1 + (g / :owners) % 5] || ' ' || md5(g::text)::varchar(8),
+           (ARRAY['SMITH', 'BROWN', 'MILLER', 'DAVIS', 'LOPEZ'])[1 + (g / :owners) % 5] || ' ' || md5((g + 1)::text)::varchar(8),
+           (g % 9999) || ' ' || (ARRAY['MAIN', 'OAK', 'PINE', 'CEDAR', 'ELM'])[1 + (g / :owners) % 5] || ' ' ||
+               (ARRAY['ST', 'AVE', 'RD', 'DR'])[1 + (g / :owners) % 4] || ', AUSTIN TX',
+           'COUNTY ' || (g % 40),
+           (ARRAY['TX', 'CA', 'FL', 'NY'])[1 + g % 4],
+           NOW() - (g % 720) * INTERVAL '1 day'
+    FROM generate_series(1, :rows) AS g
+"""
+
+
+def plan_summary(db, text, backend, user, term, limit):
+    plan = db.execute(
+        text("EXPLAIN (FORMAT JSON) SELECT id FROM seen_properties WHERE crm_owner_id = :owner_id AND "
+             f"{backend.SEEN_PROPERTY_SEARCH_SQL} ILIKE :pattern ORDER BY created_at DESC, id DESC LIMIT :limit"),
+        {"owner_id": user.id, "pattern": backend.contains_pattern(term), "limit": limit},
+    ).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    nodes, stack = [], [plan[0]["Plan"]]
+    while stack:
+        node = stack.pop()
+        nodes.append(node["Node Type"] + (f" using {node['Index Name']}" if node.get("Index Name") else ""))
+        stack.extend(node.get("Plans", []))
+    return nodes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency check for /seen_properties/search.")
+    parser.add_argument("--db-url", default=os.getenv("BENCH_DATABASE_URL"), help="Disposable Postgres database URL")
+    parser.add_argument("--rows", type=int, default=2_000_000, help="Rows to seed")
+    parser.add_argument("--owners", type=int, default=10, help="Owners the rows are spread over")
+    parser.add_argument("--repeats", type=int, default=20, help="Timed searches per term")
+    parser.add_argument("--limit", type=int, default=20, help="Results per search")
+    parser.add_argument("--target-ms", type=float, default=50, help="Fail if a term's p95 is above this")
+    parser.add_argument("--migrate", action="store_true", help="Run `alembic upgrade head` before checking")
+    parser.add_argument("--skip-seed", action="store_true", help="Reuse the rows already in the table")
+    args = parser.parse_args()
+
+    if not args.db_url or not args.db_url.startswith("postgresql"):
+        parser.error("--db-url (or BENCH_DATABASE_URL) must point at a disposable Postgres database")
+
+    os.environ["DATABASE_URL"] = args.db_url
+    os.environ.setdefault("PASSWORD_POOL_SIZE", "0")
+    os.chdir(BACKEND_DIR)
+    sys.path.insert(0, BACKEND_DIR)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        import main as backend
+    from sqlalchemy import text
+
+    if args.migrate:
+        from alembic import command
+        from alembic.config import Config
+        command.upgrade(Config(os.path.join(BACKEND_DIR, "alembic.ini")), "head")
+
+    with backend.engine.connect() as db:
+        if not db.execute(text("SELECT to_regclass('ix_seen_properties_search_trgm')")).scalar():
+            print("Missing ix_seen_properties_search_trgm (run the migration or pass --migrate)", file=sys.stderr)
+            sys.exit(1)
+        if not args.skip_seed:
+            started = time.perf_counter()
+            db.execute(text("DELETE FROM owner_stats"))
+            db.execute(text("DELETE FROM seen_properties"))
+            db.execute(text(SEED_SQL), {"rows": args.rows, "owners": args.owners})
+            # Seeded months older than the existing partitions land in the default one.
+            backend.partitions.ensure_partitions(db)
+            db.commit()
+            print(f"Seeded {args.rows} rows in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+        db.execute(text("ANALYZE seen_properties"))
+        db.commit()
+        # A seller surname fragment only one row has, and terms of decreasing selectivity.
+        rare = db.execute(text("SELECT substr(seller_name, 7, 6) FROM seen_properties WHERE crm_owner_id = 1 LIMIT 1")).scalar()
+
+    user = types.SimpleNamespace(id=1)
+    terms = {
+        "rare seller fragment": rare,
+        "street number + name": "1234 OAK",
+        "owner surname (1 in 5 rows)": "nguyen",
+        "street word (1 in 5 rows)": "cedar",
+        "very common (every row)": "austin",
+        "no match": "zzzqqq",
+    }
+
+    results, failures = [], []
+    with backend.SessionLocal() as db:
+        for label, term in terms.items():
+            timings, found = [], 0
+            for _ in range(args.repeats):
+                started = time.perf_counter()
+                found = len(backend.search_seen_properties(db, user, term, args.limit)["properties"])
+                timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+            results.append({
+                "term": label,
+                "q": term,
+                "results": found,
+                "p50_ms": round(statistics.median(timings), 2),
+                "p95_ms": round(p95, 2),
+                "max_ms": round(timings[-1], 2),
+                "plan": plan_summary(db, text, backend, user, term, args.limit),
+            })
+            if p95 > args.target_ms:
+                failures.append(label)
+
+    print(json.dumps({"rows": args.rows, "owners": args.owners, "limit": args.limit, "results": results}, indent=2))
+    if failures:
+        print(f"p95 above {args.target_ms}ms for: " + ", ".join(failures), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Benchmark of response serialization and compression for the list endpoints.
+
+Builds --rows seen_properties objects and an /admin/users page of --users
+agents with realistic states_counties assignments, then for each payload
+times:
+
+    stdlib        FastAPI's default path: jsonable_encoder over the ORM objects
+                  or dicts, then JSONResponse's json.dumps
+    orjson        the current path: plain dicts (seen_property_dict) rendered
+                  by ORJSONResponse
+
+and reports the body size uncompressed, gzipped at GZIP_LEVEL and brotli
+compressed at BROTLI_QUALITY, with the time each compression takes.
+
+Examples:
+    python backend/benchmarks/serialization.py
+    python backend/benchmarks/serialization.py --rows 50000 --users 200 --repeats 3
+
+No database is needed: main.py is imported against a throwaway SQLite file
+unless --db-url is given.
+"""
+import argparse
+import contextlib
+import gzip
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def timed(fn, repeats):
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - started)
+    return result, {"best_ms": round(min(timings) * 1000, 2), "median_ms": round(statistics.median(timings) * 1000, 2)}
+
+
+def make_properties(backend, rows):
+    now = datetime.utcnow()
+    return [
+        backend.SeenProperties(
+            id=i, crm_owner_id=1, property_id=f"R{100000 + i}",
+            owner_name=f"OWNER {i} FAMILY TRUST", street_address=f"{i} MAIN ST",
+            county=f"COUNTY {i % 40}", state=("TX", "CA", "FL", "NY")[i % 4],
+            seller_name=f"SELLER {i}", contact_email=f"contact{i}@example.com" if i % 3 else None,
+            contact_first_name="JANE", contact_last_name=f"DOE{i}", contact_middle_name=None,
+            name_variation="Full", contract_date=now - timedelta(days=i % 400) if i % 2 else None,
+            match_percentage=70 + i % 31, match_field="Owner", created_at=now - timedelta(days=i % 720),
+        )
+        for i in range(rows)
+    ]
+
+
+def make_users(users):
+    states_counties = [
+        {"state_FIPS": state, "state_name": f"State {state}",
+         "counties": [{"county_FIPS": county, "county_name": f"County {county}"} for county in range(1, 60)]}
+        for state in range(1, 6)
+    ]
+    return {
+        "users": [
+            {"id": i, "name": f"Agent {i}", "email": f"agent{i}@example.com", "companycode": "BENCH",
+             "states_counties": states_counties, "property_count": 1000 + i, "recent_properties": i,
+             "properties_with_contracts": i // 2, "assigned_states": len(states_counties)}
+            for i in range(users)
+        ],
+        "pagination": {"page": 1, "page_size": users, "total": users, "total_pages": 1,
+                       "has_next": False, "has_prev": False},
+    }
+
+
+def measure(name, stdlib, fast, repeats, backend):
+    import brotli
+
+    stdlib_body, stdlib_timing = timed(stdlib, repeats)
+    body, orjson_timing = timed(fast, repeats)
+    if json.loads(stdlib_body) != json.loads(body):
+        raise AssertionError(f"{name}: orjson and stdlib bodies differ")
+    gzip_body, gzip_timing = timed(lambda: gzip.compress(body, compresslevel=backend.GZIP_LEVEL), repeats)
+    brotli_body, brotli_timing = timed(
+        lambda: brotli.compress(body, mode=brotli.MODE_TEXT, quality=backend.BROTLI_QUALITY), repeats
+    )
+    return {
+        "serialize": {"stdlib": stdlib_timing, "orjson": orjson_timing,
+                      "speedup": round(stdlib_timing["median_ms"] / max(orjson_timing["median_ms"], 0.001), 1)},
+        "bytes": {"stdlib": len(stdlib_body), "orjson": len(body),
+                  "gzip": len(gzip_body), "brotli": len(brotli_body)},
+        "compress": {"gzip": gzip_timing, "brotli": brotli_timing},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JSON serialization and compression of list responses.")
+    parser.add_argument("--db-url", default=None, help="Database for importing main.py (default: temporary SQLite)")
+    parser.add_argument("--rows", type=int, default=10_000, help="Matches in the /seen_properties payload")
+    parser.add_argument("--page-size", type=int, default=100, help="Matches in the /seen_properties/paginated page")
+    parser.add_argument("--users", type=int, default=100, help="Agents in the /admin/users page")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed runs per variant")
+    parser.add_argument("--output", default=None, help="Write the JSON report to this file instead of stdout")
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = args.db_url or f"sqlite:///{os.path.join(tmpdir, 'bench.db')}"
+    os.environ.setdefault("PASSWORD_POOL_SIZE", "0")
+    os.chdir(BACKEND_DIR)
+    sys.path.insert(0, BACKEND_DIR)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        import main as backend
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse, ORJSONResponse
+
+    properties = make_properties(backend, args.rows)
+    page = properties[:args.page_size]
+    users = make_users(args.users)
+    pagination = {"page": 1, "page_size": args.page_size, "total": args.rows}
+
+    results = {
+        "seen_properties": measure(
+            "seen_properties",
+            lambda: JSONResponse(jsonable_encoder(properties)).body,
+            lambda: b"[" + b",".join(backend.seen_property_json(prop) for prop in properties) + b"]",
+            args.repeats, backend,
+        ),
+        "seen_properties_paginated": measure(
+            "seen_properties_paginated",
+            lambda: JSONResponse(jsonable_encoder({"properties": page, "pagination": pagination})).body,
+            lambda: ORJSONResponse({"properties": [backend.seen_property_dict(prop) for prop in page],
+                                    "pagination": pagination}).body,
+            args.repeats, backend,
+        ),
+        "admin_users": measure(
+            "admin_users",
+            lambda: JSONResponse(jsonable_encoder(users)).body,
+            lambda: ORJSONResponse(users).body,
+            args.repeats, backend,
+        ),
+    }
+
+    report = {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "rows": args.rows,
+        "page_size": args.page_size,
+        "users": args.users,
+        "gzip_level": backend.GZIP_LEVEL,
+        "brotli_quality": backend.BROTLI_QUALITY,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Find and remove duplicate seen_properties rows: more than one row for the
+same (crm_owner_id, property_id).
+
+    python dedupe_seen_properties.py                        report the duplicates
+    python dedupe_seen_properties.py --csv duplicates.csv   ... and write every row that would go
+    python dedupe_seen_properties.py --apply [--csv ...]    delete them
+
+The oldest row (lowest id) of each pair is kept. Migration 0001 (the unique
+index) and the downgrade of 0005 (back to a plain table with that index)
+refuse to run while duplicates exist; review them with this script, run it
+with --apply, then rerun the migration.
+
+--apply deletes the rows the way the delete endpoints do: each deleted row
+gets a seen_property_deletions tombstone, so /seen_properties/delta clients
+drop it and ETags change, and the owner_stats rollup of every affected owner
+is cleared (rebuilt on the next dashboard read, or by
+`owner_stats_maintenance.py backfill`). Either table is skipped if it does
+not exist yet.
+
+Reads DATABASE_URL like the app. Does not import main.py.
+"""
+import argparse
+import csv
+import os
+import sys
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, inspect, pool, text
+
+import partitions
+
+DELETE_BATCH_SIZE = 1000
+
+_DUPLICATES = """
+    SELECT id, crm_owner_id, property_id, created_at, kept_id FROM (
+        SELECT id, crm_owner_id, property_id, created_at,
+               MIN(id) OVER (PARTITION BY crm_owner_id, property_id) AS kept_id
+        FROM seen_properties
+    ) numbered
+    WHERE id <> kept_id
+"""
+
+
+def count_duplicates(connection) -> int:
+    """Rows that duplicate an older row's (crm_owner_id, property_id)."""
+    return connection.execute(text(f"SELECT COUNT(*) FROM ({_DUPLICATES}) duplicates")).scalar()
+
+
+def find_duplicates(connection) -> list:
+    """The duplicate rows, by owner and property, as (id, crm_owner_id, property_id, created_at, kept_id)."""
+    return connection.execute(text(_DUPLICATES + " ORDER BY crm_owner_id, property_id, id")).all()
+
+
+def remove_duplicates(connection, rows) -> int:
+    """
+    Delete the duplicate `rows` (from find_duplicates), leave a tombstone for
+    each and clear the affected owners' rollups. Returns the owners affected.
+    """
+    tables = inspect(connection)
+    owner_ids = sorted({row.crm_owner_id for row in rows})
+    if connection.dialect.name == "postgresql":
+        # In owner order, so concurrent rollup writers cannot deadlock with us.
+        for owner_id in owner_ids:
+            connection.execute(text("SELECT pg_advisory_xact_lock(:ns, :owner_id)"),
+                               {"ns": partitions.OWNER_STATS_LOCK_NAMESPACE, "owner_id": owner_id})
+
+    for start in range(0, len(rows), DELETE_BATCH_SIZE):
+        batch = rows[start:start + DELETE_BATCH_SIZE]
+        connection.execute(text("DELETE FROM seen_properties WHERE id = :id"), [{"id": row.id} for row in batch])
+        if tables.has_table("seen_property_deletions"):
+            connection.execute(
+                text("INSERT INTO seen_property_deletions (crm_owner_id, seen_property_id) VALUES (:owner, :id)"),
+                [{"owner": row.crm_owner_id, "id": row.id} for row in batch],
+            )
+    if tables.has_table("owner_stats"):
+        connection.execute(text("DELETE FROM owner_stats WHERE crm_owner_id = :owner"),
+                           [{"owner": owner_id} for owner_id in owner_ids])
+    return len(owner_ids)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report and remove duplicate (crm_owner_id, property_id) matches.")
+    parser.add_argument("--apply", action="store_true", help="Delete the duplicates (default: only report them)")
+    parser.add_argument("--csv", help="Write every duplicate row to this CSV file")
+    args = parser.parse_args()
+
+    load_dotenv()
+    database_url = os.getenv("DATABASE_URL")
+    if not database_url:
+        raise Exception("DATABASE_URL environment variable not set")
+    engine = create_engine(database_url, poolclass=pool.NullPool)
+
+    with engine.begin() as connection:
+        if not inspect(connection).has_table("seen_properties"):
+            print("No seen_properties table", file=sys.stderr)
+            sys.exit(1)
+        rows = find_duplicates(connection)
+        owners = {}
+        for row in rows:
+            owners[row.crm_owner_id] = owners.get(row.crm_owner_id, 0) + 1
+        if not rows:
+            print("No duplicate (crm_owner_id, property_id) rows")
+            return
+
+        print(f"{len(rows)} duplicate rows across {len(owners)} owners (the oldest row of each is kept)")
+        for owner_id, count in sorted(owners.items(), key=lambda item: -item[1])[:20]:
+            print(f"  owner {owner_id}: {count}")
+        if args.csv:
+            with open(args.csv, "w", newline="") as handle:
+                writer = csv.writer(handle)
+                writer.writerow(["id", "crm_owner_id", "property_id", "created_at", "kept_id"])
+                writer.writerows(rows)
+            print(f"Wrote the {len(rows)} rows to {args.csv}")
+
+        if args.apply:
+            remove_duplicates(connection, rows)
+            print(f"✅ Deleted {len(rows)} duplicate rows; cleared owner_stats for {len(owners)} owners")
+        else:
+            print("Nothing deleted; rerun with --apply to delete them")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,41 @@
 import os
 from typing import List, Optional,Dict, Any
 from datetime import datetime, timedelta
-from fastapi import FastAPI, Depends, Request, HTTPException, status
+from fastapi import FastAPI, Depends, Request, Response, HTTPException, status
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, EmailStr, validator
-from sqlalchemy import create_engine, Column, Integer, String, JSON, text, insert, UniqueConstraint, DateTime, func, Boolean
-from sqlalchemy.orm import sessionmaker, Session, declarative_base
+from fastapi.middleware.gzip import GZipMiddleware
+from brotli_asgi import BrotliMiddleware
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, EmailStr, TypeAdapter, validator
+from sqlalchemy import create_engine, Column, Integer, BigInteger, String, JSON, text, insert, select, and_, or_, tuple_, UniqueConstraint, PrimaryKeyConstraint, Index, DateTime, func, Boolean, DDL, event, literal_column
+from sqlalchemy.orm import sessionmaker, Session, declarative_base, aliased
+from sqlalchemy.exc import DBAPIError
 from dotenv import load_dotenv
-from passlib.context import CryptContext
+from openpyxl import Workbook
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
 import jwt
+import partitions
+import passwords
+from passwords import hash_password, verify_password, check_login, PasswordServiceBusy, TooManyAttempts
 import csv
+import io
+import tempfile
+import calendar
+import json
+import orjson
+import base64
+import binascii
+import gzip
+import hashlib
 from pathlib import Path
 import smtplib
+import queue
+import threading
+import time
+from collections import OrderedDict
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 
@@ -34,16 +55,9 @@ SMTP_SERVER = os.getenv("SMTP_SERVER")
 if not DATABASE_URL:
     raise Exception("DATABASE_URL environment variable not set")
 
-# Password hashing setup
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing runs in a dedicated process pool; see passwords.py
 security = HTTPBearer()
 
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
-
 def create_admin_token(data: dict):
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(hours=JWT_EXPIRATION_HOURS)
@@ -83,6 +97,149 @@ def get_db():
     finally:
         db.close()
 
+# --- Async read path ---
+# The read-heavy dashboard endpoints are `async def` and run their queries
+# through run_read(). With ASYNC_DB enabled they use an asyncpg engine: the
+# endpoint's (sync) query code runs inside AsyncSession.run_sync, so waiting
+# on Postgres does not hold a threadpool thread. Otherwise run_read() falls
+# back to the sync engine on the threadpool, exactly as before.
+ASYNC_DB = os.getenv("ASYNC_DB", "false").lower() in ("1", "true", "yes")
+ASYNC_DB_POOL_SIZE = int(os.getenv("ASYNC_DB_POOL_SIZE", "20"))
+
+def async_database_url(url: str) -> str:
+    """DATABASE_URL with its driver switched to asyncpg."""
+    scheme, rest = url.split("://", 1)
+    if scheme.split("+")[0] not in ("postgres", "postgresql"):
+        raise Exception("ASYNC_DB requires a PostgreSQL DATABASE_URL")
+    return f"postgresql+asyncpg://{rest}"
+
+async_engine = None
+AsyncSessionLocal = None
+if ASYNC_DB:
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+    async_engine = create_async_engine(
+        async_database_url(DATABASE_URL),
+        pool_pre_ping=True,
+        pool_size=ASYNC_DB_POOL_SIZE,
+        max_overflow=0,
+    )
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# --- Read replica ---
+# With DATABASE_REPLICA_URL set, endpoints that call run_read(..., replica=True)
+# (the heavy analytics and health counts) run on a second engine pointed at a
+# Postgres read replica, so they stop competing with writes for the primary's
+# pool. A replica lagging more than REPLICA_MAX_LAG_SECONDS, or any database
+# error on the replica, sends the read to the primary instead; after an error
+# the replica is skipped for REPLICA_RETRY_SECONDS. A read that would have to
+# write (building a missing owner_stats rollup) is not tried on the replica:
+# rebuild_owner_stats raises ReplicaReadOnly there and the read goes to the
+# primary, which builds the rollup, without marking the replica down.
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "30"))
+REPLICA_LAG_CHECK_SECONDS = float(os.getenv("REPLICA_LAG_CHECK_SECONDS", "5"))
+REPLICA_RETRY_SECONDS = float(os.getenv("REPLICA_RETRY_SECONDS", "30"))
+REPLICA_POOL_SIZE = int(os.getenv("REPLICA_POOL_SIZE", "20"))
+
+REPLICA_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+class ReplicaUnavailable(Exception):
+    """The replica is lagging too far behind to serve a read."""
+
+class ReplicaReadOnly(ReplicaUnavailable):
+    """The read has to write first (a missing owner_stats rollup); the replica itself is fine."""
+
+class ReadReplica:
+    """Engines for the read replica plus its lag and health bookkeeping."""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.engine = create_engine(url, pool_pre_ping=True, pool_size=REPLICA_POOL_SIZE, max_overflow=0)
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        self.AsyncSessionLocal = None
+        if ASYNC_DB:
+            self.AsyncSessionLocal = async_sessionmaker(
+                create_async_engine(
+                    async_database_url(url), pool_pre_ping=True, pool_size=REPLICA_POOL_SIZE, max_overflow=0
+                ),
+                autoflush=False, expire_on_commit=False
+            )
+        self.lag_seconds = None
+        self.last_error = None
+        self._lag_checked_at = 0.0
+        self._down_until = 0.0
+        self._lock = threading.Lock()
+
+    def available(self) -> bool:
+        return time.monotonic() >= self._down_until
+
+    def check_lag(self, db: Session):
+        """Raise ReplicaUnavailable if the replica is too far behind; re-measured every few seconds."""
+        now = time.monotonic()
+        if now - self._lag_checked_at >= REPLICA_LAG_CHECK_SECONDS:
+            lag = float(db.execute(REPLICA_LAG_SQL).scalar() or 0)
+            with self._lock:
+                self.lag_seconds, self._lag_checked_at = lag, now
+        if self.lag_seconds is not None and self.lag_seconds > REPLICA_MAX_LAG_SECONDS:
+            raise ReplicaUnavailable(f"replica lag {self.lag_seconds:.1f}s")
+
+    def failed(self, exc: Exception):
+        with self._lock:
+            self.last_error = f"{type(exc).__name__}: {exc}".splitlines()[0]
+            if not isinstance(exc, ReplicaUnavailable):
+                self._down_until = time.monotonic() + REPLICA_RETRY_SECONDS
+        print(f"⚠️ Read replica skipped, using primary: {self.last_error}")
+
+    def status(self) -> dict:
+        return {
+            "configured": True,
+            "available": self.available(),
+            "lag_seconds": self.lag_seconds,
+            "last_error": self.last_error
+        }
+
+read_replica = None
+if DATABASE_REPLICA_URL:
+    read_replica = ReadReplica(DATABASE_REPLICA_URL)
+
+def _run_with_session(session_factory, fn, *args, **kwargs):
+    with session_factory() as db:
+        return fn(db, *args, **kwargs)
+
+def _run_on_replica(db: Session, fn, *args, **kwargs):
+    db.info["replica"] = True
+    read_replica.check_lag(db)
+    return fn(db, *args, **kwargs)
+
+async def _run(session_factory, async_session_factory, fn, *args, **kwargs):
+    if async_session_factory is not None:
+        async with async_session_factory() as session:
+            return await session.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(_run_with_session, session_factory, fn, *args, **kwargs)
+
+async def run_read(fn, *args, replica: bool = False, **kwargs):
+    """
+    Run `fn(db, *args, **kwargs)` on the async engine if enabled, else on the
+    threadpool. With `replica=True` and a healthy replica configured, run it
+    there first and fall back to the primary.
+    """
+    if replica and read_replica is not None and read_replica.available():
+        try:
+            return await _run(
+                read_replica.SessionLocal, read_replica.AsyncSessionLocal, _run_on_replica, fn, *args, **kwargs
+            )
+        except ReplicaReadOnly:
+            pass
+        except (DBAPIError, ReplicaUnavailable) as e:
+            read_replica.failed(e)
+    return await _run(SessionLocal, AsyncSessionLocal, fn, *args, **kwargs)
+
 # --- Models ---
 
 def import_states_counties_from_csv(csv_path: str, db: Session):
@@ -143,8 +300,21 @@ class CrmOwner(Base):
     seen_property_ids = Column(JSON, nullable=True)
     states_counties = Column(JSON, nullable=True)
 
+def not_postgresql(ddl, target, bind, compiler=None, **kw):
+    return (compiler or bind).dialect.name != "postgresql"
+
 class SeenProperties(Base):
+    """
+    One match per (owner, property). On Postgres the table is partitioned by
+    month of created_at (see partitions.py): its primary key is (id, created_at),
+    added after create, since a partitioned table's keys must include the
+    partition column. `id` alone still identifies a row and stays the ORM key.
+    """
     __tablename__ = "seen_properties"
+    __table_args__ = (
+        PrimaryKeyConstraint("id").ddl_if(callable_=not_postgresql),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
     id = Column(Integer, primary_key=True, index=True)
     crm_owner_id = Column(Integer, nullable=False)
     property_id = Column(String, nullable=False)
@@ -161,17 +331,195 @@ class SeenProperties(Base):
     contract_date = Column(DateTime)
     match_percentage = Column(Integer)  
     match_field = Column(String)
-    created_at = Column(DateTime, server_default=func.now())
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+
+event.listen(SeenProperties.__table__, "after_create", DDL(
+    "ALTER TABLE seen_properties ADD PRIMARY KEY (id, created_at)"
+).execute_if(dialect="postgresql"))
+
+# Indexes for the dashboard's access paths: every query filters on crm_owner_id,
+# lists sort by contract_date DESC NULLS LAST, created_at DESC, and stats filter
+# on created_at windows. Existing databases get them from backend/migrations.
+Index(
+    "ix_seen_properties_owner_contract_created_id",
+    SeenProperties.crm_owner_id,
+    SeenProperties.contract_date.desc().nulls_last(),
+    SeenProperties.created_at.desc(),
+    SeenProperties.id.desc(),
+).ddl_if(dialect="postgresql")
+Index("ix_seen_properties_owner_created", SeenProperties.crm_owner_id, SeenProperties.created_at.desc())
+# A unique index on a partitioned table must include created_at, which would not
+# stop duplicates, so on Postgres (crm_owner_id, property_id) is a plain index and
+# the worker checks for an existing match under the owner's advisory lock.
+Index("uq_seen_properties_owner_property", SeenProperties.crm_owner_id, SeenProperties.property_id,
+      unique=True).ddl_if(callable_=not_postgresql)
+Index("ix_seen_properties_owner_property", SeenProperties.crm_owner_id,
+      SeenProperties.property_id).ddl_if(dialect="postgresql")
+Index("ix_seen_properties_owner_id", SeenProperties.crm_owner_id, SeenProperties.id)
+
+# Trigram (pg_trgm) GIN indexes for the substring searches: ILIKE '%term%'
+# cannot use a B-tree, but can use these for terms of 3+ characters.
+# /seen_properties/search filters on SEEN_PROPERTY_SEARCH_SQL, which must stay
+# identical to the expression indexed by ix_seen_properties_search_trgm.
+SEEN_PROPERTY_SEARCH_SQL = (
+    "(COALESCE(owner_name, '') || ' ' || COALESCE(seller_name, '') || ' ' || COALESCE(street_address, ''))"
+)
+for trigram_table in (CrmOwner.__table__, SeenProperties.__table__):
+    event.listen(trigram_table, "before_create",
+                 DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"))
+event.listen(SeenProperties.__table__, "after_create", DDL(
+    "CREATE INDEX ix_seen_properties_search_trgm ON seen_properties "
+    f"USING gin ({SEEN_PROPERTY_SEARCH_SQL} gin_trgm_ops)"
+).execute_if(dialect="postgresql"))
+for trigram_column in (CrmOwner.name, CrmOwner.email, CrmOwner.companycode):
+    Index(
+        f"ix_crm_owners_{trigram_column.key}_trgm", trigram_column,
+        postgresql_using="gin", postgresql_ops={trigram_column.key: "gin_trgm_ops"},
+    ).ddl_if(dialect="postgresql")
+
+class SeenPropertyDeletion(Base):
+    """Tombstone for a deleted seen_properties row, so delta syncs can report the removal."""
+    __tablename__ = "seen_property_deletions"
+    id = Column(Integer, primary_key=True)
+    crm_owner_id = Column(Integer, nullable=False)
+    seen_property_id = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime, server_default=func.now())
+
+Index("ix_seen_property_deletions_owner_id", SeenPropertyDeletion.crm_owner_id, SeenPropertyDeletion.id)
+
+class OwnerStats(Base):
+    """Per-owner rollup of seen_properties; see OWNER STATS ROLLUP below."""
+    __tablename__ = "owner_stats"
+    crm_owner_id = Column(Integer, primary_key=True)
+    dimension = Column(String, primary_key=True)  # total, state, county, created_day, contract_day
+    key1 = Column(String, primary_key=True, default="")
+    key2 = Column(String, primary_key=True, default="")
+    count = Column(Integer, nullable=False, default=0)
+    with_contracts = Column(Integer, nullable=False, default=0)
+    with_contacts = Column(Integer, nullable=False, default=0)
+    created_epoch_sum = Column(BigInteger, nullable=False, default=0)
+    contract_epoch_sum = Column(BigInteger, nullable=False, default=0)
 
 # Create tables (run once at startup)
 Base.metadata.create_all(bind=engine)
 
+# Make sure seen_properties has partitions for this month and the next few
+# (Postgres, once the table is partitioned); see partitions.py.
+with engine.begin() as connection:
+    created_partitions = partitions.ensure_partitions(connection)
+if created_partitions:
+    print(f"✅ Created seen_properties partitions: {', '.join(created_partitions)}")
+
 # Import CSV once at startup (only if table is empty)
 with SessionLocal() as session:
     existing_count = session.query(StatesCounties).count()
     if existing_count == 0:
         import_states_counties_from_csv("states_counties.csv", session)
 
+class FipsIndex:
+    """
+    Immutable in-memory copy of the states_counties reference table, with
+    O(1) lookups for state and (state, county) FIPS codes. Built once at
+    startup and shared by every request; call `reload_fips_index` after
+    changing the table.
+    """
+    __slots__ = ("states", "counties")
+
+    def __init__(self, rows):
+        self.states = frozenset(row.statefips for row in rows)
+        self.counties = frozenset((row.statefips, row.countyfips) for row in rows)
+
+    def has_state(self, state_fips: int) -> bool:
+        return state_fips in self.states
+
+    def has_county(self, state_fips: int, county_fips: int) -> bool:
+        return (state_fips, county_fips) in self.counties
+
+    def invalid_selection(self, states_counties) -> List[str]:
+        """Error messages for every unknown state or county in a states_counties selection."""
+        errors = []
+        for state_county in states_counties:
+            if state_county.state_FIPS not in self.states:
+                errors.append(f"Invalid state FIPS: {state_county.state_FIPS}")
+                continue
+            for county in state_county.counties:
+                if (state_county.state_FIPS, county.county_FIPS) not in self.counties:
+                    errors.append(f"Invalid county FIPS: {county.county_FIPS} for state: {state_county.state_FIPS}")
+        return errors
+
+def opaque_etag(etag: str) -> str:
+    return etag[2:] if etag.startswith("W/") else etag
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match check; weak comparison, so W/"x" and "x" match."""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    tags = [opaque_etag(tag.strip()) for tag in if_none_match.split(",")]
+    return if_none_match.strip() == "*" or opaque_etag(etag) in tags
+
+class EncodedResponse:
+    """A JSON body serialized and gzipped once, with strong ETags for both encodings."""
+    __slots__ = ("body", "gzip_body", "etag", "gzip_etag")
+
+    def __init__(self, payload):
+        self.body = json.dumps(payload, separators=(",", ":")).encode()
+        self.gzip_body = gzip.compress(self.body, compresslevel=9, mtime=0)
+        digest = hashlib.sha256(self.body).hexdigest()[:32]
+        self.etag = f'"{digest}"'
+        self.gzip_etag = f'"{digest}-gzip"'
+
+    def response(self, request: Request, cache_control: str) -> Response:
+        """200 with the gzipped or plain body, or 304 if the client holds either ETag."""
+        use_gzip = "gzip" in request.headers.get("accept-encoding", "")
+        headers = {
+            "ETag": self.gzip_etag if use_gzip else self.etag,
+            "Cache-Control": cache_control,
+            "Vary": "Accept-Encoding",
+        }
+        if etag_matches(request, self.etag) or etag_matches(request, self.gzip_etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        if use_gzip:
+            headers["Content-Encoding"] = "gzip"
+            return Response(self.gzip_body, media_type="application/json", headers=headers)
+        return Response(self.body, media_type="application/json", headers=headers)
+
+def states_counties_payload(rows):
+    """The nested state -> counties list served by GET /states_counties."""
+    data = {}
+    for row in rows:
+        if row.statefips not in data:
+            data[row.statefips] = {
+                "state_FIPS": row.statefips,
+                "state_name": row.state,
+                "counties": []
+            }
+        data[row.statefips]["counties"].append({
+            "county_FIPS": row.countyfips,
+            "county_name": row.county,
+        })
+    return list(data.values())
+
+def reload_fips_index():
+    """Rebuild the FIPS index and the encoded /states_counties response from the table."""
+    global fips_index, states_counties_response
+    with SessionLocal() as session:
+        rows = session.query(
+            StatesCounties.statefips, StatesCounties.state, StatesCounties.countyfips, StatesCounties.county
+        ).order_by(StatesCounties.statefips, StatesCounties.countyfips).all()
+    fips_index = FipsIndex(rows)
+    states_counties_response = EncodedResponse(states_counties_payload(rows))
+
+fips_index = None
+states_counties_response = None
+reload_fips_index()
+
+def validate_states_counties(states_counties):
+    """Raise HTTP 400 naming the first unknown state or county in the selection."""
+    errors = fips_index.invalid_selection(states_counties)
+    if errors:
+        raise HTTPException(status_code=400, detail=errors[0])
+
 with SessionLocal() as session:
     existing_admin = session.query(Admin).first()
     if not existing_admin:
@@ -185,45 +533,407 @@ with SessionLocal() as session:
         session.commit()
         print("✅ Default admin created: Rectadmin/!Ezpass4905")
 
-# Authentication dependency
-def get_current_admin(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
-    token = credentials.credentials
-    payload = verify_token(token)
-    admin_id = payload.get("admin_id")
-    if not admin_id:
-        raise HTTPException(status_code=401, detail="Invalid admin token")
-    
+# =============================================================================
+# OWNER STATS ROLLUP
+# =============================================================================
+# owner_stats holds per-owner aggregates of seen_properties so the dashboard
+# endpoints read a handful of rows instead of scanning every match. Rows are
+# keyed by (crm_owner_id, dimension, key1, key2):
+#   total         ''          ''      all properties of the owner
+#   state         state       ''      per state
+#   county        county      state   per (county, state)
+#   created_day   YYYY-MM-DD  ''      per day the match was added (created_at)
+#   contract_day  YYYY-MM-DD  ''      per contract date
+# The worker adds to it when it stores a match and the delete endpoints
+# subtract from it. An owner without a 'total' row has not been built yet and
+# is rebuilt from seen_properties on first read, or in bulk, outside requests,
+# by owner_stats_maintenance.py. Time windows ("last 30 days") are counted at
+# day granularity.
+
+OWNER_STATS_LOCK_NAMESPACE = 7353  # first key of pg_advisory_xact_lock(ns, owner_id)
+
+_OWNER_STATS_UPSERT = text("""
+    INSERT INTO owner_stats (crm_owner_id, dimension, key1, key2, count, with_contracts, with_contacts,
+                             created_epoch_sum, contract_epoch_sum)
+    VALUES (:crm_owner_id, :dimension, :key1, :key2, :count, :with_contracts, :with_contacts,
+            :created_epoch_sum, :contract_epoch_sum)
+    ON CONFLICT (crm_owner_id, dimension, key1, key2) DO UPDATE SET
+        count = owner_stats.count + excluded.count,
+        with_contracts = owner_stats.with_contracts + excluded.with_contracts,
+        with_contacts = owner_stats.with_contacts + excluded.with_contacts,
+        created_epoch_sum = owner_stats.created_epoch_sum + excluded.created_epoch_sum,
+        contract_epoch_sum = owner_stats.contract_epoch_sum + excluded.contract_epoch_sum
+""")
+
+def _epoch(value: Optional[datetime]) -> int:
+    return calendar.timegm(value.timetuple()) if value else 0
+
+def _day_key(value) -> str:
+    return value.strftime("%Y-%m-%d")
+
+def owner_stats_deltas(crm_owner_id: int, state, county, contact_email, created_at, contract_date, sign: int = 1):
+    """owner_stats rows to add (sign=1) or subtract (sign=-1) for one seen property."""
+    has_contract = 1 if contract_date is not None else 0
+    base = {
+        "crm_owner_id": crm_owner_id,
+        "count": sign,
+        "with_contracts": sign * has_contract,
+        "with_contacts": sign * (1 if contact_email is not None else 0),
+        "created_epoch_sum": sign * _epoch(created_at),
+        "contract_epoch_sum": sign * _epoch(contract_date),
+    }
+    deltas = [{**base, "dimension": "total", "key1": "", "key2": ""}]
+    if state is not None:
+        deltas.append({**base, "dimension": "state", "key1": state, "key2": ""})
+    if county is not None:
+        deltas.append({**base, "dimension": "county", "key1": county, "key2": state or ""})
+    if created_at is not None:
+        deltas.append({**base, "dimension": "created_day", "key1": _day_key(created_at), "key2": ""})
+    if contract_date is not None:
+        deltas.append({**base, "dimension": "contract_day", "key1": _day_key(contract_date), "key2": ""})
+    return deltas
+
+def lock_owner_stats(db: Session, crm_owner_id: int):
+    """Serialize rollup writers for one owner until the end of the transaction (Postgres only)."""
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("SELECT pg_advisory_xact_lock(:ns, :owner_id)"),
+                   {"ns": OWNER_STATS_LOCK_NAMESPACE, "owner_id": crm_owner_id})
+
+def owner_stats_materialized(db: Session, crm_owner_id: int) -> bool:
+    return db.query(OwnerStats.crm_owner_id).filter(
+        OwnerStats.crm_owner_id == crm_owner_id,
+        OwnerStats.dimension == "total"
+    ).first() is not None
+
+def apply_owner_stats_deltas(db: Session, crm_owner_id: int, deltas: List[dict]):
+    """Add `deltas` to an owner's rollup if it has been built. Call inside the writing transaction."""
+    lock_owner_stats(db, crm_owner_id)
+    if deltas and owner_stats_materialized(db, crm_owner_id):
+        db.execute(_OWNER_STATS_UPSERT, deltas)
+
+# One scan of the owner's rows computes every dimension at once. GROUPING()
+# over (state, county, created_day, contract_day) identifies the grouping set:
+# 15 = (), 7 = (state), 3 = (county, state), 13 = (created_day), 14 = (contract_day).
+_OWNER_STATS_REBUILD_PG = text("""
+    WITH props AS (
+        SELECT state, county, contact_email, created_at, contract_date,
+               to_char(created_at, 'YYYY-MM-DD') AS created_day,
+               to_char(contract_date, 'YYYY-MM-DD') AS contract_day
+        FROM seen_properties
+        WHERE crm_owner_id = :crm_owner_id
+    ), grouped AS (
+        SELECT GROUPING(state, county, created_day, contract_day) AS grp,
+               state, county, created_day, contract_day,
+               COUNT(*) AS count,
+               COUNT(contract_date) AS with_contracts,
+               COUNT(contact_email) AS with_contacts,
+               COALESCE(SUM(FLOOR(EXTRACT(EPOCH FROM created_at))), 0)::bigint AS created_epoch_sum,
+               COALESCE(SUM(FLOOR(EXTRACT(EPOCH FROM contract_date))), 0)::bigint AS contract_epoch_sum
+        FROM props
+        GROUP BY GROUPING SETS ((), (state), (county, state), (created_day), (contract_day))
+    )
+    INSERT INTO owner_stats (crm_owner_id, dimension, key1, key2, count, with_contracts, with_contacts,
+                             created_epoch_sum, contract_epoch_sum)
+    SELECT :crm_owner_id,
+           CASE grp WHEN 15 THEN 'total' WHEN 7 THEN 'state' WHEN 3 THEN 'county'
+                    WHEN 13 THEN 'created_day' ELSE 'contract_day' END,
+           COALESCE(CASE grp WHEN 7 THEN state WHEN 3 THEN county
+                             WHEN 13 THEN created_day WHEN 14 THEN contract_day END, ''),
+           CASE WHEN grp = 3 THEN COALESCE(state, '') ELSE '' END,
+           count, with_contracts, with_contacts, created_epoch_sum, contract_epoch_sum
+    FROM grouped
+    WHERE grp = 15
+       OR (grp = 7 AND state IS NOT NULL)
+       OR (grp = 3 AND county IS NOT NULL)
+       OR (grp = 13 AND created_day IS NOT NULL)
+       OR (grp = 14 AND contract_day IS NOT NULL)
+""")
+
+def rebuild_owner_stats(db: Session, crm_owner_id: int):
+    """Recompute one owner's rollup from seen_properties and commit it (never on the replica)."""
+    if db.info.get("replica"):
+        raise ReplicaReadOnly(f"owner_stats for owner {crm_owner_id} not built yet")
+    lock_owner_stats(db, crm_owner_id)
+    db.query(OwnerStats).filter(OwnerStats.crm_owner_id == crm_owner_id).delete(synchronize_session=False)
+
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(_OWNER_STATS_REBUILD_PG, {"crm_owner_id": crm_owner_id})
+        db.commit()
+        return
+
+    # Other databases (local SQLite): aggregate in Python from one pass over the rows.
+    totals = {}
+    rows = db.query(
+        SeenProperties.state, SeenProperties.county, SeenProperties.contact_email,
+        SeenProperties.created_at, SeenProperties.contract_date
+    ).filter(SeenProperties.crm_owner_id == crm_owner_id).yield_per(5000)
+    for row in rows:
+        for delta in owner_stats_deltas(crm_owner_id, *row):
+            key = (delta["dimension"], delta["key1"], delta["key2"])
+            if key in totals:
+                current = totals[key]
+                for field in ("count", "with_contracts", "with_contacts", "created_epoch_sum", "contract_epoch_sum"):
+                    current[field] += delta[field]
+            else:
+                totals[key] = delta
+
+    # An owner with no matches still gets its (zero) total row, which marks the rollup as built.
+    totals.setdefault(("total", "", ""), owner_stats_deltas(crm_owner_id, None, None, None, None, None, sign=0)[0])
+    db.execute(insert(OwnerStats), list(totals.values()))
+    db.commit()
+
+def read_owner_rollup(db: Session, crm_owner_id: int, created_since: datetime, contract_since: datetime):
+    """
+    One owner's total/state/county rows plus created_day and contract_day rows
+    from the given dates on, in a single query. Builds the rollup first if needed.
+    """
+    def fetch():
+        return db.query(
+            OwnerStats.dimension, OwnerStats.key1, OwnerStats.key2, OwnerStats.count,
+            OwnerStats.with_contracts, OwnerStats.with_contacts,
+            OwnerStats.created_epoch_sum, OwnerStats.contract_epoch_sum
+        ).filter(
+            OwnerStats.crm_owner_id == crm_owner_id,
+            or_(
+                OwnerStats.dimension.in_(("total", "state", "county")),
+                and_(OwnerStats.dimension == "created_day", OwnerStats.key1 >= _day_key(created_since)),
+                and_(OwnerStats.dimension == "contract_day", OwnerStats.key1 >= _day_key(contract_since)),
+            )
+        ).all()
+
+    rows = fetch()
+    if not any(row.dimension == "total" for row in rows):
+        rebuild_owner_stats(db, crm_owner_id)
+        rows = fetch()
+    return rows
+
+def sum_since(rows, dimension: str, since: datetime) -> int:
+    """Sum of `count` over rollup `rows` of a *_day dimension on or after `since`."""
+    since_key = _day_key(since)
+    return sum(row.count for row in rows if row.dimension == dimension and row.key1 >= since_key)
+
+def ensure_owner_stats(db: Session, owner_ids):
+    """Build the rollup for any of `owner_ids` that does not have one yet."""
+    owner_ids = list(owner_ids)
+    if not owner_ids:
+        return
+    built = {
+        row[0] for row in db.query(OwnerStats.crm_owner_id).filter(
+            OwnerStats.crm_owner_id.in_(owner_ids),
+            OwnerStats.dimension == "total"
+        )
+    }
+    for owner_id in owner_ids:
+        if owner_id not in built:
+            rebuild_owner_stats(db, owner_id)
+
+def owners_without_owner_stats(db: Session) -> List[int]:
+    """Ids of the owners whose rollup has not been built, for owner_stats_maintenance.py."""
+    built = select(OwnerStats.crm_owner_id).where(OwnerStats.dimension == "total")
+    return [row[0] for row in db.query(CrmOwner.id).filter(CrmOwner.id.notin_(built)).order_by(CrmOwner.id)]
+
+def owner_stats_query(db: Session, owner_ids, dimension: str, *columns):
+    """Rollup rows of `dimension` for `owner_ids` (a list, a SELECT of ids, or None for everyone)."""
+    query = db.query(*columns).filter(OwnerStats.dimension == dimension)
+    if owner_ids is not None:
+        query = query.filter(OwnerStats.crm_owner_id.in_(owner_ids))
+    return query
+
+def owner_stats_breakdown(db: Session, owner_ids, dimension: str, limit: Optional[int] = None):
+    """Per-key sums of a state/county dimension, largest first, skipping emptied keys."""
+    count = func.sum(OwnerStats.count)
+    query = owner_stats_query(
+        db, owner_ids, dimension,
+        OwnerStats.key1, OwnerStats.key2,
+        count.label("count"),
+        func.sum(OwnerStats.with_contracts).label("with_contracts"),
+        func.sum(OwnerStats.created_epoch_sum).label("created_epoch_sum"),
+        func.sum(OwnerStats.contract_epoch_sum).label("contract_epoch_sum"),
+    ).group_by(OwnerStats.key1, OwnerStats.key2).having(count > 0).order_by(count.desc(), OwnerStats.key1)
+    if limit:
+        query = query.limit(limit)
+    return query.all()
+
+def owner_stats_windows(db: Session, owner_ids, dimension: str, cutoffs: Dict[str, datetime]) -> Dict[str, int]:
+    """Counts of a *_day dimension on or after each cutoff, in a single query."""
+    if not cutoffs:
+        return {}
+    labels = list(cutoffs)
+    row = owner_stats_query(db, owner_ids, dimension, *[
+        func.coalesce(func.sum(OwnerStats.count).filter(OwnerStats.key1 >= _day_key(cutoffs[label])), 0)
+        for label in labels
+    ]).one()
+    return {label: int(value) for label, value in zip(labels, row)}
+
+def _months_ago(value: datetime, months: int) -> datetime:
+    """`value` shifted back by calendar months, like Postgres' `- INTERVAL 'n months'`."""
+    year, month = divmod(value.year * 12 + value.month - 1 - months, 12)
+    day = min(value.day, calendar.monthrange(year, month + 1)[1])
+    return value.replace(year=year, month=month + 1, day=day)
+
+def owner_stats_monthly(db: Session, owner_ids, months: int = 6) -> List[dict]:
+    """Properties added per month over the last `months` months, newest first."""
+    since = _months_ago(datetime.utcnow(), months)
+    day_counts = owner_stats_query(
+        db, owner_ids, "created_day", OwnerStats.key1, func.sum(OwnerStats.count)
+    ).filter(OwnerStats.key1 >= _day_key(since)).group_by(OwnerStats.key1).all()
+    by_month = {}
+    for day, count in day_counts:
+        if count:
+            by_month[day[:7]] = by_month.get(day[:7], 0) + int(count)
+    return [{"month": month, "count": count} for month, count in sorted(by_month.items(), reverse=True)]
+
+def owner_stats_totals(db: Session, owner_ids):
+    """(count, with_contracts, with_contacts) summed over the owners' total rows."""
+    row = owner_stats_query(
+        db, owner_ids, "total",
+        func.coalesce(func.sum(OwnerStats.count), 0),
+        func.coalesce(func.sum(OwnerStats.with_contracts), 0),
+        func.coalesce(func.sum(OwnerStats.with_contacts), 0),
+    ).one()
+    return tuple(int(value) for value in row)
+
+def property_overview(db: Session, months: int = 6, state_limit: int = 10) -> dict:
+    """
+    Every owner's property count, properties added per month and top states
+    for /admin/stats. Summed from the rollups that exist, plus a direct
+    aggregate over seen_properties for the owners whose rollup has not been
+    built yet, so the figures are complete before a backfill has run.
+    """
+    total, _, _ = owner_stats_totals(db, None)
+    by_month = {row["month"]: row["count"] for row in owner_stats_monthly(db, None, months=months)}
+    by_state = {row.key1: int(row.count) for row in owner_stats_breakdown(db, None, "state")}
+
+    missing = owners_without_owner_stats(db)
+    if missing:
+        rows = db.query(SeenProperties).filter(SeenProperties.crm_owner_id.in_(missing))
+        total += rows.count()
+        since = _months_ago(datetime.utcnow(), months).replace(hour=0, minute=0, second=0, microsecond=0)
+        day = func.date(SeenProperties.created_at)
+        for value, count in rows.filter(SeenProperties.created_at >= since).with_entities(day, func.count()).group_by(day):
+            by_month[str(value)[:7]] = by_month.get(str(value)[:7], 0) + count
+        state_counts = rows.filter(SeenProperties.state.isnot(None)).with_entities(
+            SeenProperties.state, func.count()).group_by(SeenProperties.state)
+        for state, count in state_counts:
+            by_state[state] = by_state.get(state, 0) + count
+
+    top_states = sorted(by_state.items(), key=lambda item: (-item[1], item[0]))[:state_limit]
+    return {
+        "total_properties": total,
+        "properties_by_month": [{"month": month, "count": count} for month, count in sorted(by_month.items(), reverse=True)],
+        "top_states": [{"state": state, "count": count} for state, count in top_states],
+    }
+
+def average_age_days(epoch_sum, count) -> Optional[float]:
+    """Mean age in days of `count` timestamps whose epoch seconds sum to `epoch_sum`."""
+    if not count:
+        return None
+    return (calendar.timegm(datetime.utcnow().timetuple()) - epoch_sum / count) / 86400
+
+# Authenticated principals are cached per process for a few seconds, so the
+# burst of requests a dashboard fires at once costs one lookup instead of one
+# query each. Entries are detached copies: endpoints that modify the principal
+# use the *_for_update dependencies, which load it into the request's session,
+# and every write to a principal calls principal_cache.invalidate(...). Other
+# processes see such a change within PRINCIPAL_CACHE_TTL_SECONDS.
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "30"))
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000"))
+
+class PrincipalCache:
+    """Size-bounded LRU of detached Admin/CrmOwner/Company rows keyed by (kind, id), with a TTL."""
+
+    def __init__(self, ttl_seconds: float, max_size: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, kind: str, principal_id: int):
+        key = (kind, principal_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, principal = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return principal
+
+    def put(self, kind: str, principal_id: int, principal):
+        if self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries[(kind, principal_id)] = (time.monotonic() + self.ttl_seconds, principal)
+            self._entries.move_to_end((kind, principal_id))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, kind: str, principal_id: int):
+        with self._lock:
+            self._entries.pop((kind, principal_id), None)
+
+principal_cache = PrincipalCache(PRINCIPAL_CACHE_TTL_SECONDS, PRINCIPAL_CACHE_SIZE)
+
+def token_principal_id(credentials: HTTPAuthorizationCredentials, claim: str, detail: str):
+    principal_id = verify_token(credentials.credentials).get(claim)
+    if not principal_id:
+        raise HTTPException(status_code=401, detail=detail)
+    return principal_id
+
+def cached_principal(db: Session, kind: str, principal_id: int, load):
+    """The principal from the cache, or loaded with `load(db, id)`, detached and cached."""
+    principal = principal_cache.get(kind, principal_id)
+    if principal is None:
+        principal = load(db, principal_id)
+        db.expunge(principal)
+        # End the read-only transaction so the request does not keep a pooled
+        # connection checked out while run_read() takes another one.
+        db.rollback()
+        principal_cache.put(kind, principal_id, principal)
+    return principal
+
+def load_admin(db: Session, admin_id: int) -> Admin:
     admin = db.query(Admin).filter(Admin.id == admin_id, Admin.is_active == True).first()
     if not admin:
         raise HTTPException(status_code=401, detail="Admin not found or inactive")
-    
     return admin
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
-    token = credentials.credentials
-    payload = verify_token(token)
-    user_id = payload.get("user_id")
-    if not user_id:
-        raise HTTPException(status_code=401, detail="Invalid token")
-    
+
+def load_user(db: Session, user_id: int) -> CrmOwner:
     user = db.query(CrmOwner).filter(CrmOwner.id == user_id).first()
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
-    
     return user
-# Authentication dependency for companies
-def get_current_company(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
-    token = credentials.credentials
-    payload = verify_token(token)
-    company_id = payload.get("company_id")
-    if not company_id:
-        raise HTTPException(status_code=401, detail="Invalid company token")
-    
+
+def load_company(db: Session, company_id: int) -> Company:
     company = db.query(Company).filter(Company.id == company_id).first()
     if not company:
         raise HTTPException(status_code=401, detail="Company not found")
-    
     return company
 
+# Authentication dependency
+def get_current_admin(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
+    admin_id = token_principal_id(credentials, "admin_id", "Invalid admin token")
+    return cached_principal(db, "admin", admin_id, load_admin)
+
+def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
+    user_id = token_principal_id(credentials, "user_id", "Invalid token")
+    return cached_principal(db, "user", user_id, load_user)
+
+def get_current_user_for_update(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
+    """The current user loaded into the request's session, for endpoints that modify it."""
+    return load_user(db, token_principal_id(credentials, "user_id", "Invalid token"))
+
+# Authentication dependency for companies
+def get_current_company(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
+    company_id = token_principal_id(credentials, "company_id", "Invalid company token")
+    return cached_principal(db, "company", company_id, load_company)
+
+def get_current_company_for_update(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
+    """The current company loaded into the request's session, for endpoints that modify it."""
+    return load_company(db, token_principal_id(credentials, "company_id", "Invalid company token"))
+
 def create_company_token(data: dict):
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(hours=JWT_EXPIRATION_HOURS)
@@ -348,6 +1058,8 @@ class AgentOutForCompany(BaseModel):
     class Config:
         orm_mode = True
 
+AgentsOutForCompany = TypeAdapter(List[AgentOutForCompany])
+
 class CompanyStats(BaseModel):
     total_agents: int
     active_agents: int
@@ -469,36 +1181,103 @@ class ContactForm(BaseModel):
             raise ValueError('Message cannot be empty')
         return v.strip()
 
-def send_email(to_email: str, subject: str, body: str, sender_name: str = None):
-    """Send email using SMTP"""
-    try:
-        # Create message
-        msg = MIMEMultipart()
-        msg['From'] = SENDER_EMAIL
-        msg['To'] = to_email
-        msg['Subject'] = subject
-        
-        # Add body to email
-        msg.attach(MIMEText(body, 'html'))
-        
-        # Create SMTP session
-        server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT)
+def build_email_message(to_email: str, subject: str, body: str) -> MIMEMultipart:
+    msg = MIMEMultipart()
+    msg['From'] = SENDER_EMAIL
+    msg['To'] = to_email
+    msg['Subject'] = subject
+    msg.attach(MIMEText(body, 'html'))
+    return msg
+
+class BackgroundMailer:
+    """
+    Delivers emails from a queue on a single daemon thread so request handlers
+    never wait on SMTP. The authenticated connection is kept open between
+    messages and closed after SMTP_IDLE_SECONDS without mail.
+    """
+
+    def __init__(self, idle_seconds: float = 60.0):
+        self.idle_seconds = idle_seconds
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._server = None
+
+    def send(self, to_email: str, subject: str, body: str, then: Optional[tuple] = None):
+        """Queue an email. `then` is an optional (to, subject, body) sent only if this one succeeds."""
+        self._ensure_started()
+        self._queue.put((to_email, subject, body, then))
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="background-mailer", daemon=True)
+                self._thread.start()
+
+    def _connect(self):
+        server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT, timeout=30)
         server.starttls()  # Enable security
         server.login(SENDER_EMAIL, SMTP_PASSWORD)
-        
-        # Send email
-        text = msg.as_string()
-        server.sendmail(SENDER_EMAIL, to_email, text)
-        server.quit()
-        
-        return True
-    except Exception as e:
-        print(f"Email sending failed: {e}")
+        return server
+
+    def _disconnect(self):
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except Exception:
+                pass
+            self._server = None
+
+    def _deliver(self, to_email: str, subject: str, body: str) -> bool:
+        text = build_email_message(to_email, subject, body).as_string()
+        # A pooled connection may have been dropped by the server; reconnect once.
+        for attempt in range(2):
+            try:
+                if self._server is None:
+                    self._server = self._connect()
+                self._server.sendmail(SENDER_EMAIL, to_email, text)
+                return True
+            except (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, OSError) as e:
+                self._disconnect()
+                if attempt:
+                    print(f"Email sending failed: {e}")
+            except Exception as e:
+                self._disconnect()
+                print(f"Email sending failed: {e}")
+                return False
         return False
 
+    def _run(self):
+        while True:
+            try:
+                item = self._queue.get(timeout=self.idle_seconds)
+            except queue.Empty:
+                self._disconnect()
+                continue
+            if item is None:
+                self._disconnect()
+                return
+            to_email, subject, body, then = item
+            if self._deliver(to_email, subject, body) and then:
+                self._queue.put((*then, None))
+
+    def stop(self, timeout: float = 10.0):
+        """Deliver what is already queued, then stop the thread."""
+        with self._lock:
+            thread = self._thread
+        if thread is not None and thread.is_alive():
+            self._queue.put(None)
+            thread.join(timeout)
+
+mailer = BackgroundMailer(idle_seconds=float(os.getenv("SMTP_IDLE_SECONDS", "60")))
+
 
 # --- FastAPI app ---
-app = FastAPI()
+# orjson serializes several times faster than the stdlib json module that
+# JSONResponse uses; list endpoints return ORJSONResponse directly to skip
+# jsonable_encoder as well. Endpoints with a response_model validate through a
+# TypeAdapter of it first, so its fields still filter what is sent.
+app = FastAPI(default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -506,14 +1285,54 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Data-Version"],
 )
 
+# Response bodies of COMPRESS_MIN_SIZE bytes or more are compressed with
+# brotli when the client accepts it, gzip otherwise. Responses that already
+# carry a Content-Encoding (/states_counties) are passed through as they are.
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
+
+app.add_middleware(BrotliMiddleware, quality=BROTLI_QUALITY, minimum_size=COMPRESS_MIN_SIZE, gzip_fallback=False)
+app.add_middleware(GZipMiddleware, minimum_size=COMPRESS_MIN_SIZE, compresslevel=GZIP_LEVEL)
+
+@app.on_event("shutdown")
+def stop_background_mailer():
+    mailer.stop()
+
+@app.on_event("shutdown")
+def stop_password_pool():
+    passwords.shutdown()
+
+@app.exception_handler(PasswordServiceBusy)
+async def password_service_busy_handler(request: Request, exc: PasswordServiceBusy):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "The service is busy. Please try again in a moment."},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+@app.exception_handler(TooManyAttempts)
+async def too_many_attempts_handler(request: Request, exc: TooManyAttempts):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": "Too many login attempts. Please try again later."},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
 # Authentication endpoints
 @app.post("/login", response_model=LoginResponse)
 def login(login_data: LoginRequest, db: Session = Depends(get_db)):
     user = db.query(CrmOwner).filter(CrmOwner.email == login_data.email).first()
-    if not user or not verify_password(login_data.password, user.password):
+    valid, new_hash = check_login(f"user:{login_data.email.lower()}", login_data.password, user.password if user else None)
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid email or password")
+    if new_hash:
+        # Stored with an outdated bcrypt cost: upgrade it transparently.
+        user.password = new_hash
+        db.commit()
     
     access_token = create_access_token(data={"user_id": user.id})
     return {
@@ -529,7 +1348,7 @@ def get_current_user_info(current_user: CrmOwner = Depends(get_current_user)):
 @app.put("/me", response_model=OwnerOut)
 def update_current_user(
     user_update: OwnerUpdate,
-    current_user: CrmOwner = Depends(get_current_user),
+    current_user: CrmOwner = Depends(get_current_user_for_update),
     db: Session = Depends(get_db)
 ):
     # Handle password change if requested
@@ -574,22 +1393,7 @@ def update_current_user(
     # Update states_counties if provided
     if user_update.states_counties is not None:
         # Validate that states and counties exist
-        for state_county in user_update.states_counties:
-            # Verify state exists
-            state_exists = db.query(StatesCounties).filter(
-                StatesCounties.statefips == str(state_county.state_FIPS)
-            ).first()
-            if not state_exists:
-                raise HTTPException(status_code=400, detail=f"Invalid state FIPS: {state_county.state_FIPS}")
-            
-            # Verify counties exist
-            for county in state_county.counties:
-                county_exists = db.query(StatesCounties).filter(
-                    StatesCounties.statefips == str(state_county.state_FIPS),
-                    StatesCounties.countyfips == str(county.county_FIPS)
-                ).first()
-                if not county_exists:
-                    raise HTTPException(status_code=400, detail=f"Invalid county FIPS: {county.county_FIPS} for state: {state_county.state_FIPS}")
+        validate_states_counties(user_update.states_counties)
         
         current_user.states_counties = [sc.dict() for sc in user_update.states_counties]
     
@@ -600,6 +1404,8 @@ def update_current_user(
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail="Failed to update profile")
+    finally:
+        principal_cache.invalidate("user", current_user.id)
     
     return current_user
 
@@ -619,26 +1425,17 @@ def get_companies_list(db: Session = Depends(get_db)):
     ]
 
 # Existing endpoints
-@app.get("/states_counties", response_model=List[StateCounties])
-def get_states_counties(db: Session = Depends(get_db)):
-    result = db.execute(text("""
-        SELECT statefips, state, countyfips, county FROM states_counties
-    """)).fetchall()
+STATES_COUNTIES_CACHE_CONTROL = os.getenv(
+    "STATES_COUNTIES_CACHE_CONTROL", "public, max-age=86400, stale-while-revalidate=604800"
+)
 
-    data = {}
-    for row in result:
-        statefips = row.statefips
-        if statefips not in data:
-            data[statefips] = {
-                "state_FIPS": statefips,
-                "state_name": row.state,
-                "counties": []
-            }
-        data[statefips]["counties"].append({
-            "county_FIPS": row.countyfips,
-            "county_name": row.county,
-        })
-    return list(data.values())
+@app.get("/states_counties", response_model=List[StateCounties])
+def get_states_counties(request: Request):
+    """
+    The static state/county reference list, pre-encoded at startup (see
+    reload_fips_index): no database or serialization work per request.
+    """
+    return states_counties_response.response(request, STATES_COUNTIES_CACHE_CONTROL)
 
 @app.post("/companies", response_model=CompanyOut)
 def create_company(company: CompanyCreate, db: Session = Depends(get_db)):
@@ -700,90 +1497,346 @@ def validate_token(current_user: CrmOwner = Depends(get_current_user)):
         "timestamp": datetime.utcnow().isoformat()
     }
 # Seen Properties endpoints
+SEEN_PROPERTIES_STREAM_BATCH = int(os.getenv("SEEN_PROPERTIES_STREAM_BATCH", "500"))
+SEEN_PROPERTY_FIELDS = list(SeenPropertyOut.__fields__)
+
+def seen_property_dict(row) -> dict:
+    """SeenPropertyOut-shaped dict for a seen_properties row or ORM object, ready for orjson."""
+    item = {field: getattr(row, field) for field in SEEN_PROPERTY_FIELDS}
+    if item["property_id"] is not None:
+        item["property_id"] = str(item["property_id"])
+    return item
+
+def seen_property_json(row) -> bytes:
+    """One SeenPropertyOut-shaped JSON object for a seen_properties row."""
+    return orjson.dumps(seen_property_dict(row))
+
+def seen_property_columns():
+    """select() of the SeenPropertyOut columns, to be filtered and ordered by the caller."""
+    return select(*(getattr(SeenProperties, field) for field in SEEN_PROPERTY_FIELDS))
+
+def seen_property_batches(statement):
+    """
+    Yield the rows of `statement` in SEEN_PROPERTIES_STREAM_BATCH-row lists.
+    Rows are read through a server-side cursor on a session of its own, so
+    memory stays flat however many rows there are, and the request's session
+    is not held while the client reads.
+    """
+    db = SessionLocal()
+    try:
+        rows = db.execute(statement.execution_options(yield_per=SEEN_PROPERTIES_STREAM_BATCH))
+        yield from rows.partitions()
+    finally:
+        db.close()
+
+def json_array_chunks(batches):
+    separator = b"["
+    for batch in batches:
+        yield separator + b",".join(seen_property_json(row) for row in batch)
+        separator = b","
+    yield b"[]" if separator == b"[" else b"]"
+
+def ndjson_chunks(batches):
+    for batch in batches:
+        yield b"".join(seen_property_json(row) + b"\n" for row in batch)
+
+def stream_seen_properties(owner_id: int, ndjson: bool):
+    """Yield the owner's matches, newest first, as a JSON array or NDJSON lines."""
+    batches = seen_property_batches(
+        seen_property_columns()
+        .where(SeenProperties.crm_owner_id == owner_id)
+        .order_by(SeenProperties.created_at.desc(), SeenProperties.id.desc())
+    )
+    return ndjson_chunks(batches) if ndjson else json_array_chunks(batches)
+
+def seen_properties_version(db: Session, owner_id: int) -> str:
+    """
+    The owner's data version, "<max seen_properties id>.<max tombstone id>".
+    Rows are only ever inserted (with increasing ids) or deleted (leaving a
+    tombstone with an increasing id), so the token changes exactly when the
+    owner's matches do. Two index lookups on (crm_owner_id, id).
+    """
+    max_id = select(func.max(SeenProperties.id)).where(SeenProperties.crm_owner_id == owner_id).scalar_subquery()
+    max_deletion = select(func.max(SeenPropertyDeletion.id)).where(
+        SeenPropertyDeletion.crm_owner_id == owner_id
+    ).scalar_subquery()
+    row = db.execute(select(max_id, max_deletion)).one()
+    return f"{row[0] or 0}.{row[1] or 0}"
+
+def parse_seen_properties_version(version: str):
+    """(max id, max tombstone id) from `seen_properties_version`, or HTTP 400."""
+    try:
+        max_id, max_deletion = (int(part) for part in version.split("."))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid version")
+    return max_id, max_deletion
+
+def record_seen_property_deletion(db: Session, prop: SeenProperties):
+    db.add(SeenPropertyDeletion(crm_owner_id=prop.crm_owner_id, seen_property_id=prop.id))
+
+def conditional_headers(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """
+    Put `etag` on `response`; if the client already holds it, return the 304
+    the endpoint should send instead. Clients must revalidate on every use.
+    """
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    response.headers.update(headers)
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return None
+
 @app.get("/seen_properties", response_model=List[SeenPropertyOut])
-def get_seen_properties(current_user: CrmOwner = Depends(get_current_user), db: Session = Depends(get_db)):
-    properties = db.query(SeenProperties).filter(
-        SeenProperties.crm_owner_id == current_user.id
-    ).order_by(SeenProperties.created_at.desc()).all()
-    return properties
+def get_seen_properties(
+    request: Request,
+    format: str = "json",  # "json" for one JSON array, "ndjson" for one object per line
+    current_user: CrmOwner = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    All of the user's matches, newest first, streamed as they are read from the
+    database. Supports conditional GET: a request whose If-None-Match carries
+    the current ETag gets an empty 304.
+    """
+    if format not in ("json", "ndjson"):
+        raise HTTPException(status_code=400, detail="format must be 'json' or 'ndjson'")
+    version = seen_properties_version(db, current_user.id)
+    etag = f'W/"sp-{current_user.id}-{version}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache", "X-Data-Version": version}
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    ndjson = format == "ndjson"
+    return StreamingResponse(
+        stream_seen_properties(current_user.id, ndjson),
+        media_type="application/x-ndjson" if ndjson else "application/json",
+        headers=headers,
+    )
+
+@app.get("/seen_properties/delta", response_class=ORJSONResponse)
+def get_seen_properties_delta(
+    since: str,
+    current_user: CrmOwner = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Changes to the user's matches since `since`, a version from a previous
+    X-Data-Version header or delta response: the rows added since then and
+    the ids of rows deleted since then, plus the version to pass next time.
+    If old matches were removed in bulk since then (a retention run dropping
+    a partition), answers 410 and the client should reload /seen_properties.
+    """
+    max_id, max_deletion = parse_seen_properties_version(since)
+    version = seen_properties_version(db, current_user.id)
+    deleted = db.query(SeenPropertyDeletion.seen_property_id).filter(
+        SeenPropertyDeletion.crm_owner_id == current_user.id,
+        SeenPropertyDeletion.id > max_deletion
+    ).order_by(SeenPropertyDeletion.id).all()
+    if any(prop_id == partitions.RESYNC_MARKER for prop_id, in deleted):
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail="Resync required")
+    added = db.query(SeenProperties).filter(
+        SeenProperties.crm_owner_id == current_user.id,
+        SeenProperties.id > max_id
+    ).order_by(SeenProperties.id).all()
+    return ORJSONResponse({
+        "version": version,
+        "added": [seen_property_dict(prop) for prop in added],
+        "deleted": [prop_id for prop_id, in deleted if prop_id <= max_id]
+    })
 
 @app.get("/seen_properties/stats")
-def get_seen_properties_stats(current_user: CrmOwner = Depends(get_current_user), db: Session = Depends(get_db)):
-    total_properties = db.query(SeenProperties).filter(
-        SeenProperties.crm_owner_id == current_user.id
-    ).count()
+async def get_seen_properties_stats(
+    request: Request,
+    response: Response,
+    current_user: CrmOwner = Depends(get_current_user)
+):
+    return await run_read(seen_properties_stats, request, response, current_user)
+
+def seen_properties_stats(db: Session, request: Request, response: Response, current_user: CrmOwner):
+    now = datetime.utcnow()
+    # The recent-* windows move with the date, so the tag does too.
+    not_modified = conditional_headers(
+        request, response,
+        f'W/"stats-{current_user.id}-{seen_properties_version(db, current_user.id)}-{now.date().isoformat()}"'
+    )
+    if not_modified:
+        return not_modified
+    rows = read_owner_rollup(db, current_user.id, now - timedelta(days=7), now - timedelta(days=30))
+    
+    total_properties = next(row.count for row in rows if row.dimension == "total")
     
     # Get properties by state
-    state_stats = db.execute(text("""
-        SELECT state, COUNT(*) as count 
-        FROM seen_properties 
-        WHERE crm_owner_id = :user_id AND state IS NOT NULL
-        GROUP BY state
-        ORDER BY count DESC
-    """), {"user_id": current_user.id}).fetchall()
-    
-    # Recent properties added to system (last 7 days) - use created_at
-    recent_properties = db.execute(text("""
-        SELECT COUNT(*) as count
-        FROM seen_properties 
-        WHERE crm_owner_id = :user_id 
-        AND created_at >= NOW() - INTERVAL '7 days'
-    """), {"user_id": current_user.id}).fetchone()
-    
-    # Properties with recent contracts (last 30 days) - use contract_date
-    recent_contracts = db.execute(text("""
-        SELECT COUNT(*) as count
-        FROM seen_properties 
-        WHERE crm_owner_id = :user_id 
-        AND contract_date IS NOT NULL
-        AND contract_date >= NOW() - INTERVAL '30 days'
-    """), {"user_id": current_user.id}).fetchone()
+    state_stats = sorted(
+        (row for row in rows if row.dimension == "state" and row.count > 0),
+        key=lambda row: (-row.count, row.key1)
+    )
     
     return {
         "total_properties": total_properties,
-        "recent_properties": recent_properties.count if recent_properties else 0,
-        "recent_contracts": recent_contracts.count if recent_contracts else 0,
-        "state_breakdown": [{"state": row.state, "count": row.count} for row in state_stats]
+        # Recent properties added to system (last 7 days) - use created_at
+        "recent_properties": sum_since(rows, "created_day", now - timedelta(days=7)),
+        # Properties with recent contracts (last 30 days) - use contract_date
+        "recent_contracts": sum_since(rows, "contract_day", now - timedelta(days=30)),
+        "state_breakdown": [{"state": row.key1, "count": row.count} for row in state_stats]
     }
 
-# endpoint to filter by contract_date when specified
-@app.get("/seen_properties/paginated")
-def get_seen_properties_paginated(
-    page: int = 1,
-    page_size: int = 20,
+def encode_page_cursor(prop) -> str:
+    """Opaque cursor pointing just after `prop` in contract_date/created_at/id order."""
+    payload = [
+        prop.contract_date.isoformat() if prop.contract_date else None,
+        prop.created_at.isoformat() if prop.created_at else None,
+        prop.id,
+    ]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+def decode_page_cursor(cursor: str):
+    """(contract_date, created_at, id) from `encode_page_cursor`, or HTTP 400."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        contract_date, created_at, prop_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return (
+            datetime.fromisoformat(contract_date) if contract_date else None,
+            datetime.fromisoformat(created_at),
+            int(prop_id),
+        )
+    except (ValueError, TypeError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def keyset_page(query, cursor: Optional[str], page_size: int):
+    """
+    One page of `query` in contract_date DESC NULLS LAST, created_at DESC, id DESC
+    order, starting after `cursor` ("" for the first page). Rows with a contract
+    date and rows without one are read as two index range scans, so the cost of
+    a page does not depend on how deep it is. Returns (rows, next_cursor).
+    """
+    limit = page_size + 1
+    after = decode_page_cursor(cursor) if cursor else None
+    rows = []
+
+    if after is None or after[0] is not None:
+        dated = query.filter(SeenProperties.contract_date.isnot(None))
+        if after is not None:
+            dated = dated.filter(
+                tuple_(SeenProperties.contract_date, SeenProperties.created_at, SeenProperties.id) < after
+            )
+        rows = dated.order_by(
+            SeenProperties.contract_date.desc(), SeenProperties.created_at.desc(), SeenProperties.id.desc()
+        ).limit(limit).all()
+
+    if len(rows) < limit:
+        undated = query.filter(SeenProperties.contract_date.is_(None))
+        if after is not None and after[0] is None:
+            undated = undated.filter(tuple_(SeenProperties.created_at, SeenProperties.id) < after[1:])
+        rows += undated.order_by(
+            SeenProperties.created_at.desc(), SeenProperties.id.desc()
+        ).limit(limit - len(rows)).all()
+
+    has_next = len(rows) > page_size
+    rows = rows[:page_size]
+    return rows, (encode_page_cursor(rows[-1]) if has_next else None)
+
+def contains_pattern(term: str) -> str:
+    """ILIKE pattern (with ESCAPE '\\') matching `term` anywhere; %, _ and \\ in it match literally."""
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+def filter_seen_properties(
+    query,
+    owner_id: int,
     state: str = None,
     county: str = None,
     days_back: int = None,
-    contract_days_back: int = None,  # New parameter for filtering by contract_date
-    current_user: CrmOwner = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    contract_days_back: int = None
 ):
     """
-    Get seen properties with pagination and filtering options.
+    Restrict `query` (an ORM query or a select()) to the owner's matches and
+    the /seen_properties/paginated filters.
     """
-    query = db.query(SeenProperties).filter(
-        SeenProperties.crm_owner_id == current_user.id
-    )
-    
+    query = query.where(SeenProperties.crm_owner_id == owner_id)
+
     # Apply filters
     if state:
-        query = query.filter(SeenProperties.state.ilike(f"%{state}%"))
-    
+        query = query.where(SeenProperties.state.ilike(contains_pattern(state), escape="\\"))
+
     if county:
-        query = query.filter(SeenProperties.county.ilike(f"%{county}%"))
-    
+        query = query.where(SeenProperties.county.ilike(contains_pattern(county), escape="\\"))
+
     # Filter by when property was added to system
     if days_back:
         cutoff_date = datetime.utcnow() - timedelta(days=days_back)
-        query = query.filter(SeenProperties.created_at >= cutoff_date)
-    
+        query = query.where(SeenProperties.created_at >= cutoff_date)
+
     # Filter by contract date
     if contract_days_back:
         cutoff_date = datetime.utcnow() - timedelta(days=contract_days_back)
-        query = query.filter(
+        query = query.where(
             SeenProperties.contract_date.isnot(None),
             SeenProperties.contract_date >= cutoff_date
         )
+    return query
+
+# endpoint to filter by contract_date when specified
+@app.get("/seen_properties/paginated", response_class=ORJSONResponse)
+async def get_seen_properties_paginated(
+    page: int = 1,
+    page_size: int = 20,
+    state: str = None,
+    county: str = None,
+    days_back: int = None,
+    contract_days_back: int = None,  # New parameter for filtering by contract_date
+    cursor: Optional[str] = None,  # Keyset mode: "" for the first page, then pagination.next_cursor
+    include_total: bool = False,  # Keyset mode: count matching rows even when filters are set
+    current_user: CrmOwner = Depends(get_current_user)
+):
+    return ORJSONResponse(await run_read(
+        seen_properties_paginated, current_user,
+        page=page, page_size=page_size, state=state, county=county, days_back=days_back,
+        contract_days_back=contract_days_back, cursor=cursor, include_total=include_total
+    ))
+
+def seen_properties_paginated(
+    db: Session,
+    current_user: CrmOwner,
+    page: int = 1,
+    page_size: int = 20,
+    state: str = None,
+    county: str = None,
+    days_back: int = None,
+    contract_days_back: int = None,
+    cursor: Optional[str] = None,
+    include_total: bool = False
+):
+    """
+    Get seen properties with pagination and filtering options.
+
+    Without `cursor` this is the original page-number mode (OFFSET + total count).
+    Passing `cursor` switches to keyset mode: pages are fetched after an opaque
+    cursor, so deep pages cost the same as the first one. The total comes from
+    the owner_stats rollup when no filters are set, and is otherwise only
+    counted when `include_total` is true.
+    """
+    query = filter_seen_properties(
+        db.query(SeenProperties), current_user.id,
+        state=state, county=county, days_back=days_back, contract_days_back=contract_days_back
+    )
+    filtered = bool(state or county or days_back or contract_days_back)
+
+    if cursor is not None:
+        # Totals first: building a missing rollup commits, which would expire the page rows.
+        total = None
+        if include_total:
+            total = query.count()
+        elif not filtered:
+            ensure_owner_stats(db, [current_user.id])
+            total = owner_stats_totals(db, [current_user.id])[0]
+        properties, next_cursor = keyset_page(query, cursor, page_size)
+        return {
+            "properties": [seen_property_dict(prop) for prop in properties],
+            "pagination": {
+                "page_size": page_size,
+                "next_cursor": next_cursor,
+                "has_next": next_cursor is not None,
+                "total": total
+            }
+        }
     
     # Get total count
     total = query.count()
@@ -791,11 +1844,12 @@ def get_seen_properties_paginated(
     # Apply pagination - order by contract_date first (most recent contracts), then created_at
     properties = query.order_by(
         SeenProperties.contract_date.desc().nulls_last(),
-        SeenProperties.created_at.desc()
+        SeenProperties.created_at.desc(),
+        SeenProperties.id.desc()
     ).offset((page - 1) * page_size).limit(page_size).all()
     
     return {
-        "properties": properties,
+        "properties": [seen_property_dict(prop) for prop in properties],
         "pagination": {
             "page": page,
             "page_size": page_size,
@@ -806,110 +1860,246 @@ def get_seen_properties_paginated(
         }
     }
 
+# Matches export
+EXPORT_TOKEN_SECONDS = int(os.getenv("EXPORT_TOKEN_SECONDS", "60"))
+EXPORT_CHUNK_BYTES = 64 * 1024
+XLSX_MAX_ROWS = 1_048_576  # Excel's limit per sheet, header row included
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+optional_security = HTTPBearer(auto_error=False)
+
+def create_export_token(user_id: int) -> str:
+    """Short-lived token that only authorizes /seen_properties/export, for plain download links."""
+    expire = datetime.utcnow() + timedelta(seconds=EXPORT_TOKEN_SECONDS)
+    return jwt.encode({"export_user_id": user_id, "exp": expire}, JWT_SECRET_KEY, algorithm=JWT_ALGORITHM)
+
+def get_export_user(
+    token: Optional[str] = None,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+    db: Session = Depends(get_db)
+):
+    """The user from the Authorization header, or from an export token passed as `?token=`."""
+    if credentials is not None:
+        return get_current_user(credentials, db)
+    if not token:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    user_id = verify_token(token).get("export_user_id")
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Invalid export token")
+    return cached_principal(db, "user", user_id, load_user)
+
+def csv_chunks(batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(SEEN_PROPERTY_FIELDS)
+    yield buffer.getvalue().encode()
+    for batch in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(batch)
+        yield buffer.getvalue().encode()
+
+def xlsx_cell(value):
+    # Control characters are not allowed in XLSX and would fail the whole export.
+    return ILLEGAL_CHARACTERS_RE.sub("", value) if isinstance(value, str) else value
+
+def xlsx_chunks(batches):
+    """
+    An XLSX workbook of the rows. openpyxl's write-only mode spools rows to a
+    temporary file instead of keeping them in memory; the file can only be
+    sent once the workbook is complete. Rows past Excel's sheet limit continue
+    on further sheets.
+    """
+    workbook = Workbook(write_only=True)
+    sheet, sheet_rows = None, XLSX_MAX_ROWS
+    for batch in batches:
+        for row in batch:
+            if sheet_rows >= XLSX_MAX_ROWS:
+                sheet = workbook.create_sheet(f"Matches {len(workbook.worksheets) + 1}" if sheet else "Matches")
+                sheet.append(SEEN_PROPERTY_FIELDS)
+                sheet_rows = 1
+            sheet.append([xlsx_cell(value) for value in row])
+            sheet_rows += 1
+    if sheet is None:
+        workbook.create_sheet("Matches").append(SEEN_PROPERTY_FIELDS)
+    with tempfile.TemporaryFile() as f:
+        workbook.save(f)
+        f.seek(0)
+        while chunk := f.read(EXPORT_CHUNK_BYTES):
+            yield chunk
+
+@app.post("/seen_properties/export/token")
+def create_seen_properties_export_token(current_user: CrmOwner = Depends(get_current_user)):
+    """A token for /seen_properties/export?token=..., valid for EXPORT_TOKEN_SECONDS."""
+    return {"token": create_export_token(current_user.id), "expires_in": EXPORT_TOKEN_SECONDS}
+
+@app.get("/seen_properties/export")
+def export_seen_properties(
+    format: str = "csv",  # "csv", "json", "ndjson" or "xlsx"
+    state: str = None,
+    county: str = None,
+    days_back: int = None,
+    contract_days_back: int = None,
+    current_user: CrmOwner = Depends(get_export_user)
+):
+    """
+    Download the user's matches with the /seen_properties/paginated filters and
+    ordering. Rows are streamed from a server-side cursor as they are read, so
+    an export of any size uses constant memory; browsers can save it straight
+    to disk by linking here with a token from /seen_properties/export/token.
+    """
+    if format not in EXPORT_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail="format must be 'csv', 'json', 'ndjson' or 'xlsx'")
+    statement = filter_seen_properties(
+        seen_property_columns(), current_user.id,
+        state=state, county=county, days_back=days_back, contract_days_back=contract_days_back
+    ).order_by(
+        SeenProperties.contract_date.desc().nulls_last(),
+        SeenProperties.created_at.desc(),
+        SeenProperties.id.desc()
+    )
+    chunks = {
+        "csv": csv_chunks,
+        "json": json_array_chunks,
+        "ndjson": ndjson_chunks,
+        "xlsx": xlsx_chunks,
+    }[format](seen_property_batches(statement))
+    filename = f"properties_export_{datetime.utcnow().date().isoformat()}.{format}"
+    return StreamingResponse(
+        chunks,
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"', "Cache-Control": "no-store"},
+    )
+
+# Match search
+SEARCH_MIN_LENGTH = 3  # shorter terms have no trigrams to look up
+SEARCH_MAX_LIMIT = 100
+
+@app.get("/seen_properties/search", response_class=ORJSONResponse)
+async def get_seen_properties_search(
+    q: str,
+    limit: int = 20,
+    current_user: CrmOwner = Depends(get_current_user)
+):
+    return ORJSONResponse(await run_read(search_seen_properties, current_user, q, limit, replica=True))
+
+def search_seen_properties(db: Session, current_user: CrmOwner, q: str, limit: int = 20):
+    """
+    The user's matches whose owner name, seller name or street address contains
+    `q` (case-insensitive), newest first. Selective terms are looked up in
+    ix_seen_properties_search_trgm; for terms most of the owner's rows contain,
+    the planner walks ix_seen_properties_owner_created instead and stops after
+    `limit` rows, so neither case reads the owner's whole history.
+    """
+    term = q.strip()
+    if len(term) < SEARCH_MIN_LENGTH:
+        raise HTTPException(status_code=400, detail=f"Search term must be at least {SEARCH_MIN_LENGTH} characters")
+    limit = max(1, min(limit, SEARCH_MAX_LIMIT))
+    rows = db.execute(
+        seen_property_columns()
+        .where(
+            SeenProperties.crm_owner_id == current_user.id,
+            literal_column(SEEN_PROPERTY_SEARCH_SQL, String).ilike(contains_pattern(term), escape="\\")
+        )
+        .order_by(SeenProperties.created_at.desc(), SeenProperties.id.desc())
+        .limit(limit)
+    ).all()
+    return {"query": term, "properties": [seen_property_dict(row) for row in rows]}
+
 # endpoint to provide better insights
 @app.get("/seen_properties/analytics")
-def get_detailed_analytics(
-    current_user: CrmOwner = Depends(get_current_user),
-    db: Session = Depends(get_db)
+async def get_detailed_analytics(
+    request: Request,
+    response: Response,
+    current_user: CrmOwner = Depends(get_current_user)
 ):
+    return await run_read(detailed_analytics, request, response, current_user, replica=True)
+
+def detailed_analytics(db: Session, request: Request, response: Response, current_user: CrmOwner):
     """
     Get detailed analytics about seen properties.
+
+    Everything is computed from one read of the owner's owner_stats rows. The
+    ETag covers the owner's data version and the date, which moves the time
+    windows and ages.
     """
-    base_query = db.query(SeenProperties).filter(
-        SeenProperties.crm_owner_id == current_user.id
+    now = datetime.utcnow()
+    not_modified = conditional_headers(
+        request, response,
+        f'W/"analytics-{current_user.id}-{seen_properties_version(db, current_user.id)}-{now.date().isoformat()}"'
     )
+    if not_modified:
+        return not_modified
+    six_months_ago = _months_ago(now, 6)
+    rows = read_owner_rollup(db, current_user.id, min(six_months_ago, now - timedelta(days=90)), now - timedelta(days=90))
     
-    # Total properties
-    total_properties = base_query.count()
+    # Totals, contracts and contacts
+    total = next(row for row in rows if row.dimension == "total")
+    total_properties = total.count
+    properties_with_contracts = total.with_contracts
+    properties_with_contacts = total.with_contacts
     
     # Properties added to system by time periods (created_at)
-    now = datetime.utcnow()
-    last_7_days = base_query.filter(SeenProperties.created_at >= now - timedelta(days=7)).count()
-    last_30_days = base_query.filter(SeenProperties.created_at >= now - timedelta(days=30)).count()
-    last_90_days = base_query.filter(SeenProperties.created_at >= now - timedelta(days=90)).count()
+    last_7_days = sum_since(rows, "created_day", now - timedelta(days=7))
+    last_30_days = sum_since(rows, "created_day", now - timedelta(days=30))
+    last_90_days = sum_since(rows, "created_day", now - timedelta(days=90))
     
     # Contract-based analytics (contract_date)
-    properties_with_contracts = base_query.filter(SeenProperties.contract_date.isnot(None)).count()
-    recent_contracts_30_days = base_query.filter(
-        SeenProperties.contract_date.isnot(None),
-        SeenProperties.contract_date >= now - timedelta(days=30)
-    ).count()
-    recent_contracts_60_days = base_query.filter(
-        SeenProperties.contract_date.isnot(None),
-        SeenProperties.contract_date >= now - timedelta(days=60)
-    ).count()
-    
-    # State breakdown with contract insights
-    state_stats = db.execute(text("""
-        SELECT 
-            state, 
-            COUNT(*) as count,
-            COUNT(DISTINCT county) as unique_counties,
-            AVG(EXTRACT(DAY FROM (NOW() - created_at))) as avg_days_in_system,
-            COUNT(CASE WHEN contract_date IS NOT NULL THEN 1 END) as properties_with_contracts,
-            AVG(CASE WHEN contract_date IS NOT NULL 
-                THEN EXTRACT(DAY FROM (NOW() - contract_date)) 
-                END) as avg_contract_days_old
-        FROM seen_properties 
-        WHERE crm_owner_id = :user_id AND state IS NOT NULL
-        GROUP BY state
-        ORDER BY count DESC
-    """), {"user_id": current_user.id}).fetchall()
+    recent_contracts_30_days = sum_since(rows, "contract_day", now - timedelta(days=30))
+    recent_contracts_60_days = sum_since(rows, "contract_day", now - timedelta(days=60))
+    recent_contracts_90_days = sum_since(rows, "contract_day", now - timedelta(days=90))
     
     # County breakdown
-    county_stats = db.execute(text("""
-        SELECT 
-            county,
-            state,
-            COUNT(*) as count,
-            COUNT(CASE WHEN contract_date IS NOT NULL THEN 1 END) as properties_with_contracts
-        FROM seen_properties 
-        WHERE crm_owner_id = :user_id AND county IS NOT NULL
-        GROUP BY county, state
-        ORDER BY count DESC
-        LIMIT 10
-    """), {"user_id": current_user.id}).fetchall()
+    county_rows = sorted(
+        (row for row in rows if row.dimension == "county" and row.count > 0),
+        key=lambda row: (-row.count, row.key1)
+    )
+    county_stats = county_rows[:10]
+    
+    # State breakdown with contract insights
+    counties_per_state = {}
+    for row in county_rows:
+        counties_per_state[row.key2] = counties_per_state.get(row.key2, 0) + 1
+    state_stats = [
+        {
+            "state": row.key1,
+            "count": row.count,
+            "unique_counties": counties_per_state.get(row.key1, 0),
+            "avg_days_in_system": average_age_days(row.created_epoch_sum, row.count),
+            "properties_with_contracts": row.with_contracts,
+            "avg_contract_days_old": average_age_days(row.contract_epoch_sum, row.with_contracts),
+        }
+        for row in sorted(
+            (row for row in rows if row.dimension == "state" and row.count > 0),
+            key=lambda row: (-row.count, row.key1)
+        )
+    ]
     
     # Monthly trend for properties added to system (created_at)
-    monthly_stats = db.execute(text("""
-        SELECT 
-            DATE_TRUNC('month', created_at) as month,
-            COUNT(*) as count
-        FROM seen_properties 
-        WHERE crm_owner_id = :user_id 
-        AND created_at >= NOW() - INTERVAL '6 months'
-        GROUP BY DATE_TRUNC('month', created_at)
-        ORDER BY month DESC
-    """), {"user_id": current_user.id}).fetchall()
+    by_month = {}
+    six_months_key = _day_key(six_months_ago)
+    for row in rows:
+        if row.dimension == "created_day" and row.key1 >= six_months_key and row.count:
+            by_month[row.key1[:7]] = by_month.get(row.key1[:7], 0) + row.count
+    monthly_stats = [{"month": month, "count": count} for month, count in sorted(by_month.items(), reverse=True)]
     
     # Contract date distribution
-    contract_age_stats = db.execute(text("""
-        SELECT 
-            CASE 
-                WHEN contract_date IS NULL THEN 'No Contract Date'
-                WHEN contract_date >= NOW() - INTERVAL '30 days' THEN 'Last 30 Days'
-                WHEN contract_date >= NOW() - INTERVAL '60 days' THEN '31-60 Days'
-                WHEN contract_date >= NOW() - INTERVAL '90 days' THEN '61-90 Days'
-                ELSE 'Over 90 Days'
-            END as age_group,
-            COUNT(*) as count
-        FROM seen_properties 
-        WHERE crm_owner_id = :user_id
-        GROUP BY 
-            CASE 
-                WHEN contract_date IS NULL THEN 'No Contract Date'
-                WHEN contract_date >= NOW() - INTERVAL '30 days' THEN 'Last 30 Days'
-                WHEN contract_date >= NOW() - INTERVAL '60 days' THEN '31-60 Days'
-                WHEN contract_date >= NOW() - INTERVAL '90 days' THEN '61-90 Days'
-                ELSE 'Over 90 Days'
-            END
-        ORDER BY count DESC
-    """), {"user_id": current_user.id}).fetchall()
-    
-    # Properties with contact info
-    properties_with_contacts = base_query.filter(
-        SeenProperties.contact_email.isnot(None)
-    ).count()
+    age_groups = {
+        "No Contract Date": total_properties - properties_with_contracts,
+        "Last 30 Days": recent_contracts_30_days,
+        "31-60 Days": recent_contracts_60_days - recent_contracts_30_days,
+        "61-90 Days": recent_contracts_90_days - recent_contracts_60_days,
+        "Over 90 Days": properties_with_contracts - recent_contracts_90_days,
+    }
+    contract_age_stats = sorted(
+        ((age_group, count) for age_group, count in age_groups.items() if count > 0),
+        key=lambda item: item[1], reverse=True
+    )
     
     return {
         "summary": {
@@ -926,37 +2116,31 @@ def get_detailed_analytics(
         },
         "state_breakdown": [
             {
-                "state": row.state,
-                "count": row.count,
-                "unique_counties": row.unique_counties,
-                "avg_days_in_system": round(row.avg_days_in_system, 1) if row.avg_days_in_system else 0,
-                "properties_with_contracts": row.properties_with_contracts,
-                "avg_contract_days_old": round(row.avg_contract_days_old, 1) if row.avg_contract_days_old else 0
+                "state": row["state"],
+                "count": row["count"],
+                "unique_counties": row["unique_counties"],
+                "avg_days_in_system": round(row["avg_days_in_system"], 1) if row["avg_days_in_system"] else 0,
+                "properties_with_contracts": row["properties_with_contracts"],
+                "avg_contract_days_old": round(row["avg_contract_days_old"], 1) if row["avg_contract_days_old"] else 0
             }
             for row in state_stats
         ],
         "top_counties": [
             {
-                "county": row.county,
-                "state": row.state,
+                "county": row.key1,
+                "state": row.key2 or None,
                 "count": row.count,
-                "properties_with_contracts": row.properties_with_contracts
+                "properties_with_contracts": row.with_contracts
             }
             for row in county_stats
         ],
-        "monthly_trend": [
-            {
-                "month": row.month.strftime("%Y-%m") if row.month else None,
-                "count": row.count
-            }
-            for row in monthly_stats
-        ],
+        "monthly_trend": monthly_stats,
         "contract_age_distribution": [
             {
-                "age_group": row.age_group,
-                "count": row.count
+                "age_group": age_group,
+                "count": count
             }
-            for row in contract_age_stats
+            for age_group, count in contract_age_stats
         ]
     }
 
@@ -979,6 +2163,11 @@ def delete_seen_property(
         raise HTTPException(status_code=404, detail="Property not found or doesn't belong to you")
     
     try:
+        apply_owner_stats_deltas(db, current_user.id, owner_stats_deltas(
+            current_user.id, property.state, property.county, property.contact_email,
+            property.created_at, property.contract_date, sign=-1
+        ))
+        record_seen_property_deletion(db, property)
         db.delete(property)
         db.commit()
         return {"message": "Property deleted successfully"}
@@ -987,10 +2176,10 @@ def delete_seen_property(
         raise HTTPException(status_code=500, detail="Failed to delete property")
 
 @app.get("/user/activity-summary")
-def get_user_activity_summary(
-    current_user: CrmOwner = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
+async def get_user_activity_summary(current_user: CrmOwner = Depends(get_current_user)):
+    return await run_read(user_activity_summary, current_user)
+
+def user_activity_summary(db: Session, current_user: CrmOwner):
     """
     Get a summary of user's recent activity and system status.
     """
@@ -1071,12 +2260,16 @@ async def general_exception_handler(request: Request, exc: Exception):
 @app.post("/admin/login", response_model=AdminLoginResponse)
 def admin_login(admin_data: AdminLogin, db: Session = Depends(get_db)):
     admin = db.query(Admin).filter(Admin.username == admin_data.username).first()
-    if not admin or not verify_password(admin_data.password, admin.password) or not admin.is_active:
+    valid, new_hash = check_login(f"admin:{admin_data.username}", admin_data.password, admin.password if admin else None)
+    if not valid or not admin.is_active:
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    if new_hash:
+        admin.password = new_hash
 
     # Update last login
     admin.last_login = datetime.utcnow()
     db.commit()
+    principal_cache.invalidate("admin", admin.id)
     
     access_token = create_admin_token(data={"admin_id": admin.id})
     return {
@@ -1090,7 +2283,7 @@ def get_current_admin_info(current_admin: Admin = Depends(get_current_admin)):
     return current_admin
 
 # User management endpoints
-@app.get("/admin/users")
+@app.get("/admin/users", response_class=ORJSONResponse)
 def get_all_users(
     page: int = 1,
     page_size: int = 20,
@@ -1101,39 +2294,49 @@ def get_all_users(
 ):
     query = db.query(CrmOwner)
     
+    # Substring matches, served by the ix_crm_owners_*_trgm indexes on Postgres.
     if search:
+        pattern = contains_pattern(search)
         query = query.filter(
-            CrmOwner.name.ilike(f"%{search}%") | 
-            CrmOwner.email.ilike(f"%{search}%")
+            CrmOwner.name.ilike(pattern, escape="\\") |
+            CrmOwner.email.ilike(pattern, escape="\\")
         )
     
     if company:
-        query = query.filter(CrmOwner.companycode.ilike(f"%{company}%"))
+        query = query.filter(CrmOwner.companycode.ilike(contains_pattern(company), escape="\\"))
     
     total = query.count()
-    users = query.offset((page - 1) * page_size).limit(page_size).all()
-    
-    # Add detailed property stats for each user
+
+    # One round trip for the page: the page of owners LEFT JOINed to their
+    # property counts, aggregated only over the owners on this page.
+    page_subquery = query.order_by(CrmOwner.id).offset((page - 1) * page_size).limit(page_size).subquery()
+    page_user = aliased(CrmOwner, page_subquery)
+    thirty_days_ago = datetime.utcnow() - timedelta(days=30)
+    property_stats = (
+        db.query(
+            SeenProperties.crm_owner_id.label("crm_owner_id"),
+            func.count().label("total_properties"),
+            func.count().filter(SeenProperties.created_at >= thirty_days_ago).label("recent_properties"),
+            func.count().filter(SeenProperties.contract_date.isnot(None)).label("properties_with_contracts"),
+        )
+        .filter(SeenProperties.crm_owner_id.in_(select(page_subquery.c.id)))
+        .group_by(SeenProperties.crm_owner_id)
+        .subquery()
+    )
+    rows = (
+        db.query(
+            page_user,
+            func.coalesce(property_stats.c.total_properties, 0),
+            func.coalesce(property_stats.c.recent_properties, 0),
+            func.coalesce(property_stats.c.properties_with_contracts, 0),
+        )
+        .outerjoin(property_stats, property_stats.c.crm_owner_id == page_user.id)
+        .order_by(page_user.id)
+        .all()
+    )
+
     users_with_properties = []
-    for user in users:
-        # Total properties
-        total_properties = db.query(SeenProperties).filter(
-            SeenProperties.crm_owner_id == user.id
-        ).count()
-        
-        # Recent properties (last 30 days)
-        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        recent_properties = db.query(SeenProperties).filter(
-            SeenProperties.crm_owner_id == user.id,
-            SeenProperties.created_at >= thirty_days_ago
-        ).count()
-        
-        # Properties with contracts
-        properties_with_contracts = db.query(SeenProperties).filter(
-            SeenProperties.crm_owner_id == user.id,
-            SeenProperties.contract_date.isnot(None)
-        ).count()
-        
+    for user, total_properties, recent_properties, properties_with_contracts in rows:
         user_dict = {
             "id": user.id,
             "name": user.name,
@@ -1147,7 +2350,7 @@ def get_all_users(
         }
         users_with_properties.append(user_dict)
     
-    return {
+    return ORJSONResponse({
         "users": users_with_properties,
         "pagination": {
             "page": page,
@@ -1157,7 +2360,7 @@ def get_all_users(
             "has_next": page * page_size < total,
             "has_prev": page > 1
         }
-    }
+    })
 
 @app.get("/admin/companies")
 def get_all_companies(current_admin: Admin = Depends(get_current_admin), db: Session = Depends(get_db)):
@@ -1178,11 +2381,16 @@ def get_all_companies(current_admin: Admin = Depends(get_current_admin), db: Ses
     return company_stats
 
 @app.get("/admin/stats")
-def get_admin_stats(current_admin: Admin = Depends(get_current_admin), db: Session = Depends(get_db)):
+async def get_admin_stats(current_admin: Admin = Depends(get_current_admin)):
+    return await run_read(admin_stats, replica=True)
+
+def admin_stats(db: Session):
     # Basic counts
     total_users = db.query(CrmOwner).count()
     total_companies = db.query(Company).count()
-    total_properties = db.query(SeenProperties).count()
+    # Property figures come from the rollups, with owners whose rollup is not built yet
+    # counted directly; `owner_stats_maintenance.py backfill` builds the missing ones.
+    properties = property_overview(db, months=6, state_limit=10)
     
     # Recent signups (last 30 days)
     thirty_days_ago = datetime.utcnow() - timedelta(days=30)
@@ -1197,37 +2405,16 @@ def get_admin_stats(current_admin: Admin = Depends(get_current_admin), db: Sessi
         LIMIT 10
     """)).fetchall()
     
-    # Properties by month (last 6 months)
-    properties_by_month = db.execute(text("""
-        SELECT 
-            DATE_TRUNC('month', created_at) as month,
-            COUNT(*) as count
-        FROM seen_properties 
-        WHERE created_at >= NOW() - INTERVAL '6 months'
-        GROUP BY DATE_TRUNC('month', created_at)
-        ORDER BY month DESC
-    """)).fetchall()
-    
-    # Top performing states
-    top_states = db.execute(text("""
-        SELECT state, COUNT(*) as count 
-        FROM seen_properties 
-        WHERE state IS NOT NULL
-        GROUP BY state
-        ORDER BY count DESC
-        LIMIT 10
-    """)).fetchall()
-    
     return {
         "overview": {
             "total_users": total_users,
             "total_companies": total_companies,
-            "total_properties": total_properties,
+            "total_properties": properties["total_properties"],
             "recent_signups": recent_signups
         },
         "users_by_company": [{"company": row.companycode, "count": row.count} for row in users_by_company],
-        "properties_by_month": [{"month": row.month.strftime("%Y-%m"), "count": row.count} for row in properties_by_month],
-        "top_states": [{"state": row.state, "count": row.count} for row in top_states]
+        "properties_by_month": properties["properties_by_month"],
+        "top_states": properties["top_states"]
     }
 
 @app.delete("/admin/users/{user_id}")
@@ -1243,12 +2430,15 @@ def delete_user(
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    # Delete associated seen properties
+    # Delete associated seen properties and their rollup
     db.query(SeenProperties).filter(SeenProperties.crm_owner_id == user_id).delete()
+    db.query(OwnerStats).filter(OwnerStats.crm_owner_id == user_id).delete()
+    db.query(SeenPropertyDeletion).filter(SeenPropertyDeletion.crm_owner_id == user_id).delete()
     
     # Delete user
     db.delete(user)
     db.commit()
+    principal_cache.invalidate("user", user_id)
     
     return {"message": "User deleted successfully"}
 
@@ -1267,6 +2457,7 @@ def toggle_user_status(
     # For now, we'll use a different approach
     
     db.commit()
+    principal_cache.invalidate("user", user_id)
     return {"message": "User status updated successfully"}
 
 
@@ -1278,8 +2469,12 @@ def toggle_user_status(
 def company_login(login_data: CompanyLogin, db: Session = Depends(get_db)):
     """Login endpoint for companies"""
     company = db.query(Company).filter(Company.companycode == login_data.companycode).first()
-    if not company or not verify_password(login_data.password, company.password):
+    valid, new_hash = check_login(f"company:{login_data.companycode}", login_data.password, company.password if company else None)
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid company code or password")
+    if new_hash:
+        company.password = new_hash
+        db.commit()
     
     access_token = create_company_token(data={"company_id": company.id})
     return {
@@ -1296,7 +2491,7 @@ def get_current_company_info(current_company: Company = Depends(get_current_comp
 @app.put("/company/me", response_model=CompanyOut)
 def update_current_company(
     company_update: CompanyUpdate,
-    current_company: Company = Depends(get_current_company),
+    current_company: Company = Depends(get_current_company_for_update),
     db: Session = Depends(get_db)
 ):
     """Update current company information"""
@@ -1324,6 +2519,8 @@ def update_current_company(
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail="Failed to update company")
+    finally:
+        principal_cache.invalidate("company", current_company.id)
     
     return current_company
 
@@ -1331,19 +2528,36 @@ def update_current_company(
 # COMPANY AGENT MANAGEMENT ENDPOINTS
 # =============================================================================
 
-@app.get("/company/agents", response_model=List[AgentOutForCompany])
+def company_agent_ids(companycode: str):
+    """SELECT of the ids of a company's agents, for use as an IN (...) subquery."""
+    return select(CrmOwner.id).where(CrmOwner.companycode == companycode)
+
+def company_agents_with_property_counts(db: Session, companycode: str):
+    """[(agent, property_count)] for every agent of a company, in a single query."""
+    property_counts = (
+        db.query(SeenProperties.crm_owner_id.label("crm_owner_id"), func.count().label("property_count"))
+        .filter(SeenProperties.crm_owner_id.in_(company_agent_ids(companycode)))
+        .group_by(SeenProperties.crm_owner_id)
+        .subquery()
+    )
+    return (
+        db.query(CrmOwner, func.coalesce(property_counts.c.property_count, 0))
+        .outerjoin(property_counts, property_counts.c.crm_owner_id == CrmOwner.id)
+        .filter(CrmOwner.companycode == companycode)
+        .order_by(CrmOwner.id)
+        .all()
+    )
+
+@app.get("/company/agents", response_model=List[AgentOutForCompany], response_class=ORJSONResponse)
 def get_company_agents(current_company: Company = Depends(get_current_company), db: Session = Depends(get_db)):
     """Get all agents belonging to the current company"""
     
-    # Get all agents for this company
-    agents = db.query(CrmOwner).filter(CrmOwner.companycode == current_company.companycode).all()
+    # Get all agents for this company, with their property counts
+    agents = company_agents_with_property_counts(db, current_company.companycode)
     
     # Add additional information for each agent
     agents_with_stats = []
-    for agent in agents:
-        # Count properties for this agent
-        property_count = db.query(SeenProperties).filter(SeenProperties.crm_owner_id == agent.id).count()
-        
+    for agent, property_count in agents:
         # Count assigned states
         assigned_states = len(agent.states_counties) if agent.states_counties else 0
 
@@ -1362,7 +2576,10 @@ def get_company_agents(current_company: Company = Depends(get_current_company),
         }
         agents_with_stats.append(agent_dict)
     
-    return agents_with_stats
+    # Validated and filtered by the response model, then serialized by orjson
+    # instead of going through jsonable_encoder.
+    agents_out = AgentsOutForCompany.validate_python(agents_with_stats)
+    return ORJSONResponse(AgentsOutForCompany.dump_python(agents_out))
 
 @app.post("/company/agents", response_model=AgentOutForCompany)
 def create_company_agent(
@@ -1379,22 +2596,7 @@ def create_company_agent(
     
     # Validate states and counties if provided
     if agent_data.states_counties:
-        for state_county in agent_data.states_counties:
-            # Verify state exists
-            state_exists = db.query(StatesCounties).filter(
-                StatesCounties.statefips == str(state_county.state_FIPS)
-            ).first()
-            if not state_exists:
-                raise HTTPException(status_code=400, detail=f"Invalid state FIPS: {state_county.state_FIPS}")
-            
-            # Verify counties exist
-            for county in state_county.counties:
-                county_exists = db.query(StatesCounties).filter(
-                    StatesCounties.statefips == str(state_county.state_FIPS),
-                    StatesCounties.countyfips == str(county.county_FIPS)
-                ).first()
-                if not county_exists:
-                    raise HTTPException(status_code=400, detail=f"Invalid county FIPS: {county.county_FIPS} for state: {state_county.state_FIPS}")
+        validate_states_counties(agent_data.states_counties)
     
     # Create new agent
     db_agent = CrmOwner(
@@ -1469,20 +2671,7 @@ def update_company_agent(
     # Update states_counties if provided
     if agent_update.states_counties is not None:
         # Validate states and counties
-        for state_county in agent_update.states_counties:
-            state_exists = db.query(StatesCounties).filter(
-                StatesCounties.statefips == str(state_county.state_FIPS)
-            ).first()
-            if not state_exists:
-                raise HTTPException(status_code=400, detail=f"Invalid state FIPS: {state_county.state_FIPS}")
-            
-            for county in state_county.counties:
-                county_exists = db.query(StatesCounties).filter(
-                    StatesCounties.statefips == str(state_county.state_FIPS),
-                    StatesCounties.countyfips == str(county.county_FIPS)
-                ).first()
-                if not county_exists:
-                    raise HTTPException(status_code=400, detail=f"Invalid county FIPS: {county.county_FIPS} for state: {state_county.state_FIPS}")
+        validate_states_counties(agent_update.states_counties)
 
         agent.states_counties = [sc.dict() for sc in agent_update.states_counties]
     
@@ -1493,6 +2682,8 @@ def update_company_agent(
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail="Failed to update agent")
+    finally:
+        principal_cache.invalidate("user", agent_id)
     
     # Return updated agent with stats
     property_count = db.query(SeenProperties).filter(SeenProperties.crm_owner_id == agent.id).count()
@@ -1529,12 +2720,15 @@ def delete_company_agent(
     if not agent:
         raise HTTPException(status_code=404, detail="Agent not found or doesn't belong to your company")
     
-    # Delete associated seen properties
+    # Delete associated seen properties and their rollup
     db.query(SeenProperties).filter(SeenProperties.crm_owner_id == agent_id).delete()
+    db.query(OwnerStats).filter(OwnerStats.crm_owner_id == agent_id).delete()
+    db.query(SeenPropertyDeletion).filter(SeenPropertyDeletion.crm_owner_id == agent_id).delete()
     
     # Delete the agent
     db.delete(agent)
     db.commit()
+    principal_cache.invalidate("user", agent_id)
     
     return {"message": "Agent deleted successfully"}
 
@@ -1559,6 +2753,7 @@ def toggle_agent_status(
     # For now, this endpoint exists but doesn't actually toggle anything
     # agent.is_active = not agent.is_active
     # db.commit()
+    principal_cache.invalidate("user", agent_id)
     
     return {"message": "Agent status toggled successfully"}
 
@@ -1567,34 +2762,28 @@ def toggle_agent_status(
 # =============================================================================
 
 @app.get("/company/stats", response_model=CompanyStats)
-def get_company_stats(current_company: Company = Depends(get_current_company), db: Session = Depends(get_db)):
+async def get_company_stats(current_company: Company = Depends(get_current_company)):
+    return await run_read(company_stats, current_company)
+
+def company_stats(db: Session, current_company: Company):
     """Get company statistics"""
     
-    # Get all agents for this company
-    agents = db.query(CrmOwner).filter(CrmOwner.companycode == current_company.companycode).all()
-    total_agents = len(agents)
+    # Count the company's agents
+    total_agents = db.query(func.count(CrmOwner.id)).filter(
+        CrmOwner.companycode == current_company.companycode
+    ).scalar()
     active_agents = total_agents  # Placeholder - you may want to add is_active field
     
-    # Get total properties for all company agents
-    agent_ids = [agent.id for agent in agents]
-    total_properties = 0
-    if agent_ids:
-        total_properties = db.query(SeenProperties).filter(SeenProperties.crm_owner_id.in_(agent_ids)).count()
+    # Total and monthly (last 30 days) properties for all company agents, from the rollup
+    agent_ids = [row[0] for row in db.execute(company_agent_ids(current_company.companycode))]
+    ensure_owner_stats(db, agent_ids)
+    total_properties, _, _ = owner_stats_totals(db, agent_ids)
+    monthly_properties = owner_stats_windows(
+        db, agent_ids, "created_day", {"30d": datetime.utcnow() - timedelta(days=30)}
+    )["30d"]
     
-    # Get monthly properties (last 30 days)
-    thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-    monthly_properties = 0
-    if agent_ids:
-        monthly_properties = db.query(SeenProperties).filter(
-            SeenProperties.crm_owner_id.in_(agent_ids),
-            SeenProperties.created_at >= thirty_days_ago
-        ).count()
-    
-    # Recent signups (last 30 days) - placeholder
-    recent_signups = db.query(CrmOwner).filter(
-        CrmOwner.companycode == current_company.companycode
-        # Add created_at filter when you have the field
-    ).count()
+    # Recent signups (last 30 days) - placeholder until CrmOwner has a created_at field
+    recent_signups = total_agents
     
     return {
         "total_agents": total_agents,
@@ -1605,60 +2794,44 @@ def get_company_stats(current_company: Company = Depends(get_current_company), d
     }
 
 @app.get("/company/analytics", response_model=CompanyAnalytics)
-def get_company_analytics(current_company: Company = Depends(get_current_company), db: Session = Depends(get_db)):
+async def get_company_analytics(current_company: Company = Depends(get_current_company)):
+    return await run_read(company_analytics, current_company, replica=True)
+
+def company_analytics(db: Session, current_company: Company):
     """Get company analytics"""
     
     # Get all agents for this company
-    agents = db.query(CrmOwner).filter(CrmOwner.companycode == current_company.companycode).all()
+    agents = db.query(CrmOwner.id, CrmOwner.name).filter(
+        CrmOwner.companycode == current_company.companycode
+    ).order_by(CrmOwner.id).all()
     agent_ids = [agent.id for agent in agents]
+    ensure_owner_stats(db, agent_ids)
     
     # Top performing agents
+    property_counts = dict(owner_stats_query(
+        db, agent_ids, "total", OwnerStats.crm_owner_id, OwnerStats.count
+    ).all()) if agent_ids else {}
     top_agents = []
     for agent in agents:
-        property_count = db.query(SeenProperties).filter(SeenProperties.crm_owner_id == agent.id).count()
         top_agents.append({
             "id": agent.id,
             "name": agent.name,
-            "properties_count": property_count
+            "properties_count": property_counts.get(agent.id, 0)
         })
     
     # Sort by property count
     top_agents.sort(key=lambda x: x["properties_count"], reverse=True)
     
     # Properties by month (last 6 months)
-    properties_by_month = []
-    if agent_ids:
-        monthly_stats = db.execute(text("""
-            SELECT 
-                DATE_TRUNC('month', created_at) as month,
-                COUNT(*) as count
-            FROM seen_properties 
-            WHERE crm_owner_id = ANY(:agent_ids)
-            AND created_at >= NOW() - INTERVAL '6 months'
-            GROUP BY DATE_TRUNC('month', created_at)
-            ORDER BY month DESC
-        """), {"agent_ids": agent_ids}).fetchall()
-
-        properties_by_month = [
-            {
-                "month": row.month.strftime("%Y-%m") if row.month else None,
-                "count": row.count
-            }
-            for row in monthly_stats
-        ]
+    properties_by_month = owner_stats_monthly(db, agent_ids, months=6) if agent_ids else []
     
     # State breakdown
     state_breakdown = []
     if agent_ids:
-        state_stats = db.execute(text("""
-            SELECT state, COUNT(*) as count 
-            FROM seen_properties 
-            WHERE crm_owner_id = ANY(:agent_ids) AND state IS NOT NULL
-            GROUP BY state
-            ORDER BY count DESC
-        """), {"agent_ids": agent_ids}).fetchall()
-
-        state_breakdown = [{"state": row.state, "count": row.count} for row in state_stats]
+        state_breakdown = [
+            {"state": row.key1, "count": row.count}
+            for row in owner_stats_breakdown(db, agent_ids, "state")
+        ]
     
     # Performance metrics
     performance_metrics = {
@@ -1710,29 +2883,29 @@ async def submit_contact_form(contact_data: ContactForm):
         # Send email to your business email (you can set this as another env var)
         business_email = Admin_EMAIL  # or set BUSINESS_EMAIL env var
         
-        success = send_email(business_email, email_subject, email_body)
+        # Confirmation email to the customer, sent only once the business email has gone out
+        confirmation_subject = "Thank you for contacting RECT"
+        confirmation_body = f"""
+        <html>
+            <head></head>
+            <body>
+                <h2>Thank you for your message, {contact_data.name}!</h2>
+                <p>We've received your message and will get back to you soon.</p>
+                <p><strong>Your message:</strong></p>
+                <p>{contact_data.message.replace(chr(10), '<br>')}</p>
+                <hr>
+                <p>Best regards,<br>The RECT Team</p>
+            </body>
+        </html>
+        """
+
+        # Delivery happens on the background mailer thread; respond without waiting on SMTP
+        mailer.send(
+            business_email, email_subject, email_body,
+            then=(contact_data.email, confirmation_subject, confirmation_body),
+        )
         
-        if success:
-            # Optionally send confirmation email to the customer
-            confirmation_subject = "Thank you for contacting RECT"
-            confirmation_body = f"""
-            <html>
-                <head></head>
-                <body>
-                    <h2>Thank you for your message, {contact_data.name}!</h2>
-                    <p>We've received your message and will get back to you soon.</p>
-                    <p><strong>Your message:</strong></p>
-                    <p>{contact_data.message.replace(chr(10), '<br>')}</p>
-                    <hr>
-                    <p>Best regards,<br>The RECT Team</p>
-                </body>
-            </html>
-            """
-            send_email(contact_data.email, confirmation_subject, confirmation_body)
-            
-            return {"message": "Message sent successfully", "success": True}
-        else:
-            raise HTTPException(status_code=500, detail="Failed to send message")
+        return {"message": "Message sent successfully", "success": True}
             
     except ValueError as ve:
         print(f"Validation error: {ve}")
@@ -1787,30 +2960,34 @@ def get_system_health(current_admin: Admin = Depends(get_current_admin), db: Ses
         )
 
 
+def health_counts(db: Session) -> dict:
+    return {
+        "total_users": db.query(CrmOwner).count(),
+        "total_companies": db.query(Company).count(),
+        "total_properties": db.query(SeenProperties).count()
+    }
+
 # Health check with database connectivity
 @app.get("/health/detailed")
-def detailed_health_check(db: Session = Depends(get_db)):
+async def detailed_health_check():
     """
-    Detailed health check including database connectivity.
+    Detailed health check including database connectivity. The connectivity
+    check always hits the primary; the counts are served by the read replica
+    when one is configured.
     """
     try:
         # Test database connection
-        db.execute(text("SELECT 1"))
+        await run_read(lambda db: db.execute(text("SELECT 1")).scalar())
 
         # Get basic stats
-        total_users = db.query(CrmOwner).count()
-        total_companies = db.query(Company).count()
-        total_properties = db.query(SeenProperties).count()
+        stats = await run_read(health_counts, replica=True)
 
         return {
             "status": "healthy",
             "timestamp": datetime.utcnow().isoformat(),
             "database": "connected",
-            "stats": {
-                "total_users": total_users,
-                "total_companies": total_companies,
-                "total_properties": total_properties
-            }
+            "read_replica": read_replica.status() if read_replica else {"configured": False},
+            "stats": stats
         }
     except Exception as e:
         return JSONResponse(
@@ -0,0 +1,102 @@
+"""Composite indexes and (crm_owner_id, property_id) uniqueness on seen_properties
+
+Every dashboard query filters on crm_owner_id, but the table only had its
+primary key index. Adds:
+
+  ix_seen_properties_owner_contract_created
+      (crm_owner_id, contract_date DESC NULLS LAST, created_at DESC)
+      /seen_properties/paginated and /user/activity-summary ordering
+  ix_seen_properties_owner_created
+      (crm_owner_id, created_at DESC)
+      /seen_properties listing, created_at windows, latest activity
+  uq_seen_properties_owner_property
+      UNIQUE (crm_owner_id, property_id)
+
+The migration stops without changing anything if duplicate (crm_owner_id,
+property_id) rows exist: report and delete them with
+dedupe_seen_properties.py first (it keeps the oldest row of each). On
+Postgres the indexes are built CONCURRENTLY, so the migration does not
+block the worker or the API. If the worker stores a duplicate while the
+unique index is being built, the build fails and leaves an INVALID index
+behind: drop it and rerun the migration.
+
+Databases created by the app (main.py's create_all) already have the schema
+of the latest migration, partitioned on Postgres (0005), which these
+CONCURRENTLY and UNIQUE index builds cannot be applied to. Bring them up to
+date with `alembic stamp head` instead of `alembic upgrade head`; 0001-0004
+also skip a seen_properties table that is already partitioned.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from dedupe_seen_properties import count_duplicates
+from partitions import is_partitioned
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if not inspector.has_table("seen_properties"):
+        # Fresh database: main.py's create_all creates the table with these indexes.
+        return
+    if is_partitioned(bind):
+        # Created partitioned by main.py (or migrated by 0005): already up to date.
+        return
+    postgres = bind.dialect.name == "postgresql"
+
+    duplicates = count_duplicates(bind)
+    if duplicates:
+        raise RuntimeError(
+            f"seen_properties has {duplicates} duplicate (crm_owner_id, property_id) rows, which the "
+            "unique index cannot be built over. Review them with `python dedupe_seen_properties.py "
+            "--csv duplicates.csv`, delete them with `--apply`, then rerun the migration."
+        )
+
+    if postgres:
+        # CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+        with op.get_context().autocommit_block():
+            op.create_index(
+                "ix_seen_properties_owner_contract_created", "seen_properties",
+                ["crm_owner_id", sa.text("contract_date DESC NULLS LAST"), sa.text("created_at DESC")],
+                postgresql_concurrently=True, if_not_exists=True,
+            )
+            op.create_index(
+                "ix_seen_properties_owner_created", "seen_properties",
+                ["crm_owner_id", sa.text("created_at DESC")],
+                postgresql_concurrently=True, if_not_exists=True,
+            )
+            op.create_index(
+                "uq_seen_properties_owner_property", "seen_properties",
+                ["crm_owner_id", "property_id"], unique=True,
+                postgresql_concurrently=True, if_not_exists=True,
+            )
+    else:
+        op.create_index(
+            "ix_seen_properties_owner_created", "seen_properties",
+            ["crm_owner_id", sa.text("created_at DESC")], if_not_exists=True,
+        )
+        op.create_index(
+            "uq_seen_properties_owner_property", "seen_properties",
+            ["crm_owner_id", "property_id"], unique=True, if_not_exists=True,
+        )
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            for name in ("uq_seen_properties_owner_property", "ix_seen_properties_owner_created",
+                         "ix_seen_properties_owner_contract_created"):
+                op.drop_index(name, table_name="seen_properties", postgresql_concurrently=True, if_exists=True)
+    else:
+        for name in ("uq_seen_properties_owner_property", "ix_seen_properties_owner_created"):
+            op.drop_index(name, table_name="seen_properties", if_exists=True)
@@ -0,0 +1,62 @@
+"""Add id to the seen_properties (owner, contract_date, created_at) index
+
+Keyset pagination on /seen_properties/paginated walks rows in
+(contract_date DESC NULLS LAST, created_at DESC, id DESC) order, with id as
+the tie-breaker that makes the cursor unique. Replaces
+
+  ix_seen_properties_owner_contract_created
+      (crm_owner_id, contract_date DESC NULLS LAST, created_at DESC)
+
+with
+
+  ix_seen_properties_owner_contract_created_id
+      (crm_owner_id, contract_date DESC NULLS LAST, created_at DESC, id DESC)
+
+so each cursor page is a single index range scan. The new index is built
+CONCURRENTLY before the old one is dropped. Postgres only, like 0001.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from partitions import is_partitioned
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql" or not sa.inspect(bind).has_table("seen_properties"):
+        return
+    if is_partitioned(bind):
+        # Created partitioned by main.py (or migrated by 0005): already up to date.
+        return
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_seen_properties_owner_contract_created_id", "seen_properties",
+            ["crm_owner_id", sa.text("contract_date DESC NULLS LAST"), sa.text("created_at DESC"),
+             sa.text("id DESC")],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.drop_index("ix_seen_properties_owner_contract_created", table_name="seen_properties",
+                      postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql" or not sa.inspect(bind).has_table("seen_properties"):
+        return
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_seen_properties_owner_contract_created", "seen_properties",
+            ["crm_owner_id", sa.text("contract_date DESC NULLS LAST"), sa.text("created_at DESC")],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.drop_index("ix_seen_properties_owner_contract_created_id", table_name="seen_properties",
+                      postgresql_concurrently=True, if_exists=True)
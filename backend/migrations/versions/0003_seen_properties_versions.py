@@ -0,0 +1,71 @@
+"""Data versions for seen_properties: (crm_owner_id, id) index and deletion tombstones
+
+An owner's data version is "<max seen_properties id>.<max tombstone id>" and
+backs the ETags on /seen_properties, /seen_properties/stats and
+/seen_properties/analytics as well as /seen_properties/delta. Adds:
+
+  ix_seen_properties_owner_id
+      (crm_owner_id, id) so max(id) per owner is a single index lookup
+  seen_property_deletions
+      one row per deleted seen_properties row, with
+      ix_seen_property_deletions_owner_id (crm_owner_id, id)
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from partitions import is_partitioned
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if not inspector.has_table("seen_properties"):
+        # Fresh database: main.py's create_all creates both tables with their indexes.
+        return
+    if is_partitioned(bind):
+        # Created partitioned by main.py (or migrated by 0005): already up to date.
+        return
+    postgres = bind.dialect.name == "postgresql"
+
+    if not inspector.has_table("seen_property_deletions"):
+        op.create_table(
+            "seen_property_deletions",
+            sa.Column("id", sa.Integer, primary_key=True),
+            sa.Column("crm_owner_id", sa.Integer, nullable=False),
+            sa.Column("seen_property_id", sa.Integer, nullable=False),
+            sa.Column("deleted_at", sa.DateTime, server_default=sa.func.now()),
+        )
+        op.create_index("ix_seen_property_deletions_owner_id", "seen_property_deletions",
+                        ["crm_owner_id", "id"])
+
+    if postgres:
+        # CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+        with op.get_context().autocommit_block():
+            op.create_index(
+                "ix_seen_properties_owner_id", "seen_properties", ["crm_owner_id", "id"],
+                postgresql_concurrently=True, if_not_exists=True,
+            )
+    else:
+        op.create_index("ix_seen_properties_owner_id", "seen_properties", ["crm_owner_id", "id"],
+                        if_not_exists=True)
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.drop_index("ix_seen_properties_owner_id", table_name="seen_properties",
+                          postgresql_concurrently=True, if_exists=True)
+    else:
+        op.drop_index("ix_seen_properties_owner_id", table_name="seen_properties", if_exists=True)
+    if sa.inspect(bind).has_table("seen_property_deletions"):
+        op.drop_table("seen_property_deletions")
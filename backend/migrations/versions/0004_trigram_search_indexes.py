@@ -0,0 +1,77 @@
+"""Trigram GIN indexes for the substring searches
+
+/admin/users filters agents with ILIKE '%term%' on name, email and
+companycode, and /seen_properties/search looks for a term anywhere in a
+match's owner name, seller name or street address. A leading wildcard
+cannot use a B-tree, so these were sequential scans. Enables pg_trgm and
+adds:
+
+  ix_crm_owners_name_trgm, ix_crm_owners_email_trgm, ix_crm_owners_companycode_trgm
+      GIN (<column> gin_trgm_ops)
+  ix_seen_properties_search_trgm
+      GIN ((COALESCE(owner_name, '') || ' ' || COALESCE(seller_name, '') || ' '
+            || COALESCE(street_address, '')) gin_trgm_ops)
+      must stay identical to SEEN_PROPERTY_SEARCH_SQL in main.py
+
+Postgres only; the indexes are built CONCURRENTLY. pg_trgm ships with
+Postgres' contrib modules and is a trusted extension, so the database owner
+can create it. Other databases keep their sequential scans.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from partitions import is_partitioned
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+SEARCH_EXPRESSION = (
+    "(COALESCE(owner_name, '') || ' ' || COALESCE(seller_name, '') || ' ' || COALESCE(street_address, ''))"
+)
+CRM_OWNER_COLUMNS = ("name", "email", "companycode")
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+    inspector = sa.inspect(bind)
+    if not inspector.has_table("seen_properties"):
+        # Fresh database: main.py's create_all creates the extension and the indexes.
+        return
+    if is_partitioned(bind):
+        # Created partitioned by main.py (or migrated by 0005): already up to date.
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+    with op.get_context().autocommit_block():
+        if inspector.has_table("crm_owners"):
+            for column in CRM_OWNER_COLUMNS:
+                op.create_index(
+                    f"ix_crm_owners_{column}_trgm", "crm_owners", [column],
+                    postgresql_using="gin", postgresql_ops={column: "gin_trgm_ops"},
+                    postgresql_concurrently=True, if_not_exists=True,
+                )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_seen_properties_search_trgm ON seen_properties "
+            f"USING gin ({SEARCH_EXPRESSION} gin_trgm_ops)"
+        )
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_seen_properties_search_trgm", table_name="seen_properties",
+                      postgresql_concurrently=True, if_exists=True)
+        for column in CRM_OWNER_COLUMNS:
+            op.drop_index(f"ix_crm_owners_{column}_trgm", table_name="crm_owners",
+                          postgresql_concurrently=True, if_exists=True)
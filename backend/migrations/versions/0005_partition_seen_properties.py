@@ -0,0 +1,126 @@
+"""Partition seen_properties by month of created_at
+
+Rebuilds seen_properties as a table partitioned BY RANGE (created_at), one
+partition per calendar month (seen_properties_pYYYY_MM) plus a DEFAULT
+partition, so created_at windows only read the months they cover and old
+months can be detached or dropped whole (see partitions.py):
+
+  * partitions from the month of the oldest row through 3 months ahead;
+    rows with a NULL created_at are given the migration time first, and
+    created_at becomes NOT NULL
+  * PRIMARY KEY (id, created_at); ids keep coming from the same sequence
+  * uq_seen_properties_owner_property becomes the non-unique
+    ix_seen_properties_owner_property: a unique index on a partitioned
+    table must include created_at, which would not prevent duplicates. The
+    worker checks for an existing match under the owner's advisory lock.
+  * the other indexes (0001-0004) are recreated on the partitioned table;
+    ix_seen_properties_search_trgm only if pg_trgm is installed
+
+Postgres only. The copy holds an ACCESS EXCLUSIVE lock on seen_properties
+for its whole duration, so stop the worker and run this in a maintenance
+window. Other databases keep the plain table.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+from datetime import date, datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+from dedupe_seen_properties import count_duplicates
+from partitions import add_months, is_partitioned
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+MONTHS_AHEAD = 3
+SEARCH_EXPRESSION = (
+    "(COALESCE(owner_name, '') || ' ' || COALESCE(seller_name, '') || ' ' || COALESCE(street_address, ''))"
+)
+INDEXES = [
+    "CREATE INDEX ix_seen_properties_id ON seen_properties (id)",
+    "CREATE INDEX ix_seen_properties_owner_contract_created_id ON seen_properties "
+    "(crm_owner_id, contract_date DESC NULLS LAST, created_at DESC, id DESC)",
+    "CREATE INDEX ix_seen_properties_owner_created ON seen_properties (crm_owner_id, created_at DESC)",
+    "CREATE INDEX ix_seen_properties_owner_id ON seen_properties (crm_owner_id, id)",
+]
+
+
+def rebuild(bind, partitioned):
+    """Copy seen_properties into a new (partitioned or plain) table that takes its place."""
+    op.execute("LOCK TABLE seen_properties IN ACCESS EXCLUSIVE MODE")
+    sequence = bind.execute(sa.text("SELECT pg_get_serial_sequence('seen_properties', 'id')")).scalar()
+    op.execute("UPDATE seen_properties SET created_at = now() WHERE created_at IS NULL")
+
+    op.execute(
+        "CREATE TABLE seen_properties_new (LIKE seen_properties INCLUDING DEFAULTS)"
+        + (" PARTITION BY RANGE (created_at)" if partitioned else "")
+    )
+    op.execute("ALTER TABLE seen_properties_new ALTER COLUMN created_at SET NOT NULL")
+    if partitioned:
+        oldest = bind.execute(sa.text("SELECT min(created_at) FROM seen_properties")).scalar() or datetime.now()
+        month, last = date(oldest.year, oldest.month, 1), add_months(date.today().replace(day=1), MONTHS_AHEAD)
+        while month <= last:
+            op.execute(
+                f"CREATE TABLE seen_properties_p{month:%Y_%m} PARTITION OF seen_properties_new "
+                f"FOR VALUES FROM ('{month}') TO ('{add_months(month, 1)}')"
+            )
+            month = add_months(month, 1)
+        op.execute("CREATE TABLE seen_properties_default PARTITION OF seen_properties_new DEFAULT")
+
+    op.execute("INSERT INTO seen_properties_new SELECT * FROM seen_properties")
+    # The id sequence belongs to the old table's column and would be dropped with it.
+    if sequence:
+        op.execute(f"ALTER SEQUENCE {sequence} OWNED BY NONE")
+    op.execute("DROP TABLE seen_properties")
+    op.execute("ALTER TABLE seen_properties_new RENAME TO seen_properties")
+    if sequence:
+        op.execute(f"ALTER SEQUENCE {sequence} OWNED BY seen_properties.id")
+
+    op.execute("ALTER TABLE seen_properties ADD PRIMARY KEY " + ("(id, created_at)" if partitioned else "(id)"))
+    for statement in INDEXES:
+        op.execute(statement)
+    if partitioned:
+        op.execute("CREATE INDEX ix_seen_properties_owner_property ON seen_properties (crm_owner_id, property_id)")
+    else:
+        op.execute("CREATE UNIQUE INDEX uq_seen_properties_owner_property ON seen_properties (crm_owner_id, property_id)")
+    if bind.execute(sa.text("SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm')")).scalar():
+        op.execute(
+            "CREATE INDEX ix_seen_properties_search_trgm ON seen_properties "
+            f"USING gin ({SEARCH_EXPRESSION} gin_trgm_ops)"
+        )
+    op.execute("ANALYZE seen_properties")
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+    if not sa.inspect(bind).has_table("seen_properties"):
+        # Fresh database: main.py's create_all creates the partitioned table.
+        return
+    if is_partitioned(bind):
+        return
+    rebuild(bind, partitioned=True)
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql" or not sa.inspect(bind).has_table("seen_properties"):
+        return
+    if not is_partitioned(bind):
+        return
+    # Without the unique index duplicates may have been stored; they have to go first.
+    duplicates = count_duplicates(bind)
+    if duplicates:
+        raise RuntimeError(
+            f"seen_properties has {duplicates} duplicate (crm_owner_id, property_id) rows, which the "
+            "plain table's unique index cannot be built over. Review them with `python "
+            "dedupe_seen_properties.py --csv duplicates.csv`, delete them with `--apply`, then rerun."
+        )
+    rebuild(bind, partitioned=False)
+    # Detached partitions left behind by retention runs are archives; they are kept.
@@ -0,0 +1,49 @@
+"""
+Build the owner_stats rollups (see OWNER STATS ROLLUP in main.py) outside of requests.
+
+    python owner_stats_maintenance.py backfill                build the rollup of every owner without one
+    python owner_stats_maintenance.py rebuild                 recompute every owner's rollup
+    python owner_stats_maintenance.py rebuild --owner 12 40   recompute the given owners' rollups
+
+Run `backfill` once when deploying the rollup, and from cron after
+`partition_maintenance.py run` (retention clears the rollup of every owner
+it removed matches for). The agent and company dashboards still build a
+missing rollup on first read, one owner at a time; /admin/stats does not,
+and counts the matches of owners without one directly.
+
+Each owner is rebuilt and committed on its own, so the script can be
+stopped and restarted at any point. Imports main.py, so it needs the app's
+environment (DATABASE_URL, ...).
+"""
+import argparse
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the owner_stats rollups outside of requests.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("backfill", help="Build the rollup of every owner that has none")
+    rebuild = commands.add_parser("rebuild", help="Recompute rollups (every owner by default)")
+    rebuild.add_argument("--owner", type=int, nargs="+", help="Owner ids to recompute")
+    args = parser.parse_args()
+
+    import main as backend
+
+    with backend.SessionLocal() as db:
+        if args.command == "backfill":
+            owner_ids = backend.owners_without_owner_stats(db)
+        elif args.owner:
+            owner_ids = args.owner
+        else:
+            owner_ids = [row[0] for row in db.query(backend.CrmOwner.id).order_by(backend.CrmOwner.id)]
+
+        started = time.perf_counter()
+        for done, owner_id in enumerate(owner_ids, 1):
+            backend.rebuild_owner_stats(db, owner_id)
+            if done % 100 == 0:
+                print(f"{done}/{len(owner_ids)} owners ({time.perf_counter() - started:.1f}s)")
+        print(f"✅ Built owner_stats for {len(owner_ids)} owners in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Partition maintenance for seen_properties (see partitions.py), for cron.
+
+    python partition_maintenance.py run                 create upcoming partitions, apply retention
+    python partition_maintenance.py list                attached partitions and detached archives
+    python partition_maintenance.py detach --before 2024-10
+    python partition_maintenance.py drop --before 2024-10 [--archived]
+
+`run` is what cron should call (daily is plenty); it uses the
+SEEN_PROPERTIES_* settings. `detach` and `drop` remove every monthly
+partition that ends on or before the first day of --before, whatever the
+retention setting; `drop --archived` also drops detached archives from
+before that month. These replace deleting or truncating seen_properties by
+hand: removing a month is a catalog change, not a scan of the table.
+
+Reads DATABASE_URL like the app. Does not import main.py.
+"""
+import argparse
+import os
+import sys
+from datetime import datetime
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, pool, text
+
+import partitions
+
+
+def parse_month(value):
+    try:
+        return datetime.strptime(value, "%Y-%m").date()
+    except ValueError:
+        raise argparse.ArgumentTypeError("expected YYYY-MM")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the monthly partitions of seen_properties.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("run", help="Create upcoming partitions and apply the retention policy")
+    commands.add_parser("list", help="List attached partitions and detached archives")
+    for name in ("detach", "drop"):
+        command = commands.add_parser(name, help=f"{name.capitalize()} the partitions of months before --before")
+        command.add_argument("--before", type=parse_month, required=True, help="First month to keep (YYYY-MM)")
+    commands.choices["drop"].add_argument("--archived", action="store_true",
+                                          help="Also drop detached archives of months before --before")
+    args = parser.parse_args()
+
+    load_dotenv()
+    database_url = os.getenv("DATABASE_URL")
+    if not database_url:
+        raise Exception("DATABASE_URL environment variable not set")
+    engine = create_engine(database_url, poolclass=pool.NullPool)
+
+    with engine.begin() as connection:
+        if not partitions.is_partitioned(connection):
+            print("seen_properties is not partitioned (Postgres only; run `alembic upgrade head`)", file=sys.stderr)
+            sys.exit(1)
+
+        if args.command == "run":
+            result = partitions.maintain(connection)
+            print(f"Created: {', '.join(result['created']) or 'none'}")
+            print(f"Retention ({partitions.RETENTION_MONTHS or 'off'} months, {result['action']}): "
+                  f"{', '.join(result['removed']) or 'nothing to remove'}")
+
+        elif args.command == "list":
+            default_rows = connection.execute(text(f"SELECT count(*) FROM {partitions.DEFAULT_PARTITION}")).scalar()
+            for partition in partitions.attached_partitions(connection):
+                print(f"{partition['name']}  {partition['month']} .. {partition['end']}  ~{partition['rows']} rows")
+            print(f"{partitions.DEFAULT_PARTITION}  {default_rows} rows")
+            for name in partitions.detached_partitions(connection):
+                print(f"{name}  (detached)")
+
+        else:
+            drop = args.command == "drop"
+            partitions.lock_partitions(connection)
+            removed = [partition["name"] for partition in partitions.attached_partitions(connection)
+                       if partition["end"] <= args.before]
+            if removed:
+                owners = partitions.remove_partitions(connection, removed, drop=drop)
+                print(f"{'Dropped' if drop else 'Detached'} {', '.join(removed)} ({owners} owners affected)")
+            if drop and args.archived:
+                archives = [name for name in partitions.detached_partitions(connection)
+                            if name < partitions.partition_name(args.before)]
+                for name in archives:
+                    connection.execute(text(f"DROP TABLE {name}"))
+                    print(f"Dropped archive {name}")
+                removed += archives
+            if not removed:
+                print("Nothing before " + args.before.strftime("%Y-%m"))
+
+
+if __name__ == "__main__":
+    main()
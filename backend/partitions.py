@@ -0,0 +1,241 @@
+"""
+Monthly range partitions of seen_properties (Postgres).
+
+seen_properties grows every month for every agent, and the dashboard's
+queries filter on recent created_at windows. On Postgres the table is
+partitioned by RANGE (created_at), one partition per calendar month:
+
+    seen_properties                 partitioned parent, PRIMARY KEY (id, created_at)
+      seen_properties_p2026_09      FOR VALUES FROM ('2026-09-01') TO ('2026-10-01')
+      seen_properties_p2026_10      ...
+      seen_properties_default       DEFAULT, catches rows no monthly partition covers
+
+A query with a created_at window only reads the partitions it overlaps (plus
+the default one, which is normally empty), and old data is removed by
+detaching or dropping whole partitions instead of DELETE or TRUNCATE.
+
+  * ensure_partitions() creates the partitions for the current month and the
+    next SEEN_PROPERTIES_PARTITION_MONTHS_AHEAD months, and moves any rows
+    that landed in the default partition into monthly partitions of their
+    own. main.py runs it at startup; partition_maintenance.py runs it from
+    cron so a long-lived process never runs out of partitions.
+  * apply_retention() detaches (SEEN_PROPERTIES_RETENTION_ACTION=detach, the
+    default) or drops (=drop) every monthly partition that ends before the
+    last SEEN_PROPERTIES_RETENTION_MONTHS whole months. A detached partition
+    stays in the database as an ordinary table, an archive that can be
+    dumped, queried or attached again. 0 months keeps everything.
+
+Removing a partition bypasses the per-row bookkeeping of the delete
+endpoints, so for every owner with rows in it apply_retention() clears the
+owner's owner_stats rollup (rebuilt on the next dashboard read, or by
+`owner_stats_maintenance.py backfill`) and records a
+seen_property_deletions tombstone with seen_property_id 0. The tombstone
+changes the owner's data version, so ETags stop matching, and tells
+/seen_properties/delta clients to resync instead of applying a delta.
+
+The functions take a Connection inside a transaction and leave committing
+to the caller. Other databases (local SQLite) are not partitioned and every
+function here is a no-op on them.
+
+Configuration (environment):
+    SEEN_PROPERTIES_PARTITION_MONTHS_AHEAD=3   future monthly partitions kept ready
+    SEEN_PROPERTIES_RETENTION_MONTHS=0         whole months of matches to keep (0 = forever)
+    SEEN_PROPERTIES_RETENTION_ACTION=detach    detach | drop
+"""
+import os
+import re
+from datetime import date, datetime
+
+from sqlalchemy import text
+
+PARTITION_MONTHS_AHEAD = int(os.getenv("SEEN_PROPERTIES_PARTITION_MONTHS_AHEAD", "3"))
+RETENTION_MONTHS = int(os.getenv("SEEN_PROPERTIES_RETENTION_MONTHS", "0"))
+RETENTION_ACTION = os.getenv("SEEN_PROPERTIES_RETENTION_ACTION", "detach").lower()
+
+if RETENTION_ACTION not in ("detach", "drop"):
+    raise Exception("SEEN_PROPERTIES_RETENTION_ACTION must be 'detach' or 'drop'")
+
+TABLE = "seen_properties"
+DEFAULT_PARTITION = "seen_properties_default"
+# Same namespace as main.py's OWNER_STATS_LOCK_NAMESPACE; the partition lock
+# is taken with a key no owner id uses.
+OWNER_STATS_LOCK_NAMESPACE = 7353
+PARTITION_LOCK_KEY = -1
+# Tombstone seen_property_id meaning "rows were removed in bulk, resync".
+RESYNC_MARKER = 0
+
+_BOUND_RE = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+
+def month_start(value) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{TABLE}_p{month:%Y_%m}"
+
+
+def is_partitioned(connection) -> bool:
+    """Whether seen_properties is a partitioned table (always False off Postgres)."""
+    if connection.dialect.name != "postgresql":
+        return False
+    return connection.execute(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table))"
+    ), {"table": TABLE}).scalar()
+
+
+def attached_partitions(connection) -> list:
+    """
+    The monthly partitions of seen_properties, oldest first, as dicts with
+    name, month (first day), end (first day of the next range) and an
+    estimated row count. The default partition is not included.
+    """
+    rows = connection.execute(text("""
+        SELECT child.relname, pg_get_expr(child.relpartbound, child.oid), child.reltuples::bigint
+        FROM pg_inherits
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE pg_inherits.inhparent = to_regclass(:table)
+    """), {"table": TABLE}).all()
+    partitions = []
+    for name, bound, estimated_rows in rows:
+        match = _BOUND_RE.search(bound)
+        if not match:
+            continue  # the default partition
+        start, end = (datetime.fromisoformat(value).date() for value in match.groups())
+        partitions.append({"name": name, "month": start, "end": end, "rows": max(estimated_rows, 0)})
+    return sorted(partitions, key=lambda partition: partition["month"])
+
+
+def detached_partitions(connection) -> list:
+    """Names of tables left behind by a `detach` retention run, oldest first."""
+    attached = {partition["name"] for partition in attached_partitions(connection)}
+    names = connection.execute(text("""
+        SELECT relname FROM pg_class
+        WHERE relkind = 'r' AND relnamespace = 'public'::regnamespace AND relname ~ :pattern
+        ORDER BY relname
+    """), {"pattern": f"^{TABLE}_p[0-9]{{4}}_[0-9]{{2}}$"}).scalars().all()
+    return [name for name in names if name not in attached]
+
+
+def lock_partitions(connection):
+    """Serialize partition maintenance across processes until the end of the transaction."""
+    connection.execute(text("SELECT pg_advisory_xact_lock(:ns, :key)"),
+                       {"ns": OWNER_STATS_LOCK_NAMESPACE, "key": PARTITION_LOCK_KEY})
+
+
+def create_partition(connection, month: date) -> str:
+    """
+    Create the partition for `month` (the default partition must exist).
+    Rows for that month already sitting in the default partition are moved
+    into it first; Postgres refuses to add a partition whose range the
+    default partition holds rows for.
+    """
+    name, start, end = partition_name(month), month, add_months(month, 1)
+    bounds = {"start": start, "end": end}
+    stranded = connection.execute(text(
+        f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE created_at >= :start AND created_at < :end)"
+    ), bounds).scalar()
+
+    if not stranded:
+        connection.execute(text(
+            f"CREATE TABLE {name} PARTITION OF {TABLE} FOR VALUES FROM ('{start}') TO ('{end}')"
+        ))
+        return name
+
+    connection.execute(text(f"CREATE TABLE {name} (LIKE {TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    connection.execute(text(f"""
+        WITH moved AS (
+            DELETE FROM {DEFAULT_PARTITION} WHERE created_at >= :start AND created_at < :end RETURNING *
+        )
+        INSERT INTO {name} SELECT * FROM moved
+    """), bounds)
+    connection.execute(text(f"ALTER TABLE {TABLE} ATTACH PARTITION {name} FOR VALUES FROM ('{start}') TO ('{end}')"))
+    return name
+
+
+def ensure_partitions(connection, months_ahead: int = PARTITION_MONTHS_AHEAD, now: datetime = None) -> list:
+    """
+    Create the default partition, the partitions from the current month to
+    `months_ahead` months ahead, and partitions for any month that has rows
+    in the default partition. A month whose partition was detached keeps its
+    rows in the default partition rather than clash with the archive's name.
+    Returns the names of the partitions created.
+    """
+    if not is_partitioned(connection):
+        return []
+    lock_partitions(connection)
+    connection.execute(text(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {TABLE} DEFAULT"))
+
+    existing = {partition["month"] for partition in attached_partitions(connection)}
+    current = month_start(now or datetime.now())
+    wanted = {add_months(current, offset) for offset in range(months_ahead + 1)}
+    wanted.update(month_start(month) for month in connection.execute(text(
+        f"SELECT DISTINCT date_trunc('month', created_at) FROM {DEFAULT_PARTITION} WHERE created_at IS NOT NULL"
+    )).scalars())
+
+    archived = set(detached_partitions(connection))
+    created = []
+    for month in sorted(wanted - existing):
+        if partition_name(month) not in archived:
+            created.append(create_partition(connection, month))
+    return created
+
+
+def expired_partitions(connection, retention_months: int = RETENTION_MONTHS, now: datetime = None) -> list:
+    """Attached monthly partitions that end before the last `retention_months` whole months."""
+    if retention_months <= 0 or not is_partitioned(connection):
+        return []
+    cutoff = add_months(month_start(now or datetime.now()), -retention_months)
+    return [partition for partition in attached_partitions(connection) if partition["end"] <= cutoff]
+
+
+def remove_partitions(connection, names: list, drop: bool = False) -> int:
+    """
+    Detach the monthly partitions `names` from seen_properties, and drop them
+    if `drop`. Clears the rollup of, and leaves one resync tombstone for,
+    every owner with rows in them. Returns the number of owners affected.
+    """
+    owner_ids = set()
+    for name in names:
+        owner_ids.update(connection.execute(text(f"SELECT DISTINCT crm_owner_id FROM {name}")).scalars())
+    owner_ids = sorted(owner_ids)
+    # In owner order, so two runs cannot deadlock each other.
+    for owner_id in owner_ids:
+        connection.execute(text("SELECT pg_advisory_xact_lock(:ns, :owner_id)"),
+                           {"ns": OWNER_STATS_LOCK_NAMESPACE, "owner_id": owner_id})
+    if owner_ids:
+        connection.execute(text("DELETE FROM owner_stats WHERE crm_owner_id = ANY(:owner_ids)"),
+                           {"owner_ids": owner_ids})
+        connection.execute(text(
+            "INSERT INTO seen_property_deletions (crm_owner_id, seen_property_id) "
+            "SELECT owner_id, :marker FROM unnest(CAST(:owner_ids AS integer[])) AS owner_id"
+        ), {"owner_ids": owner_ids, "marker": RESYNC_MARKER})
+    for name in names:
+        connection.execute(text(f"ALTER TABLE {TABLE} DETACH PARTITION {name}"))
+        if drop:
+            connection.execute(text(f"DROP TABLE {name}"))
+    return len(owner_ids)
+
+
+def apply_retention(connection, retention_months: int = RETENTION_MONTHS, action: str = RETENTION_ACTION,
+                    now: datetime = None) -> list:
+    """Detach or drop the expired partitions. Returns the names of the partitions removed."""
+    expired = [partition["name"] for partition in expired_partitions(connection, retention_months, now)]
+    if expired:
+        lock_partitions(connection)
+        remove_partitions(connection, expired, drop=action == "drop")
+    return expired
+
+
+def maintain(connection, now: datetime = None) -> dict:
+    """ensure_partitions() and apply_retention() with the configured settings."""
+    return {
+        "created": ensure_partitions(connection, now=now),
+        "removed": apply_retention(connection, now=now),
+        "action": RETENTION_ACTION,
+    }
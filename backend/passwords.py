@@ -0,0 +1,215 @@
+"""
+Password hashing off the request threads.
+
+bcrypt costs 100-300ms of CPU per call. Doing it inline in FastAPI's
+threadpool lets a burst of logins starve every other endpoint, so hashing and
+verification run in a small, dedicated process pool instead:
+
+  * Admission control: at most PASSWORD_MAX_PENDING operations may be queued
+    or running. A request that cannot get a slot within
+    PASSWORD_ADMISSION_TIMEOUT seconds fails fast with PasswordServiceBusy
+    (HTTP 503) instead of piling up threads.
+  * Per-account rate limiting: LoginRateLimiter allows LOGIN_MAX_FAILURES
+    failed logins per account per LOGIN_WINDOW_SECONDS. Further attempts are
+    refused with TooManyAttempts (HTTP 429) before any bcrypt work is done.
+  * Rehash on login: verify_and_update() returns a new hash when the stored
+    one uses a different cost than BCRYPT_ROUNDS, so raising or lowering the
+    cost takes effect as users log in.
+
+The pool uses the "spawn" start method; its processes import only this
+module (and the __main__ script, so scripts that import main.py must do so
+under an `if __name__ == "__main__":` guard). PASSWORD_POOL_SIZE=0 hashes
+inline, which is useful for local development and one-off scripts.
+
+Configuration (environment):
+    BCRYPT_ROUNDS=12                 bcrypt cost for new hashes
+    PASSWORD_POOL_SIZE=<cpu count>   hashing processes (0 = inline)
+    PASSWORD_MAX_PENDING=<4 x pool>  queued + running operations
+    PASSWORD_ADMISSION_TIMEOUT=2     seconds to wait for a slot
+    LOGIN_MAX_FAILURES=10            failed logins per account and window
+    LOGIN_WINDOW_SECONDS=300
+"""
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from passlib.context import CryptContext
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_POOL_SIZE = int(os.getenv("PASSWORD_POOL_SIZE", str(os.cpu_count() or 2)))
+PASSWORD_MAX_PENDING = int(os.getenv("PASSWORD_MAX_PENDING", str(max(1, PASSWORD_POOL_SIZE) * 4)))
+PASSWORD_ADMISSION_TIMEOUT = float(os.getenv("PASSWORD_ADMISSION_TIMEOUT", "2"))
+LOGIN_MAX_FAILURES = int(os.getenv("LOGIN_MAX_FAILURES", "10"))
+LOGIN_WINDOW_SECONDS = float(os.getenv("LOGIN_WINDOW_SECONDS", "300"))
+
+# Hashes with any other cost are flagged for an update on the next login.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
+
+
+class PasswordServiceBusy(Exception):
+    """Too many password operations are already queued."""
+
+    def __init__(self, retry_after=1):
+        super().__init__("Password service busy")
+        self.retry_after = retry_after
+
+
+class TooManyAttempts(Exception):
+    """The account has too many recent failed logins."""
+
+    def __init__(self, retry_after):
+        super().__init__("Too many login attempts")
+        self.retry_after = retry_after
+
+
+# ---------------------------------------------------------------------------
+# Work done in the pool processes
+# ---------------------------------------------------------------------------
+def _hash(password):
+    return pwd_context.hash(password)
+
+
+def _verify_and_update(password, hashed):
+    try:
+        return pwd_context.verify_and_update(password, hashed)
+    except (ValueError, TypeError):
+        # Unknown or corrupt hash: treat as a failed login.
+        return False, None
+
+
+# ---------------------------------------------------------------------------
+# Pool with admission control
+# ---------------------------------------------------------------------------
+class PasswordPool:
+    """Bounded process pool for bcrypt; `run` blocks the calling thread until done."""
+
+    def __init__(self, size, max_pending, admission_timeout):
+        self.size = size
+        self.admission_timeout = admission_timeout
+        self._slots = threading.BoundedSemaphore(max(1, max_pending))
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.size, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def run(self, fn, *args):
+        if not self._slots.acquire(timeout=self.admission_timeout):
+            raise PasswordServiceBusy()
+        try:
+            if self.size <= 0:
+                return fn(*args)
+            return self._get_executor().submit(fn, *args).result()
+        finally:
+            self._slots.release()
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+password_pool = PasswordPool(PASSWORD_POOL_SIZE, PASSWORD_MAX_PENDING, PASSWORD_ADMISSION_TIMEOUT)
+
+
+def hash_password(password: str) -> str:
+    return password_pool.run(_hash, password)
+
+
+def verify_and_update(password: str, hashed: str):
+    """(valid, new_hash); new_hash is set when the stored hash should be replaced."""
+    return password_pool.run(_verify_and_update, password, hashed)
+
+
+def verify_password(password: str, hashed: str) -> bool:
+    return verify_and_update(password, hashed)[0]
+
+
+# ---------------------------------------------------------------------------
+# Per-account rate limiting
+# ---------------------------------------------------------------------------
+class LoginRateLimiter:
+    """Sliding-window count of failed logins per account key, e.g. "user:jane@example.com"."""
+
+    def __init__(self, max_failures, window_seconds, max_accounts=100_000):
+        self.max_failures = max_failures
+        self.window_seconds = window_seconds
+        self.max_accounts = max_accounts
+        self._failures = {}
+        self._lock = threading.Lock()
+
+    def _recent(self, key, now):
+        failures = self._failures.get(key)
+        if failures is None:
+            return None
+        while failures and failures[0] <= now - self.window_seconds:
+            failures.popleft()
+        if not failures:
+            del self._failures[key]
+            return None
+        return failures
+
+    def check(self, key):
+        """Raise TooManyAttempts if `key` is locked out."""
+        if self.max_failures <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            failures = self._recent(key, now)
+            if failures is not None and len(failures) >= self.max_failures:
+                raise TooManyAttempts(retry_after=max(1, int(failures[0] + self.window_seconds - now) + 1))
+
+    def failed(self, key):
+        now = time.monotonic()
+        with self._lock:
+            failures = self._recent(key, now)
+            if failures is None:
+                if len(self._failures) >= self.max_accounts:
+                    # Drop the oldest-inserted account rather than growing without bound.
+                    self._failures.pop(next(iter(self._failures)))
+                failures = self._failures[key] = deque()
+            failures.append(now)
+
+    def succeeded(self, key):
+        with self._lock:
+            self._failures.pop(key, None)
+
+
+login_limiter = LoginRateLimiter(LOGIN_MAX_FAILURES, LOGIN_WINDOW_SECONDS)
+
+
+def check_login(key: str, password: str, hashed):
+    """
+    Rate-limited password check for a login on account `key`. `hashed` is None
+    when the account does not exist. Returns (valid, new_hash) like
+    verify_and_update.
+    """
+    login_limiter.check(key)
+    if hashed is None:
+        valid, new_hash = False, None
+    else:
+        valid, new_hash = verify_and_update(password, hashed)
+    if valid:
+        login_limiter.succeeded(key)
+    else:
+        login_limiter.failed(key)
+    return valid, new_hash
+
+
+def shutdown():
+    password_pool.shutdown()
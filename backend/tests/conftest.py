@@ -0,0 +1,103 @@
+"""
+Fixtures for the backend tests.
+
+    cd backend && pip install -r requirements-dev.txt && python -m pytest
+
+main.py connects and creates its tables at import, so the environment is set
+up here first. The tests use a throwaway SQLite database unless
+TEST_DATABASE_URL points at a disposable Postgres database, which also runs
+the Postgres-only tests. The tables the tests write to are emptied after
+every test.
+"""
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL") or "sqlite:///" + os.path.join(tempfile.mkdtemp(), "test.db")
+
+os.environ.update(
+    DATABASE_URL=TEST_DATABASE_URL,
+    DATABASE_REPLICA_URL="",
+    ASYNC_DB="false",
+    PASSWORD_POOL_SIZE="0",
+    SENDER_EMAIL="sender@example.com",
+    Admin_EMAIL="admin@example.com",
+    SMTP_SERVER="localhost",
+    SMTP_PASSWORD="unused",
+)
+sys.path.insert(0, BACKEND_DIR)
+
+import main  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+postgres_only = pytest.mark.skipif(
+    main.engine.dialect.name != "postgresql", reason="needs TEST_DATABASE_URL pointing at Postgres"
+)
+
+TABLES = ("seen_property_deletions", "owner_stats", "seen_properties", "crm_owners", "companies", "admins")
+
+
+@pytest.fixture(autouse=True)
+def clean_database():
+    yield
+    main.app.dependency_overrides.clear()
+    with main.engine.begin() as connection:
+        for table in TABLES:
+            connection.execute(main.Base.metadata.tables[table].delete())
+
+
+@pytest.fixture
+def db():
+    session = main.SessionLocal()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def client():
+    return TestClient(main.app)
+
+
+@pytest.fixture
+def make_owner(db):
+    """Create an agent; returns a detached CrmOwner."""
+    def make(name="agent", companycode="ACME"):
+        owner = main.CrmOwner(name=name, email=f"{name}@example.com", token="token",
+                              companycode=companycode, password="unused")
+        db.add(owner)
+        db.commit()
+        db.refresh(owner)
+        db.expunge(owner)
+        return owner
+    return make
+
+
+@pytest.fixture
+def add_property(db):
+    """Store a match and add it to its owner's rollup, as the worker's record_owner_stats does."""
+    def add(owner, property_id, state="TX", county="Travis", created_at=None, contract_date=None, **fields):
+        prop = main.SeenProperties(crm_owner_id=owner.id, property_id=property_id, state=state, county=county,
+                                   created_at=created_at or datetime.utcnow(), contract_date=contract_date,
+                                   **fields)
+        db.add(prop)
+        db.flush()
+        main.apply_owner_stats_deltas(db, owner.id, main.owner_stats_deltas(
+            owner.id, prop.state, prop.county, prop.contact_email, prop.created_at, prop.contract_date
+        ))
+        db.commit()
+        db.refresh(prop)
+        return prop
+    return add
+
+
+@pytest.fixture
+def login(client):
+    """Authenticate `client` as the given agent."""
+    def log_in(owner):
+        main.app.dependency_overrides[main.get_current_user] = lambda: owner
+        return owner
+    return log_in
@@ -0,0 +1,52 @@
+"""
+The dashboard's seen_properties queries are planned on the (crm_owner_id, ...)
+indexes rather than a scan of the whole table. benchmarks/explain_indexes.py
+does the same against a large seeded Postgres database and prints the plans.
+"""
+import importlib.util
+import os
+
+import pytest
+from sqlalchemy import text
+
+import main
+from conftest import BACKEND_DIR, postgres_only
+
+spec = importlib.util.spec_from_file_location(
+    "explain_indexes", os.path.join(BACKEND_DIR, "benchmarks", "explain_indexes.py")
+)
+explain_indexes = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(explain_indexes)
+
+# SQLite has no DESC NULLS LAST index for /seen_properties/paginated (Postgres only).
+SQLITE_CHECKS = [
+    ("/seen_properties", "SELECT * FROM seen_properties WHERE crm_owner_id = :owner_id ORDER BY created_at DESC",
+     "ix_seen_properties_owner_created"),
+    ("created_at window", "SELECT count(*) FROM seen_properties WHERE crm_owner_id = :owner_id AND created_at >= :since",
+     "ix_seen_properties_owner_created"),
+    ("property lookup", "SELECT id FROM seen_properties WHERE crm_owner_id = :owner_id AND property_id = :property_id",
+     "uq_seen_properties_owner_property"),
+    ("data version", "SELECT max(id) FROM seen_properties WHERE crm_owner_id = :owner_id",
+     "ix_seen_properties_owner_id"),
+]
+PARAMS = {"owner_id": 1, "property_id": "P1", "since": "2026-01-01"}
+
+
+@pytest.mark.skipif(main.engine.dialect.name != "sqlite", reason="SQLite plans")
+@pytest.mark.parametrize("endpoint, sql, index", SQLITE_CHECKS, ids=[check[0] for check in SQLITE_CHECKS])
+def test_sqlite_plans_use_owner_indexes(db, endpoint, sql, index):
+    plan = " | ".join(row[-1] for row in db.execute(text("EXPLAIN QUERY PLAN " + sql), PARAMS))
+    assert "SEARCH seen_properties USING" in plan and index in plan, plan
+
+
+@postgres_only
+@pytest.mark.parametrize("endpoint, sql", explain_indexes.CHECKS, ids=[check[0] for check in explain_indexes.CHECKS])
+def test_postgres_plans_use_owner_indexes(db, endpoint, sql):
+    # On a near-empty test table a sequential scan is always cheapest; forbidding
+    # it shows whether an index can serve the query at all.
+    db.execute(text("SET LOCAL enable_seqscan = off"))
+    access = explain_indexes.seen_properties_access(
+        db, text, sql, PARAMS, explain_indexes.INDEXES + explain_indexes.PROPERTY_INDEXES
+    )
+    assert access and not any(node_type == "Seq Scan" for node_type, _, _ in access), \
+        explain_indexes.describe(access)
@@ -0,0 +1,62 @@
+"""The incrementally maintained owner_stats rollup agrees with a rebuild from seen_properties."""
+from datetime import datetime, timedelta
+
+import main
+
+
+def rollup(db, owner_id):
+    """The owner's non-empty rollup rows; deltas leave emptied keys behind at zero."""
+    db.expire_all()
+    rows = db.query(
+        main.OwnerStats.dimension, main.OwnerStats.key1, main.OwnerStats.key2, main.OwnerStats.count,
+        main.OwnerStats.with_contracts, main.OwnerStats.with_contacts,
+        main.OwnerStats.created_epoch_sum, main.OwnerStats.contract_epoch_sum
+    ).filter(main.OwnerStats.crm_owner_id == owner_id, main.OwnerStats.count != 0)
+    return sorted(tuple(row) for row in rows)
+
+
+def test_rollup_follows_inserts_and_deletes(client, db, login, make_owner, add_property):
+    owner = login(make_owner())
+    other = make_owner("other")
+    main.rebuild_owner_stats(db, owner.id)
+
+    now = datetime.utcnow()
+    props = [
+        add_property(owner, f"P{i}", state=["TX", "CA"][i % 2], county=f"County {i % 3}",
+                     created_at=now - timedelta(days=i, microseconds=i),
+                     contract_date=now - timedelta(days=2 * i) if i % 3 else None,
+                     contact_email=f"c{i}@example.com" if i % 4 else None)
+        for i in range(12)
+    ]
+    add_property(other, "P0")
+    for prop in props[::3]:
+        assert client.delete(f"/seen_properties/{prop.id}").status_code == 200
+
+    incremental = rollup(db, owner.id)
+    main.rebuild_owner_stats(db, owner.id)
+    assert incremental == rollup(db, owner.id)
+    total = next(row for row in incremental if row[0] == "total")
+    assert total[3] == 8
+
+
+def test_deltas_are_skipped_until_the_rollup_is_built(db, make_owner, add_property):
+    owner = make_owner()
+    add_property(owner, "P1")
+    assert not main.owner_stats_materialized(db, owner.id)
+
+    main.ensure_owner_stats(db, [owner.id])
+    add_property(owner, "P2")
+    assert main.owner_stats_totals(db, [owner.id])[0] == 2
+
+
+def test_stats_endpoint_reads_the_rollup(client, db, login, make_owner, add_property):
+    owner = login(make_owner())
+    add_property(owner, "P1", state="TX")
+    add_property(owner, "P2", state="TX", contract_date=datetime.utcnow())
+    add_property(owner, "P3", state="CA", created_at=datetime.utcnow() - timedelta(days=20))
+
+    stats = client.get("/seen_properties/stats").json()
+    assert stats["total_properties"] == 3
+    assert stats["recent_properties"] == 2
+    assert stats["recent_contracts"] == 1
+    assert stats["state_breakdown"] == [{"state": "TX", "count": 2}, {"state": "CA", "count": 1}]
@@ -0,0 +1,51 @@
+"""Keyset (cursor) pagination of /seen_properties/paginated."""
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+import main
+
+
+@pytest.mark.parametrize("contract_date", [datetime(2026, 3, 4, 5, 6, 7, 890), None])
+def test_cursor_round_trip(contract_date):
+    prop = SimpleNamespace(contract_date=contract_date, created_at=datetime(2026, 5, 1, 12, 0, 0, 123456), id=42)
+    cursor = main.encode_page_cursor(prop)
+    assert "=" not in cursor
+    assert main.decode_page_cursor(cursor) == (contract_date, prop.created_at, 42)
+
+
+@pytest.mark.parametrize("cursor", ["not a cursor", "bm90IGpzb24", main.encode_page_cursor(
+    SimpleNamespace(contract_date=None, created_at=datetime(2026, 1, 1), id=1))[:-3]])
+def test_invalid_cursor_is_rejected(cursor):
+    with pytest.raises(HTTPException) as error:
+        main.decode_page_cursor(cursor)
+    assert error.value.status_code == 400
+
+
+def test_cursor_pages_match_offset_order(client, login, make_owner, add_property):
+    owner = login(make_owner())
+    now = datetime.utcnow().replace(microsecond=0)
+    for i in range(23):
+        # Shared created_at and contract_date values, so ties are broken by id.
+        add_property(owner, f"P{i}", created_at=now - timedelta(days=i % 4),
+                     contract_date=now - timedelta(days=i % 3) if i % 2 else None)
+
+    everything = client.get("/seen_properties/paginated", params={"page_size": 100}).json()
+    expected = [prop["id"] for prop in everything["properties"]]
+
+    seen, cursor = [], ""
+    while cursor is not None:
+        page = client.get("/seen_properties/paginated", params={"page_size": 5, "cursor": cursor}).json()
+        assert len(page["properties"]) <= 5
+        assert page["pagination"]["total"] == 23
+        seen += [prop["id"] for prop in page["properties"]]
+        cursor = page["pagination"]["next_cursor"]
+    assert seen == expected and len(expected) == 23
+
+
+def test_garbage_cursor_is_a_400(client, login, make_owner):
+    login(make_owner())
+    response = client.get("/seen_properties/paginated", params={"cursor": "garbage!"})
+    assert response.status_code == 400
@@ -0,0 +1,70 @@
+"""run_read(..., replica=True) routing and its fallbacks to the primary."""
+import pytest
+from sqlalchemy.exc import OperationalError
+
+import main
+from conftest import TEST_DATABASE_URL
+
+
+@pytest.fixture
+def replica(monkeypatch):
+    """A ReadReplica on the test database. Lag is not measured: that SQL needs a Postgres standby."""
+    replica = main.ReadReplica(TEST_DATABASE_URL)
+    monkeypatch.setattr(replica, "check_lag", lambda db: None)
+    opened = []
+    session_factory = replica.SessionLocal
+
+    def open_session():
+        opened.append(True)
+        return session_factory()
+
+    monkeypatch.setattr(replica, "SessionLocal", open_session)
+    monkeypatch.setattr(main, "read_replica", replica)
+    replica.sessions = opened
+    yield replica
+    replica.engine.dispose()
+
+
+def test_missing_rollup_falls_back_without_marking_the_replica_down(
+        client, db, replica, login, make_owner, add_property):
+    owner = login(make_owner())
+    add_property(owner, "P1")
+    assert not main.owner_stats_materialized(db, owner.id)
+
+    response = client.get("/seen_properties/analytics")
+    assert response.status_code == 200
+    assert response.json()["summary"]["total_properties"] == 1
+    # Tried on the replica, which refused to build the rollup; the primary built it.
+    assert replica.sessions
+    assert main.owner_stats_materialized(db, owner.id)
+    assert replica.status() == {"configured": True, "available": True, "lag_seconds": None, "last_error": None}
+
+    replica.sessions.clear()
+    assert client.get("/seen_properties/analytics").status_code == 200
+    assert replica.sessions
+
+
+def test_replica_error_falls_back_and_marks_it_down(client, replica, monkeypatch, login, make_owner, add_property):
+    owner = login(make_owner())
+    add_property(owner, "P1")
+
+    def unreachable(db):
+        raise OperationalError("SELECT 1", {}, Exception("connection refused"))
+
+    monkeypatch.setattr(replica, "check_lag", unreachable)
+    response = client.get("/seen_properties/analytics")
+    assert response.status_code == 200
+    status = replica.status()
+    assert status["available"] is False and "connection refused" in status["last_error"]
+
+    replica.sessions.clear()
+    assert client.get("/seen_properties/analytics").status_code == 200
+    assert not replica.sessions
+
+
+def test_rebuild_refuses_to_write_on_the_replica(db, make_owner):
+    owner = make_owner()
+    db.info["replica"] = True
+    with pytest.raises(main.ReplicaReadOnly):
+        main.rebuild_owner_stats(db, owner.id)
+    assert not main.owner_stats_materialized(db, owner.id)
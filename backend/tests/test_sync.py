@@ -0,0 +1,59 @@
+"""Conditional GET on /seen_properties and delta sync through /seen_properties/delta."""
+import main
+import partitions
+
+
+def test_unchanged_matches_are_a_304(client, login, make_owner, add_property):
+    owner = login(make_owner())
+    add_property(owner, "P1")
+
+    first = client.get("/seen_properties")
+    assert first.status_code == 200 and first.headers["ETag"].startswith('W/"sp-')
+    again = client.get("/seen_properties", headers={"If-None-Match": first.headers["ETag"]})
+    assert again.status_code == 304 and again.content == b""
+    assert again.headers["ETag"] == first.headers["ETag"]
+
+    add_property(owner, "P2")
+    changed = client.get("/seen_properties", headers={"If-None-Match": first.headers["ETag"]})
+    assert changed.status_code == 200 and changed.headers["ETag"] != first.headers["ETag"]
+    assert [prop["property_id"] for prop in changed.json()] == ["P2", "P1"]
+
+
+def test_delta_returns_added_and_deleted_rows(client, login, make_owner, add_property):
+    owner = login(make_owner())
+    kept, removed = add_property(owner, "P1"), add_property(owner, "P2")
+    version = client.get("/seen_properties").headers["X-Data-Version"]
+
+    added = add_property(owner, "P3")
+    assert client.delete(f"/seen_properties/{removed.id}").status_code == 200
+
+    delta = client.get("/seen_properties/delta", params={"since": version})
+    assert delta.status_code == 200
+    body = delta.json()
+    assert [prop["id"] for prop in body["added"]] == [added.id]
+    assert body["deleted"] == [removed.id]
+    assert body["version"] == client.get("/seen_properties").headers["X-Data-Version"]
+
+    empty = client.get("/seen_properties/delta", params={"since": body["version"]}).json()
+    assert empty == {"version": body["version"], "added": [], "deleted": []}
+    assert kept.id not in body["deleted"]
+
+
+def test_delta_after_bulk_removal_is_a_410(client, db, login, make_owner, add_property):
+    owner = login(make_owner())
+    add_property(owner, "P1")
+    version = client.get("/seen_properties").headers["X-Data-Version"]
+
+    # What a retention run leaves behind after dropping a partition.
+    db.add(main.SeenPropertyDeletion(crm_owner_id=owner.id, seen_property_id=partitions.RESYNC_MARKER))
+    db.commit()
+
+    assert client.get("/seen_properties/delta", params={"since": version}).status_code == 410
+    current = client.get("/seen_properties").headers["X-Data-Version"]
+    assert current != version
+    assert client.get("/seen_properties/delta", params={"since": current}).status_code == 200
+
+
+def test_delta_rejects_a_malformed_version(client, login, make_owner):
+    login(make_owner())
+    assert client.get("/seen_properties/delta", params={"since": "yesterday"}).status_code == 400
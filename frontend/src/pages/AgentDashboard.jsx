@@ -635,11 +635,57 @@ const AgentDashboard = () => {
       return dateType === 'contract' ? `Contract ${daysAgo} days ago` : `Added ${daysAgo} days ago`;
     }
   };
+  // Filters only the browser applies; with any of them set, exports are built
+  // from what is on screen instead of by the server.
+  const hasClientOnlyFilters = () => Boolean(
+    filters.search || filters.contractBefore || filters.contractAfter ||
+    filters.matchPercentage || filters.hasContract
+  );
+
+  // The server streams the file straight from the database, so the browser
+  // saves it to disk without holding every property in memory. A plain link
+  // cannot send the Authorization header, so it carries a short-lived export token.
+  const exportFromServer = async (format) => {
+    try {
+      const response = await fetch(`${API_URL}/seen_properties/export/token`, {
+        method: 'POST',
+        headers: {
+          'Authorization': `Bearer ${localStorage.getItem('token')}`
+        }
+      });
+      if (!response.ok) {
+        throw new Error('Failed to start export');
+      }
+      const { token } = await response.json();
+
+      const params = new URLSearchParams({ format, token });
+      if (filters.state) params.set('state', filters.state);
+      if (filters.county) params.set('county', filters.county);
+
+      const link = document.createElement('a');
+      link.setAttribute('href', `${API_URL}/seen_properties/export?${params}`);
+      link.style.visibility = 'hidden';
+
+      document.body.appendChild(link);
+      link.click();
+      document.body.removeChild(link);
+
+      toast.success('Export started');
+    } catch (error) {
+      console.error('Error exporting properties:', error);
+      toast.error('Failed to export properties');
+    }
+  };
+
   const exportToJSON = () => {
     if (filteredProperties.length === 0) {
       toast.info('No data to export');
       return;
     }
+    if (!hasClientOnlyFilters()) {
+      exportFromServer('json');
+      return;
+    }
   
     const dataStr = JSON.stringify(filteredProperties, null, 2);
     const blob = new Blob([dataStr], { type: 'application/json' });
@@ -662,6 +708,10 @@ const AgentDashboard = () => {
       toast.info('No data to export');
       return;
     }
+    if (!hasClientOnlyFilters()) {
+      exportFromServer('csv');
+      return;
+    }
   
     // Create CSV content
     const headers = ['Property ID', 'Address', 'County', 'State', 'Owner', 'Seller', 'Match %', 'Contract Date', 'Created Date', 'Status'];
@@ -1003,6 +1053,17 @@ const AgentDashboard = () => {
                     </svg>
                     Export JSON
                   </button>
+                  <button
+                    onClick={() => exportFromServer('xlsx')}
+                    disabled={filteredProperties.length === 0 || hasClientOnlyFilters()}
+                    title={hasClientOnlyFilters() ? 'Excel export supports the state and county filters only' : undefined}
+                    className="bg-teal-600 text-white px-4 py-2 rounded-lg hover:bg-teal-700 disabled:opacity-50 transition-colors flex items-center"
+                  >
+                    <svg className="w-4 h-4 mr-2" fill="none" stroke="currentColor" viewBox="0 0 24 24">
+                      <path strokeLinecap="round" strokeLinejoin="round" strokeWidth={2} d="M4 16v1a3 3 0 003 3h10a3 3 0 003-3v-1m-4-4l-4 4m0 0l-4-4m4 4V4" />
+                    </svg>
+                    Export Excel
+                  </button>
                   <button
                     onClick={handleManualRefresh}
                     disabled={loading}
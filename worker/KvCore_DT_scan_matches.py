@@ -1,33 +1,45 @@
 import requests
 import json
 import threading
-import pandas as pd
 import csv
 from datetime import datetime, timedelta
 import re
 import os
 import openpyxl
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
 import time
 import cloudscraper
-import smtplib
-import ssl
 from email.message import EmailMessage
 import shutil
+import tempfile
 import concurrent.futures
+import calendar
 import queue
 import os
 import shutil
-from sqlalchemy import create_engine, Column, Integer, String, JSON, text, DateTime
+from sqlalchemy import create_engine, Column, Integer, BigInteger, String, JSON, text, DateTime, Index
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import sessionmaker, Session, declarative_base
 from sqlalchemy.sql import func
 from dotenv import load_dotenv
 from passlib.context import CryptContext
 from datetime import datetime
-import difflib
-from fuzzywuzzy import fuzz
+from name_matching import (
+    generate_name_variations,
+    normalize_name_for_matching,
+    calculate_name_match_percentage,
+    get_overall_match_score,
+    should_include_match,
+)
+from scan_metrics import metrics
+from email_delivery import ReportMailer
+from scan_logging import get_logger, setup_logging
 
 # Load environment variables
 load_dotenv()
+setup_logging()
+logger = get_logger("scan")
 
 
 def should_run_this_month():
@@ -37,12 +49,12 @@ def should_run_this_month():
     # Check if it's a weekday (Mon-Fri)
     last_weekday = int(os.getenv("LAST_WEEKDAY",4))
     if today.weekday() > last_weekday:  # 5 and 6 are Saturday and Sunday
-        print(f"Today is weekend ({today.weekday()}), not running.")
+        logger.info("Today is weekend (%s), not running.", today.weekday())
         return False
 
     # Read from last_run_month.txt file
     try:
-        print(f"cheking {file_path}")
+        logger.debug("Checking %s", file_path)
         with open(file_path, "r") as f:
             last_run_month = int(f.read().strip())
     except FileNotFoundError:
@@ -51,11 +63,11 @@ def should_run_this_month():
             f.write(str(current_month))
         return True  # First run
     except Exception as e:
-        print(f"Error reading {file_path}: {e}")
+        logger.error("Error reading %s: %s", file_path, e)
         return False
 
     if current_month == last_run_month:
-        print(f"Already ran this month (last run: {last_run_month}).")
+        logger.info("Already ran this month (last run: %s).", last_run_month)
         return False
 
     return True
@@ -65,9 +77,9 @@ def update_last_run_month():
     try:
         with open(file_path, "w") as f:
             f.write(str(current_month))
-        print(f"(✓) Updated last_run_month.txt to {current_month}")
+        logger.info("(✓) Updated last_run_month.txt to %s", current_month)
     except Exception as e:
-        print(f"(X) Failed to update last_run_month.txt: {e}")
+        logger.error("(X) Failed to update last_run_month.txt: %s", e)
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
@@ -115,7 +127,12 @@ class CrmOwner(Base):
     seen_property_ids = Column(JSON, nullable=True)
     states_counties = Column(JSON, nullable=True)
 
+def not_postgresql(ddl, target, bind, compiler=None, **kw):
+    return (compiler or bind).dialect.name != "postgresql"
+
 class SeenProperties(Base):
+    # On Postgres the table is partitioned by month of created_at with primary
+    # key (id, created_at); see backend/partitions.py.
     __tablename__ = "seen_properties"
     id = Column(Integer, primary_key=True, index=True)
     crm_owner_id = Column(Integer, nullable=False)
@@ -133,7 +150,44 @@ class SeenProperties(Base):
     contract_date = Column(DateTime)
     match_percentage = Column(Integer)  # New column for match percentage
     match_field = Column(String)       # New column for match field (Owner/Seller)
-    created_at = Column(DateTime, server_default=func.now())
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+
+# Indexes for the dashboard's access paths: every query filters on crm_owner_id,
+# lists sort by contract_date DESC NULLS LAST, created_at DESC, and stats filter
+# on created_at windows. Must match backend/main.py; existing databases get
+# them from backend/migrations.
+Index(
+    "ix_seen_properties_owner_contract_created_id",
+    SeenProperties.crm_owner_id,
+    SeenProperties.contract_date.desc().nulls_last(),
+    SeenProperties.created_at.desc(),
+    SeenProperties.id.desc(),
+).ddl_if(dialect="postgresql")
+Index("ix_seen_properties_owner_created", SeenProperties.crm_owner_id, SeenProperties.created_at.desc())
+# Unique on SQLite only: the partitioned Postgres table has the non-unique
+# ix_seen_properties_owner_property, so save_property_to_seen_properties checks
+# for an existing match itself.
+Index("uq_seen_properties_owner_property", SeenProperties.crm_owner_id, SeenProperties.property_id,
+      unique=True).ddl_if(callable_=not_postgresql)
+Index("ix_seen_properties_owner_property", SeenProperties.crm_owner_id,
+      SeenProperties.property_id).ddl_if(dialect="postgresql")
+Index("ix_seen_properties_owner_id", SeenProperties.crm_owner_id, SeenProperties.id)
+# ix_seen_properties_search_trgm (pg_trgm, /seen_properties/search) is created
+# by backend/main.py and backend/migrations; it is an expression index over
+# owner_name, seller_name and street_address.
+
+class OwnerStats(Base):
+    """Per-owner rollup of seen_properties, read by the dashboard (see backend/main.py)."""
+    __tablename__ = "owner_stats"
+    crm_owner_id = Column(Integer, primary_key=True)
+    dimension = Column(String, primary_key=True)
+    key1 = Column(String, primary_key=True, default="")
+    key2 = Column(String, primary_key=True, default="")
+    count = Column(Integer, nullable=False, default=0)
+    with_contracts = Column(Integer, nullable=False, default=0)
+    with_contacts = Column(Integer, nullable=False, default=0)
+    created_epoch_sum = Column(BigInteger, nullable=False, default=0)
+    contract_epoch_sum = Column(BigInteger, nullable=False, default=0)
 
 # Create database session
 def get_db():
@@ -143,9 +197,10 @@ def get_db():
     finally:
         pass  # Don't close here, close manually when done
 
-DATA_DIR = "/worker"
+DATA_DIR = os.getenv("DATA_DIR", "/worker")
 file_path = os.path.join(DATA_DIR, "last_run_month.txt")
-DATATREE_BASE_URL = "https://dtapiuat.datatree.com"
+DATATREE_BASE_URL = os.getenv("DATATREE_BASE_URL", "https://dtapiuat.datatree.com")
+KVCORE_BASE_URL = os.getenv("KVCORE_BASE_URL", "https://api.kvcore.com")
 AUTH_ENDPOINT = "/api/Login/AuthenticateClient"
 FETCH_REPORT_ENDPOINT = "/api/Report/GetReport"
 FETCH_PropertySearch_ENDPOINT = "/api/Search/PropertySearch"
@@ -181,11 +236,11 @@ def load_crm_owners():
             }
             owners_list.append(owner_dict)
         
-        print(f"Loaded {len(owners_list)} CRM owners from database")
+        logger.info("Loaded %d CRM owners from database", len(owners_list))
         return owners_list
         
     except Exception as e:
-        print(f"Error loading CRM owners from database: {e}")
+        logger.error("Error loading CRM owners from database: %s", e)
         return []
     finally:
         db.close()
@@ -196,23 +251,75 @@ def save_seen_property_ids(crm_owner):
     """
     db = get_db()
     try:
-        # Find the CRM owner in the database
-        db_owner = db.query(CrmOwner).filter(CrmOwner.id == crm_owner["id"]).first()
-        
+        with metrics.stage("db_write", owner=crm_owner["id"]):
+            # Find the CRM owner in the database
+            db_owner = db.query(CrmOwner).filter(CrmOwner.id == crm_owner["id"]).first()
+
+            if db_owner:
+                # Convert set to list for JSON storage
+                db_owner.seen_property_ids = list(crm_owner['seen_property_ids'])
+                db.commit()
         if db_owner:
-            # Convert set to list for JSON storage
-            db_owner.seen_property_ids = list(crm_owner['seen_property_ids'])
-            db.commit()
-            print(f"Updated seen_property_ids for {crm_owner['Name']} in database")
+            logger.info("Updated seen_property_ids for %s in database", crm_owner['Name'], extra={"owner_id": crm_owner["id"]})
         else:
-            print(f"CRM owner {crm_owner['Name']} not found in database")
+            logger.warning("CRM owner %s not found in database", crm_owner['Name'], extra={"owner_id": crm_owner["id"]})
             
     except Exception as e:
-        print(f"Error updating seen_property_ids for {crm_owner['Name']}: {e}")
+        logger.error("Error updating seen_property_ids for %s: %s", crm_owner['Name'], e, extra={"owner_id": crm_owner["id"]})
         db.rollback()
     finally:
         db.close()
 
+OWNER_STATS_LOCK_NAMESPACE = 7353  # must match backend/main.py
+
+OWNER_STATS_UPSERT = text("""
+    INSERT INTO owner_stats (crm_owner_id, dimension, key1, key2, count, with_contracts, with_contacts,
+                             created_epoch_sum, contract_epoch_sum)
+    SELECT :crm_owner_id, :dimension, :key1, :key2, 1, :with_contracts, :with_contacts,
+           :created_epoch_sum, :contract_epoch_sum
+    WHERE EXISTS (SELECT 1 FROM owner_stats WHERE crm_owner_id = :crm_owner_id AND dimension = 'total')
+    ON CONFLICT (crm_owner_id, dimension, key1, key2) DO UPDATE SET
+        count = owner_stats.count + 1,
+        with_contracts = owner_stats.with_contracts + excluded.with_contracts,
+        with_contacts = owner_stats.with_contacts + excluded.with_contacts,
+        created_epoch_sum = owner_stats.created_epoch_sum + excluded.created_epoch_sum,
+        contract_epoch_sum = owner_stats.contract_epoch_sum + excluded.contract_epoch_sum
+""")
+
+def lock_owner_stats(db, crm_owner_id):
+    """Serialize with the backend's rollup rebuild for this owner until commit (Postgres only)."""
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("SELECT pg_advisory_xact_lock(:ns, :owner_id)"),
+                   {"ns": OWNER_STATS_LOCK_NAMESPACE, "owner_id": crm_owner_id})
+
+def record_owner_stats(db, seen_property):
+    """
+    Add a newly stored match to its owner's owner_stats rollup, in the caller's
+    transaction. Owners whose rollup has not been built yet are skipped; the
+    backend builds it from seen_properties on first read.
+    """
+    def epoch(value):
+        return calendar.timegm(value.timetuple()) if value else 0
+
+    base = {
+        "crm_owner_id": seen_property.crm_owner_id,
+        "with_contracts": 1 if seen_property.contract_date is not None else 0,
+        "with_contacts": 1 if seen_property.contact_email is not None else 0,
+        "created_epoch_sum": epoch(seen_property.created_at),
+        "contract_epoch_sum": epoch(seen_property.contract_date),
+    }
+    rows = [{**base, "dimension": "total", "key1": "", "key2": ""}]
+    if seen_property.state is not None:
+        rows.append({**base, "dimension": "state", "key1": seen_property.state, "key2": ""})
+    if seen_property.county is not None:
+        rows.append({**base, "dimension": "county", "key1": seen_property.county, "key2": seen_property.state or ""})
+    if seen_property.created_at is not None:
+        rows.append({**base, "dimension": "created_day", "key1": seen_property.created_at.strftime("%Y-%m-%d"), "key2": ""})
+    if seen_property.contract_date is not None:
+        rows.append({**base, "dimension": "contract_day", "key1": seen_property.contract_date.strftime("%Y-%m-%d"), "key2": ""})
+    for row in rows:
+        db.execute(OWNER_STATS_UPSERT, row)
+
 def save_property_to_seen_properties(crm_owner_id, property_data, contact_details):
     """
     Save a property match to the seen_properties table.
@@ -230,7 +337,7 @@ def save_property_to_seen_properties(crm_owner_id, property_data, contact_detail
                     else:
                         contract_date = datetime.strptime(contract_date_str, '%Y-%m-%d')
             except (ValueError, AttributeError) as e:
-                print(f"Error parsing contract date '{property_data.get('Contract Date')}': {e}")
+                logger.warning("Error parsing contract date '%s': %s", property_data.get('Contract Date'), e, extra={"owner_id": crm_owner_id})
                 contract_date = None
         
         # Extract match percentage (remove % sign if present)
@@ -255,12 +362,28 @@ def save_property_to_seen_properties(crm_owner_id, property_data, contact_detail
             created_at=datetime.now()
         )
         
-        db.add(seen_property)
-        db.commit()
-        print(f"Saved property {property_data.get('Property ID')} with match details to seen_properties table")
+        with metrics.stage("db_write", owner=crm_owner_id):
+            # The owner's advisory lock serializes this check with other contact
+            # threads storing matches for the same owner.
+            lock_owner_stats(db, crm_owner_id)
+            if db.query(SeenProperties.id).filter(
+                SeenProperties.crm_owner_id == crm_owner_id,
+                SeenProperties.property_id == seen_property.property_id
+            ).first() is not None:
+                logger.debug("Property %s already stored for this owner", seen_property.property_id, extra={"owner_id": crm_owner_id})
+                db.rollback()
+                return
+            db.add(seen_property)
+            record_owner_stats(db, seen_property)
+            db.commit()
+        logger.debug("Saved property %s with match details to seen_properties table", property_data.get('Property ID'), extra={"owner_id": crm_owner_id, "sample": True})
         
+    except IntegrityError:
+        # (crm_owner_id, property_id) is unique on SQLite: another contact thread already stored this match
+        logger.debug("Property %s already stored for this owner", property_data.get('Property ID'), extra={"owner_id": crm_owner_id})
+        db.rollback()
     except Exception as e:
-        print(f"Error saving property to seen_properties table: {e}")
+        logger.error("Error saving property to seen_properties table: %s", e, extra={"owner_id": crm_owner_id})
         db.rollback()
     finally:
         db.close()
@@ -285,14 +408,15 @@ def is_file_open(file_path):
 # Define the logo file path
 LOGO_PATH = "/app/data/logo.jpg"
 
-def send_email_with_attachment(crm_owner, file_path):
+def build_report_message(job, logo_bytes):
+    """Build the monthly report email for an outbox job (see email_delivery.ReportMailer)."""
     subject = "Your Monthly Matches from Real Estate Client Tracker"
     
     # Email body
     body = f"""\
     <html>
         <body>
-            <p>Hi {crm_owner['Name']},</p>
+            <p>Hi {job['owner_name']},</p>
             <p>Here are your monthly matches in your CRM/ Client Database.</p>
             <br>
             <p>Regards,</p>
@@ -304,69 +428,123 @@ def send_email_with_attachment(crm_owner, file_path):
 
     msg = EmailMessage()
     msg["From"] = SENDER_EMAIL
-    msg["To"] = crm_owner['email']
+    msg["To"] = job['to']
     msg["Subject"] = subject
     msg.set_content("This email contains an HTML version.", subtype="plain")
     msg.add_alternative(body, subtype="html")
 
-    # Attach the Excel file (not CSV)
+    # Attach the Excel file (not CSV); a missing file is a permanent failure for this job
+    file_path = job['file_path']
     file_name = os.path.basename(file_path)
-    try:
-        # Check if file exists before trying to attach
-        if not os.path.exists(file_path):
-            print(f"(X) File not found: {file_path}")
-            return False
-            
-        with open(file_path, "rb") as f:
-            # Use correct MIME type for Excel files
-            if file_path.endswith('.xlsx'):
-                msg.add_attachment(f.read(), maintype="application", subtype="vnd.openxmlformats-officedocument.spreadsheetml.sheet", filename=file_name)
-            else:
-                msg.add_attachment(f.read(), maintype="application", subtype="octet-stream", filename=file_name)
-
-        # Attach the logo
-        if os.path.exists(LOGO_PATH):
-            with open(LOGO_PATH, "rb") as f:
-                msg.add_attachment(f.read(), maintype="image", subtype="jpeg", filename="logo.jpg", cid="logo_cid")
+    with open(file_path, "rb") as f:
+        # Use correct MIME type for Excel files
+        if file_path.endswith('.xlsx'):
+            msg.add_attachment(f.read(), maintype="application", subtype="vnd.openxmlformats-officedocument.spreadsheetml.sheet", filename=file_name)
         else:
-            print(f"(!) Logo file not found: {LOGO_PATH}")
+            msg.add_attachment(f.read(), maintype="application", subtype="octet-stream", filename=file_name)
+
+    # Attach the logo
+    if logo_bytes:
+        msg.add_attachment(logo_bytes, maintype="image", subtype="jpeg", filename="logo.jpg", cid="logo_cid")
+
+    return msg
+
+# Outgoing report emails are queued on disk and sent by a pool of SMTP connections
+report_mailer = ReportMailer(
+    outbox_dir=os.getenv("OUTBOX_DIR", os.path.join(DATA_DIR, "outbox")),
+    build_message=build_report_message,
+    smtp_server=SMTP_SERVER,
+    smtp_port=SMTP_PORT,
+    username=SMTP_USERNAME,
+    password=SMTP_PASSWORD,
+    logo_path=LOGO_PATH,
+    pool_size=int(os.getenv("SMTP_POOL_SIZE", "2")),
+    max_attempts=int(os.getenv("EMAIL_MAX_ATTEMPTS", "5")),
+    retry_base_seconds=float(os.getenv("EMAIL_RETRY_BASE_SECONDS", "30")),
+)
 
-        # Send the email
-        context = ssl.create_default_context()
-        with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
-            server.starttls(context=context)
-            server.login(SMTP_USERNAME, SMTP_PASSWORD)
-            server.send_message(msg)
+# Column order of the monthly report (matches the row dicts built in fetch_report_from_datatree)
+REPORT_COLUMNS = [
+    "First Name", "Middle Name", "Last Name", "Email", "Name Variation", "State", "County",
+    "Property ID", "Owner Name", "Street Address", "Seller Name", "Contract Date",
+    "Match Percentage", "Match Quality", "Match Field", "Match Type",
+]
 
-        print(f"(✓) Email with attachment sent successfully to {crm_owner['email']}!")
-        return True
-    
-    except FileNotFoundError as e:
-        print(f"(X) File not found: {e}")
-        return False
-    except smtplib.SMTPAuthenticationError:
-        print("(X) SMTP Authentication Error: Check your email credentials.")
-        return False
-    except smtplib.SMTPException as e:
-        print(f"(X) SMTP Error: {e}")
-        return False
-    except Exception as e:
-        print(f"(X) Unexpected error sending email: {e}")
-        return False
+class StreamingReportWriter:
+    """
+    Collects an owner's report rows as they are produced and writes them to
+    Excel without holding the whole result set in memory.
+
+    Rows are spooled to temporary JSON-lines files, one per match percentage,
+    so the final "Match Percentage" ordering is a walk over at most 101
+    buckets rather than an in-memory sort. A bucket file is only open while
+    a batch is appended to it or while it is read back, so a writer holds at
+    most one file descriptor however many buckets it fills. The workbook is
+    written with openpyxl's write-only mode, which streams rows to disk.
+    """
+
+    def __init__(self):
+        self.row_count = 0
+        self._lock = threading.Lock()
+        self._spool_dir = tempfile.mkdtemp(prefix="rect-report-")
+        self._buckets = set()
+
+    def _bucket_path(self, percentage):
+        return os.path.join(self._spool_dir, f"{percentage}.jsonl")
 
-def save_to_excel(data_to_be_saved, crm_owner):
+    def add_rows(self, rows):
+        """Spool report rows. Safe to call from several contact threads."""
+        batches = {}
+        for row in rows:
+            try:
+                percentage = int(str(row.get("Match Percentage", "0")).replace('%', ''))
+            except ValueError:
+                percentage = 0
+            batches.setdefault(percentage, []).append(
+                json.dumps([row.get(column) for column in REPORT_COLUMNS], default=str) + "\n"
+            )
+        with self._lock:
+            for percentage, lines in batches.items():
+                with open(self._bucket_path(percentage), "a", encoding="utf-8") as bucket:
+                    bucket.writelines(lines)
+                self._buckets.add(percentage)
+                self.row_count += len(lines)
+
+    def write(self, file_path):
+        """Write the spooled rows to `file_path`, highest match percentage first."""
+        workbook = openpyxl.Workbook(write_only=True)
+        worksheet = workbook.create_sheet("Sheet1")
+        header = []
+        for column in REPORT_COLUMNS:
+            cell = WriteOnlyCell(worksheet, value=column)
+            cell.font = Font(bold=True)
+            header.append(cell)
+        worksheet.append(header)
+
+        with self._lock:
+            for percentage in sorted(self._buckets, reverse=True):
+                with open(self._bucket_path(percentage), encoding="utf-8") as bucket:
+                    for line in bucket:
+                        worksheet.append(json.loads(line))
+        workbook.save(file_path)
+
+    def close(self):
+        with self._lock:
+            self._buckets = set()
+        shutil.rmtree(self._spool_dir, ignore_errors=True)
+
+def save_to_excel(report_writer, crm_owner):
     """
     Save the collected data to an Excel file, handling file permission errors.
     Creates a folder with current month name and saves files there.
     """
     t = 1 
-    if not data_to_be_saved:
-        print(f"No data to save for {crm_owner['Name']}")
+    if not report_writer.row_count:
+        logger.info("No data to save for %s", crm_owner['Name'])
         return False
 
     try:
-        df = pd.DataFrame(data_to_be_saved)
-        print(f"Created DataFrame with {len(df)} rows for {crm_owner['Name']}")
+        logger.debug("Writing %d rows for %s", report_writer.row_count, crm_owner['Name'])
         
         # Create folder with current month name
         current_month_folder = datetime.now().strftime('%B_%Y')  # e.g., "August_2025"
@@ -374,7 +552,7 @@ def save_to_excel(data_to_be_saved, crm_owner):
         # Create full path to the folder
         full_folder_path = os.path.join(DATA_DIR, current_month_folder)
         os.makedirs(full_folder_path, exist_ok=True)  # Create folder if it doesn't exist
-        print(f"Created/Using folder: {full_folder_path}")
+        logger.debug("Created/Using folder: %s", full_folder_path)
         
         # Create file path within the month folder
         file_name = f"matches_of_{datetime.now().strftime('%b_%Y').lower()}_{crm_owner['Name']}.xlsx"
@@ -387,51 +565,47 @@ def save_to_excel(data_to_be_saved, crm_owner):
             file_name = f"matches_of_{datetime.now().strftime('%b_%Y').lower()}_{crm_owner['Name']}({t}).xlsx"
             file_path = os.path.join(full_folder_path, file_name)
 
-        print(f"Final file path: {file_path}")
+        logger.debug("Final file path: %s", file_path)
         
         retries = 0
         # Convert environment variable to integer with a default value
         max_retries = int(os.getenv("Excel_MAX_RETRIES", "5"))  # Default to 5 if not set
 
         while is_file_open(file_path) and retries < max_retries:
-            print(f"File '{file_path}' is in use. Retrying in 2 seconds...")
+            logger.warning("File '%s' is in use. Retrying in 2 seconds...", file_path)
             time.sleep(2)  # Wait for 2 seconds before retrying
             retries += 1
 
         if retries >= max_retries:
-            print(f"File '{file_path}' is still locked after {max_retries} attempts. Please close it.")
+            logger.error("File '%s' is still locked after %d attempts. Please close it.", file_path, max_retries)
             return False
 
         # Save the Excel file
         try:
             # Always create a new file to avoid complications
-            with pd.ExcelWriter(file_path, engine='openpyxl', mode='w') as writer:
-                df.to_excel(writer, index=False, header=True, sheet_name="Sheet1")
+            with metrics.stage("excel", owner=crm_owner['id']):
+                report_writer.write(file_path)
             
-            print(f"Excel file created successfully: {file_path}")
+            logger.info("Excel file created successfully: %s", file_path)
             
             # Verify the file was created and has content
             if os.path.exists(file_path) and os.path.getsize(file_path) > 0:
-                print(f"File verified - Size: {os.path.getsize(file_path)} bytes")
+                logger.debug("File verified - Size: %d bytes", os.path.getsize(file_path))
                 
-                # Send email with attachment
-                email_sent = send_email_with_attachment(crm_owner, file_path)
-                if email_sent:
-                    print(f"Data saved and emailed successfully for {crm_owner['Name']} in {file_path}")
-                    return True
-                else:
-                    print(f"File saved but email failed for {crm_owner['Name']}")
-                    return False
+                # Queue the email; delivery happens on the mailer's sender threads
+                report_mailer.enqueue(crm_owner, file_path)
+                logger.info("Data saved and email queued for %s in %s", crm_owner['Name'], file_path)
+                return True
             else:
-                print(f"File was not created or is empty: {file_path}")
+                logger.error("File was not created or is empty: %s", file_path)
                 return False
 
         except Exception as e:
-            print(f"Error creating Excel file for {crm_owner['Name']}: {e}")
+            logger.error("Error creating Excel file for %s: %s", crm_owner['Name'], e)
             return False
             
     except Exception as e:
-        print(f"Error in save_to_excel for {crm_owner['Name']}: {e}")
+        logger.error("Error in save_to_excel for %s: %s", crm_owner['Name'], e)
         return False
         
 def authenticate_datatree():
@@ -444,20 +618,20 @@ def authenticate_datatree():
         "ClientSecretKey": CLIENT_SECRET
     }
     headers = {"Content-Type": "application/json"}
-    print(" authenticating with DataTree")
+    logger.info("Authenticating with DataTree")
     try:
         response = requests.post(url, json=payload, headers=headers)
         response.raise_for_status()
-        print("Authentication successful.")
+        logger.info("Authentication successful.")
         return response.text.strip().strip('"')
     except requests.exceptions.RequestException as e:
-        print(f"Error authenticating with DataTree: {e}")
+        logger.error("Error authenticating with DataTree: %s", e)
         return None
 
 auth_token = authenticate_datatree()
 
 def fetch_all_contacts(KVCORE_TOKEN):
-    url = "https://api.kvcore.com/v2/public/contacts"
+    url = KVCORE_BASE_URL + "/v2/public/contacts"
     headers = {
         "accept": "application/json",
         "Content-Type": "application/json",
@@ -469,7 +643,7 @@ def fetch_all_contacts(KVCORE_TOKEN):
         response.raise_for_status()
         return response.json().get("data", [])
     except Exception as e:
-        print(f"Error fetching contacts: {e}")
+        logger.error("Error fetching contacts: %s", e)
         return []
 
 def fetch_property_details(property_id):
@@ -507,7 +681,7 @@ def fetch_property_details(property_id):
             seller_name = owner_transfer_info.get("SellerName", "N/A")
             sale_date = owner_transfer_info.get("SaleDate", None)  # Extract sale date
             
-            print(f"PropertyId {property_id} : {owner_names} : {street_address} : {seller_name} : {sale_date}")
+            logger.debug("PropertyId %s : %s : %s : %s : %s", property_id, owner_names, street_address, seller_name, sale_date, extra={"sample": True})
             
             if property_id == "N/A":
                 return None
@@ -522,268 +696,12 @@ def fetch_property_details(property_id):
                     "SaleDate": sale_date  # Include sale date in return
                 }
         else:
-            print(f"PropertyId {property_id}: No report found.")
+            logger.debug("PropertyId %s: No report found.", property_id, extra={"sample": True})
             return None
     except Exception as e:
-        print(f"Error fetching property details for PropertyId {property_id}: {e}")
+        logger.warning("Error fetching property details for PropertyId %s: %s", property_id, e)
         return None
 
-def generate_name_variations(first_name, middle_name, last_name):
-    """
-    Generate conservative name combinations for flexible search.
-    More restrictive to avoid false positives.
-    """
-    # Ensure inputs are strings and alphabetic
-    first_name = str(first_name).strip() if first_name else ""
-    middle_name = str(middle_name).strip() if middle_name else ""
-    last_name = str(last_name).strip() if last_name else ""
-
-    # Validate names - be more strict
-    if not (first_name.isalpha() and last_name.isalpha() and (middle_name.isalpha() or not middle_name)):
-        print(f"Invalid name: {last_name} {middle_name} {first_name}")
-        return []
-
-    # Exclude specific keywords and require minimum lengths
-    if (first_name.lower() in ["", ".", " ", "user", "new", "street", "avenue"] or 
-        last_name.lower() in ["", ".", " ", "user", "new", "street", "avenue"] or
-        len(first_name) < 2 or len(last_name) < 2):
-        print(f"Invalid or too short name: {last_name} {middle_name} {first_name}")
-        return []
-
-    variations = []
-    
-    # Only create conservative variations
-    if middle_name:
-        # Full name variations
-        variations.append(f"{first_name} {middle_name} {last_name}")
-        variations.append(f"{last_name} {first_name} {middle_name}")
-        variations.append(f"{last_name} {middle_name} {first_name}")
-        
-        # First and last name only (most common)
-        variations.append(f"{first_name} {last_name}")
-        variations.append(f"{last_name} {first_name}")
-        
-        # Only add middle initial if middle name is long enough
-        if len(middle_name) > 1:
-            variations.append(f"{first_name} {middle_name[0]} {last_name}")
-            variations.append(f"{last_name} {first_name} {middle_name[0]}")
-    else:
-        # Just first and last name variations
-        variations.append(f"{first_name} {last_name}")
-        variations.append(f"{last_name} {first_name}")
-    
-    print(f"Conservative name variations for searching: {variations}")
-    return variations
-
-def normalize_name_for_matching(name):
-    """
-    Normalize a name for matching by removing common prefixes, suffixes, and formatting.
-    """
-    if not name:
-        return ""
-    
-    # Convert to uppercase and remove extra spaces
-    name = str(name).upper().strip()
-    
-    # Remove common prefixes and suffixes
-    prefixes_to_remove = [
-        "MR ", "MRS ", "MS ", "DR ", "PROF ", "REV ", "FATHER ", "SISTER ",
-        "JUDGE ", "HON ", "HONORABLE ", "SIR ", "LADY ", "LORD ", "CAPTAIN ", "MAJOR "
-    ]
-    
-    suffixes_to_remove = [
-        " JR", " SR", " III", " IV", " V", " II", " 2ND", " 3RD", " 4TH",
-        " PHD", " MD", " ESQ", " DDS", " DVM", " RN", " CPA"
-    ]
-    
-    # Remove prefixes
-    for prefix in prefixes_to_remove:
-        if name.startswith(prefix):
-            name = name[len(prefix):].strip()
-            break
-    
-    # Remove suffixes
-    for suffix in suffixes_to_remove:
-        if name.endswith(suffix):
-            name = name[:-len(suffix)].strip()
-            break
-    
-    # Remove common business entity suffixes
-    business_suffixes = [
-        " LLC", " INC", " CORP", " CORPORATION", " LTD", " LIMITED",
-        " LP", " LLP", " PLLC", " CO", " COMPANY", " ENTERPRISES",
-        " MANAGEMENT", " SERVICES", " TRUST", " ESTATE", " PROPERTIES",
-        " INVESTMENTS", " GROUP", " HOLDINGS", " VENTURES"
-    ]
-    
-    for suffix in business_suffixes:
-        if name.endswith(suffix):
-            # If it's a business entity, return empty to indicate no personal match
-            return ""
-    
-    # Remove special characters and extra spaces
-    name = re.sub(r'[^\w\s]', ' ', name)
-    name = ' '.join(name.split())
-    
-    return name
-
-def calculate_name_match_percentage(contact_details, property_name, name_type="owner"):
-    """
-    Calculate matching percentage between contact name and property owner/seller name.
-    Returns a dictionary with match percentage and details.
-    """
-    if not property_name:
-        return {"percentage": 0, "match_type": "no_name", "details": "No property name provided"}
-    
-    # Normalize the property name
-    normalized_property_name = normalize_name_for_matching(property_name)
-    
-    # If it's a business entity (returns empty after normalization), skip
-    if not normalized_property_name:
-        return {"percentage": 0, "match_type": "business_entity", "details": f"Property name appears to be business entity: {property_name}"}
-    
-    # Extract contact name parts
-    first_name = contact_details.get('first_name', '').upper().strip()
-    middle_name = contact_details.get('middle_name', '').upper().strip()
-    last_name = contact_details.get('last_name', '').upper().strip()
-    
-    if not first_name or not last_name:
-        return {"percentage": 0, "match_type": "invalid_contact", "details": "Contact name incomplete"}
-    
-    # Create different name combinations to test
-    contact_variations = []
-    
-    # Full name combinations
-    if middle_name:
-        contact_variations.extend([
-            f"{first_name} {middle_name} {last_name}",
-            f"{first_name} {last_name} {middle_name}",
-            f"{last_name} {first_name} {middle_name}",
-            f"{last_name} {middle_name} {first_name}",
-            f"{first_name} {middle_name[0]} {last_name}",  # Middle initial
-        ])
-    
-    # First and last name combinations
-    contact_variations.extend([
-        f"{first_name} {last_name}",
-        f"{last_name} {first_name}",
-        f"{last_name}, {first_name}",  # Comma separated
-    ])
-    
-    # Individual name components
-    individual_components = [first_name, last_name]
-    if middle_name:
-        individual_components.append(middle_name)
-    
-    best_match = {"percentage": 0, "match_type": "no_match", "matched_variation": "", "details": ""}
-    
-    # 1. Check for exact matches (100%)
-    for variation in contact_variations:
-        if variation == normalized_property_name:
-            return {
-                "percentage": 100,
-                "match_type": "exact_match",
-                "matched_variation": variation,
-                "details": f"Exact match found: '{variation}' = '{normalized_property_name}'"
-            }
-    
-    # 2. Check for substring matches (high percentage)
-    for variation in contact_variations:
-        if variation in normalized_property_name:
-            # Calculate how much of the property name is covered by the contact name
-            coverage = len(variation) / len(normalized_property_name)
-            percentage = min(95, int(coverage * 100))  # Cap at 95% for substring matches
-            
-            if percentage > best_match["percentage"]:
-                best_match = {
-                    "percentage": percentage,
-                    "match_type": "substring_match",
-                    "matched_variation": variation,
-                    "details": f"Substring match: '{variation}' found in '{normalized_property_name}'"
-                }
-    
-    # 3. Use fuzzy matching for partial matches
-    for variation in contact_variations:
-        # Different fuzzy matching algorithms
-        ratio = fuzz.ratio(variation, normalized_property_name)
-        token_sort_ratio = fuzz.token_sort_ratio(variation, normalized_property_name)
-        token_set_ratio = fuzz.token_set_ratio(variation, normalized_property_name)
-        
-        # Take the highest score
-        fuzzy_score = max(ratio, token_sort_ratio, token_set_ratio)
-        
-        if fuzzy_score > best_match["percentage"]:
-            best_match = {
-                "percentage": fuzzy_score,
-                "match_type": "fuzzy_match",
-                "matched_variation": variation,
-                "details": f"Fuzzy match: '{variation}' vs '{normalized_property_name}' (ratio:{ratio}, token_sort:{token_sort_ratio}, token_set:{token_set_ratio})"
-            }
-    
-    # 4. Check individual name components (lower scores)
-    component_matches = []
-    for component in individual_components:
-        if len(component) > 2 and component in normalized_property_name:
-            component_matches.append(component)
-    
-    if component_matches and best_match["percentage"] < 60:
-        # Calculate percentage based on how many components match
-        component_percentage = int((len(component_matches) / len(individual_components)) * 60)
-        if component_percentage > best_match["percentage"]:
-            best_match = {
-                "percentage": component_percentage,
-                "match_type": "component_match",
-                "matched_variation": " + ".join(component_matches),
-                "details": f"Component matches: {component_matches} found in '{normalized_property_name}'"
-            }
-    
-    return best_match
-
-def get_overall_match_score(contact_details, property_details):
-    """
-    Get overall match score for a property by checking both owner and seller names.
-    Returns the best match between the two.
-    """
-    owner_names = property_details.get("OwnerNames", "")
-    seller_name = property_details.get("SellerName", "")
-    
-    # Calculate match for owner names
-    owner_match = calculate_name_match_percentage(contact_details, owner_names, "owner")
-    
-    # Calculate match for seller name
-    seller_match = calculate_name_match_percentage(contact_details, seller_name, "seller")
-
-    # Debug logging to see both scores
-    print(f"    Owner Match: {owner_match['percentage']}% - '{owner_names}'")
-    print(f"    Seller Match: {seller_match['percentage']}% - '{seller_name}'")
-
-    # Return the best match
-    if owner_match["percentage"] > seller_match["percentage"]:
-        owner_match["field_matched"] = "Owner"
-        print(f"    -> Using Owner match ({owner_match['percentage']}%)")
-        return owner_match
-    else:
-        seller_match["field_matched"] = "Seller"
-        print(f"    -> Using Seller match ({seller_match['percentage']}%)")
-        return seller_match
-
-def should_include_match(match_result, minimum_threshold=50):
-    """
-    Determine if a match should be included based on percentage and type.
-    """
-    percentage = match_result["percentage"]
-    match_type = match_result["match_type"]
-    
-    # Different thresholds for different match types
-    if match_type in ["exact_match", "substring_match"]:
-        return percentage >= 80
-    elif match_type == "fuzzy_match":
-        return percentage >= 70
-    elif match_type == "component_match":
-        return percentage >= minimum_threshold
-    else:
-        return False
-
 def fetch_report_from_datatree(state_fips, county_fips, crm_owner, contact_details):
     """
     Fetch property reports from DataTree API and calculate match percentages.
@@ -799,6 +717,11 @@ def fetch_report_from_datatree(state_fips, county_fips, crm_owner, contact_detai
     }
     six_months_ago = datetime.now() - timedelta(days=6*30.5)
     formatted_date = six_months_ago.strftime('%Y-%m-%d')
+    log = logger.bind(
+        owner_id=crm_owner['id'],
+        contact=f"{contact_details['first_name']} {contact_details['last_name']}",
+        county=county_fips,
+    )
 
     name_variations = generate_name_variations(
         contact_details['first_name'], 
@@ -808,11 +731,11 @@ def fetch_report_from_datatree(state_fips, county_fips, crm_owner, contact_detai
     
     # If no valid variations, skip this contact
     if not name_variations:
-        print(f"No valid name variations for {contact_details['first_name']} {contact_details['last_name']}")
+        log.debug("No valid name variations")
         return []
     
     for name_filter in name_variations:
-        print(f"Searching with name variation: '{name_filter}'")
+        log.debug("Searching with name variation: '%s'", name_filter, extra={"sample": True})
         
         # Search as Seller
         filters = [
@@ -837,14 +760,15 @@ def fetch_report_from_datatree(state_fips, county_fips, crm_owner, contact_detai
         }
         
         try:
-            response = requests.post(url, json=payload, headers=headers)
+            with metrics.stage("datatree_search", owner=crm_owner['id']):
+                response = requests.post(url, json=payload, headers=headers)
             if response.status_code == 400:
                 error_response = response.json()
                 if error_response.get("Message") == "No matching property found.":
-                    print(f"No properties found for SellerName filter '{name_filter}'.")
+                    log.debug("No properties found for SellerName filter '%s'.", name_filter, extra={"sample": True})
                     continue
                 else:
-                    print(f"400 Error for SellerName '{name_filter}': {error_response}")
+                    log.warning("400 Error for SellerName '%s': %s", name_filter, error_response)
                     continue
             
             response.raise_for_status()
@@ -854,7 +778,7 @@ def fetch_report_from_datatree(state_fips, county_fips, crm_owner, contact_detai
                 all_results.extend(data["LitePropertyList"])
                 
         except Exception as e:
-            print(f"Error fetching report for seller name filter '{name_filter}': {e}")
+            log.warning("Error fetching report for seller name filter '%s': %s", name_filter, e)
 
         # Search as Owner
         filters = [
@@ -870,14 +794,15 @@ def fetch_report_from_datatree(state_fips, county_fips, crm_owner, contact_detai
         payload["SearchRequest"]["Filters"] = filters
         
         try:
-            response = requests.post(url, json=payload, headers=headers)
+            with metrics.stage("datatree_search", owner=crm_owner['id']):
+                response = requests.post(url, json=payload, headers=headers)
             if response.status_code == 400:
                 error_response = response.json()
                 if error_response.get("Message") == "No matching property found.":
-                    print(f"No properties found for OwnerNames filter '{name_filter}'.")
+                    log.debug("No properties found for OwnerNames filter '%s'.", name_filter, extra={"sample": True})
                     continue
                 else:
-                    print(f"400 Error for OwnerNames '{name_filter}': {error_response}")
+                    log.warning("400 Error for OwnerNames '%s': %s", name_filter, error_response)
                     continue
             
             response.raise_for_status()
@@ -887,7 +812,7 @@ def fetch_report_from_datatree(state_fips, county_fips, crm_owner, contact_detai
                 all_results.extend(data["LitePropertyList"])
                 
         except Exception as e:
-            print(f"Error fetching report for owner name filter '{name_filter}': {e}")
+            log.warning("Error fetching report for owner name filter '%s': %s", name_filter, e)
 
     # Remove duplicates by PropertyId
     unique_results = []
@@ -898,31 +823,39 @@ def fetch_report_from_datatree(state_fips, county_fips, crm_owner, contact_detai
             seen_property_ids.add(property_id)
             unique_results.append(property_data)
 
-    print(f"Found {len(unique_results)} unique properties before matching analysis")
+    log.debug("Found %d unique properties before matching analysis", len(unique_results))
+    metrics.incr("properties_checked", len(unique_results), owner=crm_owner['id'])
     
     # Analyze each property match with percentage scoring
     validated_count = 0
     for property_data in unique_results:
         property_id = property_data.get("PropertyId")
         if property_id:
-            property_details = fetch_property_details(property_id)
+            with metrics.stage("datatree_detail", owner=crm_owner['id']):
+                property_details = fetch_property_details(property_id)
             if property_details:
                 # Calculate match percentage
-                match_result = get_overall_match_score(contact_details, property_details)
+                with metrics.stage("name_matching", owner=crm_owner['id']):
+                    match_result = get_overall_match_score(contact_details, property_details)
                 
                 # Log the match analysis
-                print(f"Property {property_id} - Match Analysis:")
-                print(f"  Contact: {contact_details['first_name']} {contact_details['last_name']}")
-                print(f"  Owner: {property_details.get('OwnerNames', 'N/A')}")
-                print(f"  Seller: {property_details.get('SellerName', 'N/A')}")
-                print(f"  Match Score: {match_result['percentage']}% ({match_result['match_type']})")
-                print(f"  Field Matched: {match_result.get('field_matched', 'Unknown')}")
-                print(f"  Details: {match_result['details']}")
+                log.debug(
+                    "Property %s - Match Analysis: Owner: %s | Seller: %s | Match Score: %s%% (%s) | Field Matched: %s | Details: %s",
+                    property_id,
+                    property_details.get('OwnerNames', 'N/A'),
+                    property_details.get('SellerName', 'N/A'),
+                    match_result['percentage'],
+                    match_result['match_type'],
+                    match_result.get('field_matched', 'Unknown'),
+                    match_result['details'],
+                    extra={"sample": True},
+                )
                 
                 # Decide whether to include this match
                 if should_include_match(match_result, minimum_threshold=60):  # You can adjust this threshold
                     crm_owner['seen_property_ids'].add(property_id)
                     validated_count += 1
+                    metrics.incr("matches", owner=crm_owner['id'])
                     
                     # Determine match quality label
                     percentage = match_result["percentage"]
@@ -960,11 +893,11 @@ def fetch_report_from_datatree(state_fips, county_fips, crm_owner, contact_detai
                     # Save to seen_properties table
                     save_property_to_seen_properties(crm_owner['id'], data_row, contact_details)
                     
-                    print(f"  ✓ INCLUDED - {match_quality}")
+                    log.debug("Property %s ✓ INCLUDED - %s", property_id, match_quality, extra={"sample": True})
                 else:
-                    print(f"  ✗ EXCLUDED - Score too low ({match_result['percentage']}%)")
+                    log.debug("Property %s ✗ EXCLUDED - Score too low (%s%%)", property_id, match_result['percentage'], extra={"sample": True})
     
-    print(f"Final Results: {validated_count} out of {len(unique_results)} properties included for {contact_details['first_name']} {contact_details['last_name']}")
+    log.debug("Final Results: %d out of %d properties included", validated_count, len(unique_results))
     
     # Sort by match percentage (highest first)
     data_collection.sort(key=lambda x: int(x["Match Percentage"].replace('%', '')), reverse=True)
@@ -981,7 +914,8 @@ def search_datatree_thread():
 
     def process_crm_owner_wrapper(CRM_owner):
         """Wrapper function to process CRM owners and store results."""
-        process_crm_owner(CRM_owner, result_queue)  # Your existing function
+        with metrics.stage("owner_total", owner=CRM_owner['id']):
+            process_crm_owner(CRM_owner, result_queue)  # Your existing function
 
     # Use ThreadPoolExecutor to manage threads
     with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_THREADS) as executor:
@@ -992,69 +926,69 @@ def search_datatree_thread():
             try:
                 future.result()  # Raise exceptions if any occur in threads
             except Exception as e:
-                print(f"(X) Error processing {CRM_owner['Name']}: {e}")
+                logger.error("(X) Error processing %s: %s", CRM_owner['Name'], e, extra={"owner_id": CRM_owner["id"]})
 
     # Collect results after all threads complete
     while not result_queue.empty():
-        CRM_owner_name, owner_results = result_queue.get()
+        CRM_owner_name, owner_result_count = result_queue.get()
         
 def process_crm_owner(CRM_owner, result_queue):
     """
     Fetch contacts and start searches, tracking seen properties per CRM owner.
     """
-    print(f"Processing CRM owner: {CRM_owner['Name']}")
+    log = logger.bind(owner_id=CRM_owner['id'])
+    log.info("Processing CRM owner: %s", CRM_owner['Name'])
     
-    contacts = fetch_all_contacts(CRM_owner['token'])
-    print(f"Fetched {len(contacts)} contacts for {CRM_owner['Name']}")
+    with metrics.stage("kvcore_contacts", owner=CRM_owner['id']):
+        contacts = fetch_all_contacts(CRM_owner['token'])
+    metrics.incr("contacts", len(contacts), owner=CRM_owner['id'])
+    log.info("Fetched %d contacts for %s", len(contacts), CRM_owner['Name'])
     
     if not contacts:
-        print(f"No contacts found for {CRM_owner['Name']}")
+        log.info("No contacts found for %s", CRM_owner['Name'])
         return
     
     MAX_THREADS=10
     contact_threads = []
-    contact_result_queue = queue.Queue()
+    report_writer = StreamingReportWriter()
     states_counties = CRM_owner.get("states_counties", [])
     
-    print(f"States/Counties for {CRM_owner['Name']}: {states_counties}")
+    log.debug("States/Counties for %s: %s", CRM_owner['Name'], states_counties)
     
-    def search_for_contact_wrapper(contact, contact_result_queue, CRM_owner, states_counties):
+    def search_for_contact_wrapper(contact, report_writer, CRM_owner, states_counties):
         """Wrapper function to process Contact and store results."""
-        search_for_contact(contact, contact_result_queue, CRM_owner, states_counties)
-
-    # Use ThreadPoolExecutor to manage threads
-    with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_THREADS) as executor:
-        future_to_contact = {executor.submit(search_for_contact_wrapper, contact, contact_result_queue, CRM_owner, states_counties): contact for contact in contacts}
+        search_for_contact(contact, report_writer, CRM_owner, states_counties)
 
-        for future in concurrent.futures.as_completed(future_to_contact):
-            contact = future_to_contact[future]
-            try:
-                future.result()  # Raise exceptions if any occur in threads
-            except Exception as e:
-                print(f"(X) Error processing contact {contact.get('name', 'Unknown')} for {CRM_owner['Name']}: {e}")
-
-    # Collect and save updated property IDs for this CRM owner
-    owner_results = []
-    while not contact_result_queue.empty():
-        owner_results.extend(contact_result_queue.get())
-
-    print(f"Collected {len(owner_results)} results for {CRM_owner['Name']}")
-    print(f"Sample results: {owner_results[:2] if owner_results else 'None'}")
-
-    # Save only this owner's updated `seen_property_ids`
-    save_seen_property_ids(CRM_owner)
-
-    if owner_results:
-        result_queue.put((CRM_owner['Name'], owner_results))
-        success = save_to_excel(owner_results, CRM_owner)
-        if success:
-            print(f"Successfully processed and saved data for {CRM_owner['Name']}")
+    try:
+        # Use ThreadPoolExecutor to manage threads
+        with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_THREADS) as executor:
+            future_to_contact = {executor.submit(search_for_contact_wrapper, contact, report_writer, CRM_owner, states_counties): contact for contact in contacts}
+
+            for future in concurrent.futures.as_completed(future_to_contact):
+                contact = future_to_contact[future]
+                try:
+                    future.result()  # Raise exceptions if any occur in threads
+                except Exception as e:
+                    log.error("(X) Error processing contact for %s: %s", CRM_owner['Name'], e, extra={"contact": contact.get('name', 'Unknown')})
+
+        log.info("Collected %d results for %s", report_writer.row_count, CRM_owner['Name'])
+
+        # Save only this owner's updated `seen_property_ids`
+        save_seen_property_ids(CRM_owner)
+
+        if report_writer.row_count:
+            result_queue.put((CRM_owner['Name'], report_writer.row_count))
+            success = save_to_excel(report_writer, CRM_owner)
+            if success:
+                log.info("Successfully processed and saved data for %s", CRM_owner['Name'])
+            else:
+                log.warning("Failed to save data for %s", CRM_owner['Name'])
         else:
-            print(f"Failed to save data for {CRM_owner['Name']}")
-    else:
-        print(f"No results to save for {CRM_owner['Name']}")
+            log.info("No results to save for %s", CRM_owner['Name'])
+    finally:
+        report_writer.close()
 
-def search_for_contact(contact, contact_result_queue, crm_owner, states_counties):
+def search_for_contact(contact, report_writer, crm_owner, states_counties):
     """
     Process a single contact while tracking seen properties and filtering by states_counties.
     Runs `perform_search_for_contact()` as a separate thread for each state/county.
@@ -1069,7 +1003,7 @@ def search_for_contact(contact, contact_result_queue, crm_owner, states_counties
 
     # If no states_counties, search without filters
     if not states_counties:
-        print(f"No state/county filter for {contact_details['first_name']} {contact_details['last_name']}. Searching all states/counties.")
+        logger.debug("No state/county filter. Searching all states/counties.", extra={"owner_id": crm_owner['id'], "contact": f"{contact_details['first_name']} {contact_details['last_name']}"})
         state_result_queue = queue.Queue()
         perform_search_for_contact(contact_details, None, None, crm_owner, state_result_queue)
 
@@ -1112,7 +1046,7 @@ def search_for_contact(contact, contact_result_queue, crm_owner, states_counties
         crm_owner['seen_property_ids'].add(prop["Property ID"])
 
     if new_properties:
-        contact_result_queue.put(new_properties)
+        report_writer.add_rows(new_properties)
 
 def perform_search_for_contact(contact_details, state_fips, county_fips, crm_owner, result_queue):
     """
@@ -1120,7 +1054,7 @@ def perform_search_for_contact(contact_details, state_fips, county_fips, crm_own
     Results are added to `result_queue` to allow multi-threaded execution.
     Now passing the entire CRM_owner to access `seen_property_ids`.
     """
-    print(f"Searching for {contact_details['first_name']} {contact_details['last_name']} in State FIPS: {state_fips}, County FIPS: {county_fips}")
+    logger.debug("Searching in State FIPS: %s, County FIPS: %s", state_fips, county_fips, extra={"owner_id": crm_owner['id'], "contact": f"{contact_details['first_name']} {contact_details['last_name']}", "county": county_fips})
 
     results = fetch_report_from_datatree(state_fips, county_fips, crm_owner, contact_details)  # Fetch data
 
@@ -1129,34 +1063,33 @@ def perform_search_for_contact(contact_details, state_fips, county_fips, crm_own
 
 
 if __name__ == "__main__":
-    print("="*50)
-    print(f"Script started at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print("="*50)
+    logger.info("Script started at %s", datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
     
+    # Start the mailer first so emails left over from an earlier run go out even if we skip this month
+    report_mailer.start()
+    drain_timeout = float(os.getenv("EMAIL_DRAIN_TIMEOUT", "900"))
+
     try:
         # Check if we should run this month
         if not should_run_this_month():
-            print("Exiting - not first weekday or already ran this month.")
+            logger.info("Exiting - not first weekday or already ran this month.")
+            report_mailer.drain(timeout=drain_timeout)
             exit(0)
             
-        print("Starting property search process...")
+        logger.info("Starting property search process...")
         
         # Execute the main search function
         search_datatree_thread()
+
+        # Wait for the queued report emails before exiting
+        report_mailer.drain(timeout=drain_timeout)
+        metrics.emit()
         
         # Update last run month only if successful
         update_last_run_month()
         
-        print("="*50)
-        print("Script completed successfully!")
-        print(f"Finished at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        print("="*50)
+        logger.info("Script completed successfully! Finished at %s", datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
         
     except Exception as e:
-        print("!"*50)
-        print(f"CRITICAL ERROR: {str(e)}")
-        print("!"*50)
-        print("Stack Trace:")
-        import traceback
-        traceback.print_exc()
+        logger.critical("CRITICAL ERROR: %s", e, exc_info=True)
         exit(1)  # Exit with error code
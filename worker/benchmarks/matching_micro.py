@@ -0,0 +1,167 @@
+"""
+Micro-benchmarks for the name-matching hot path.
+
+Times `generate_name_variations`, `normalize_name_for_matching`,
+`calculate_name_match_percentage` and `get_overall_match_score` over a
+realistic corpus (LLC/trust owners, multi-owner strings, prefixes and
+suffixes) and reports per-call latency and throughput as JSON.
+
+Compare against a stored baseline to catch regressions; the script exits
+with status 1 when any benchmark is slower than the baseline by more than
+--threshold, so it can gate CI.
+
+Examples:
+    python worker/benchmarks/matching_micro.py
+    python worker/benchmarks/matching_micro.py --save-baseline matching_baseline.json
+    python worker/benchmarks/matching_micro.py --baseline matching_baseline.json --threshold 0.25
+"""
+import argparse
+import contextlib
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from name_matching import (  # noqa: E402
+    generate_name_variations,
+    normalize_name_for_matching,
+    calculate_name_match_percentage,
+    get_overall_match_score,
+)
+
+FIRST_NAMES = ["JOHN", "MARY", "JOSE", "PATRICIA", "ROBERT", "JENNIFER", "MICHAEL", "LINDA", "WEI", "AISHA"]
+MIDDLE_NAMES = ["", "", "", "A", "LEE", "MARIE", "RAY", "ANN"]
+LAST_NAMES = ["SMITH", "JOHNSON", "GARCIA", "NGUYEN", "OCONNOR", "WILLIAMS", "BROWN", "LOPEZ", "KIM", "PATEL"]
+PREFIXES = ["", "", "", "DR ", "MR ", "MRS "]
+SUFFIXES = ["", "", "", " JR", " SR", " III", " II"]
+BUSINESS_OWNERS = [
+    "ACME HOLDINGS LLC", "PARKER FAMILY TRUST", "BLUE RIVER PROPERTIES", "SUNBELT INVESTMENTS",
+    "LONE STAR VENTURES", "FIRST BAPTIST CHURCH", "HOMEVEST CAPITAL INC", "ESTATE OF MARY BROWN",
+]
+
+
+def build_corpus(size, seed):
+    """Build (contact_details, property_details) pairs resembling real DataTree records."""
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        first, middle, last = rng.choice(FIRST_NAMES), rng.choice(MIDDLE_NAMES), rng.choice(LAST_NAMES)
+        contact = {"first_name": first.title(), "middle_name": middle.title(), "last_name": last.title()}
+
+        kind = rng.random()
+        if kind < 0.25:
+            # Matching owner in DataTree's LAST FIRST MIDDLE order, with prefixes/suffixes.
+            owner = f"{rng.choice(PREFIXES)}{last} {first} {middle}".strip() + rng.choice(SUFFIXES)
+        elif kind < 0.45:
+            # Multi-owner strings such as "SMITH JOHN & JANE".
+            owner = f"{last} {first} & {rng.choice(FIRST_NAMES)}"
+        elif kind < 0.65:
+            owner = rng.choice(BUSINESS_OWNERS)
+        elif kind < 0.80:
+            owner = f"{last}, {first}"
+        else:
+            owner = f"{rng.choice(LAST_NAMES)} {rng.choice(FIRST_NAMES)} {rng.choice(MIDDLE_NAMES)}".strip()
+
+        seller = rng.choice(BUSINESS_OWNERS + [f"{rng.choice(LAST_NAMES)} {rng.choice(FIRST_NAMES)}"])
+        corpus.append((contact, {"OwnerNames": owner, "SellerName": seller}))
+    return corpus
+
+
+def benchmarks(corpus):
+    contacts = [c for c, _ in corpus]
+    upper_contacts = [{k: v.upper() for k, v in c.items()} for c in contacts]
+    property_names = [p["OwnerNames"] for _, p in corpus]
+    return {
+        "generate_name_variations": (
+            contacts, lambda c: generate_name_variations(c["first_name"], c["middle_name"], c["last_name"]),
+        ),
+        "normalize_name_for_matching": (property_names, normalize_name_for_matching),
+        "calculate_name_match_percentage": (
+            list(zip(upper_contacts, property_names)), lambda item: calculate_name_match_percentage(item[0], item[1]),
+        ),
+        "get_overall_match_score": (corpus, lambda item: get_overall_match_score(item[0], item[1])),
+    }
+
+
+def time_benchmark(items, fn, min_time, repeats):
+    """Return the best per-call time in nanoseconds over `repeats` timed rounds."""
+    loops = 1
+    while True:
+        started = time.perf_counter_ns()
+        for _ in range(loops):
+            for item in items:
+                fn(item)
+        elapsed = time.perf_counter_ns() - started
+        if elapsed >= min_time * 1e9 or loops >= 1000:
+            break
+        loops *= 2
+
+    best = elapsed / (loops * len(items))
+    for _ in range(repeats - 1):
+        started = time.perf_counter_ns()
+        for _ in range(loops):
+            for item in items:
+                fn(item)
+        best = min(best, (time.perf_counter_ns() - started) / (loops * len(items)))
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for the name-matching hot path.")
+    parser.add_argument("--corpus-size", type=int, default=500, help="Number of contact/property pairs")
+    parser.add_argument("--seed", type=int, default=7, help="Seed for the corpus")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Minimum seconds per timed round")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed rounds per benchmark (best is kept)")
+    parser.add_argument("--baseline", default=None, help="Baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown vs baseline (0.2 = 20%%)")
+    parser.add_argument("--save-baseline", default=None, help="Write the results as a new baseline")
+    parser.add_argument("--only", default=None, help="Comma-separated benchmark names to run")
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.corpus_size, args.seed)
+    selected = set(args.only.split(",")) if args.only else None
+    results = {}
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for name, (items, fn) in benchmarks(corpus).items():
+            if selected and name not in selected:
+                continue
+            ns_per_call = time_benchmark(items, fn, args.min_time, args.repeats)
+            results[name] = {
+                "ns_per_call": round(ns_per_call, 1),
+                "calls_per_second": round(1e9 / ns_per_call, 1) if ns_per_call else 0,
+            }
+
+    report = {
+        "python": sys.version.split()[0],
+        "corpus_size": args.corpus_size,
+        "results": results,
+    }
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f).get("results", {})
+        for name, result in results.items():
+            if name not in baseline:
+                continue
+            ratio = result["ns_per_call"] / baseline[name]["ns_per_call"]
+            result["vs_baseline"] = round(ratio, 3)
+            if ratio > 1 + args.threshold:
+                regressions.append(f"{name}: {ratio:.2f}x slower than baseline")
+        report["regressions"] = regressions
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(report, f, indent=2)
+
+    print(json.dumps(report, indent=2))
+    if regressions:
+        print("Performance regressions detected:\n  " + "\n  ".join(regressions), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
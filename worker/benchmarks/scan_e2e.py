@@ -0,0 +1,336 @@
+"""
+End-to-end benchmark for the monthly scan.
+
+Runs `search_datatree_thread` against a local fake DataTree/KvCore server and a
+local database, sweeping owner count, contacts per owner, counties per owner and
+API latency. Every scenario runs in its own subprocess so module state and peak
+RSS are isolated. Results are printed (or written) as JSON.
+
+Examples:
+    python worker/benchmarks/scan_e2e.py
+    python worker/benchmarks/scan_e2e.py --owners 1,5 --contacts 20,100 --latency-ms 0,50
+    python worker/benchmarks/scan_e2e.py --db-url postgresql://localhost/rect_bench --output bench.json
+
+WARNING: the benchmark drops and recreates the worker tables in the target
+database. Only point --db-url at a disposable database.
+"""
+import argparse
+import contextlib
+import hashlib
+import itertools
+import json
+import os
+import random
+import resource
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+WORKER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FIRST_NAMES = [
+    "JOHN", "MARY", "JAMES", "PATRICIA", "ROBERT", "JENNIFER", "MICHAEL", "LINDA",
+    "WILLIAM", "ELIZABETH", "DAVID", "BARBARA", "RICHARD", "SUSAN", "JOSEPH", "JESSICA",
+]
+MIDDLE_NAMES = ["", "", "A", "LEE", "MARIE", "RAY", "ANN", "J"]
+LAST_NAMES = [
+    "SMITH", "JOHNSON", "WILLIAMS", "BROWN", "JONES", "GARCIA", "MILLER", "DAVIS",
+    "RODRIGUEZ", "MARTINEZ", "HERNANDEZ", "LOPEZ", "GONZALEZ", "WILSON", "ANDERSON", "THOMAS",
+]
+OTHER_OWNERS = [
+    "ACME HOLDINGS LLC", "PARKER FAMILY TRUST", "NGUYEN THANH", "OCONNOR PATRICK & SIOBHAN",
+    "BLUE RIVER PROPERTIES", "KIM SOO JIN", "WHITE ROBERT JR", "FIRST BAPTIST CHURCH",
+]
+
+
+class FakeApiState:
+    """Deterministic fake DataTree/KvCore backend shared by all handler threads."""
+
+    def __init__(self, contacts_per_owner, latency, properties_per_search, hit_rate, seed):
+        self.contacts_per_owner = contacts_per_owner
+        self.latency = latency
+        self.properties_per_search = properties_per_search
+        self.hit_rate = hit_rate
+        self.seed = seed
+        self.lock = threading.Lock()
+        self.counts = {"auth": 0, "contacts": 0, "search": 0, "detail": 0}
+        self.search_keys = {}
+        self.details = {}
+        self.next_property_id = 100000
+
+    def count(self, kind):
+        with self.lock:
+            self.counts[kind] += 1
+
+    def contacts_for(self, token):
+        rng = random.Random(f"{self.seed}:{token}")
+        contacts = []
+        for i in range(self.contacts_per_owner):
+            parts = [rng.choice(FIRST_NAMES), rng.choice(MIDDLE_NAMES), rng.choice(LAST_NAMES)]
+            name = " ".join(p for p in parts if p).title()
+            contacts.append({"id": i, "name": name, "email": f"contact{i}@{token}.example.com"})
+        return contacts
+
+    def search(self, filters):
+        values = {f["FilterName"]: f["FilterValues"][0] for f in filters}
+        name = values.get("SellerName") or values.get("OwnerNames") or ""
+        # Reordered variations of the same name resolve to the same properties,
+        # so the worker's PropertyId de-duplication is exercised.
+        key = (values.get("StateFips"), values.get("CountyFips"), " ".join(sorted(name.upper().split())))
+        digest = int(hashlib.md5(repr((self.seed,) + key).encode()).hexdigest(), 16)
+        if (digest % 1000) >= self.hit_rate * 1000:
+            return None
+
+        with self.lock:
+            if key not in self.search_keys:
+                ids = []
+                for i in range(self.properties_per_search):
+                    property_id = self.next_property_id
+                    self.next_property_id += 1
+                    rng = random.Random(f"{self.seed}:{property_id}")
+                    owner = name.upper() if i == 0 else rng.choice(OTHER_OWNERS)
+                    sale_date = (time.strftime("%Y-%m-%d", time.gmtime(time.time() - rng.randint(1, 150) * 86400)))
+                    self.details[property_id] = {
+                        "PropertyId": property_id,
+                        "SitusAddress": {
+                            "StreetAddress": f"{rng.randint(1, 9999)} MAIN ST",
+                            "County": f"COUNTY {key[1] or 0}",
+                            "State": "TX",
+                        },
+                        "OwnerNames": owner,
+                        "SellerName": rng.choice(OTHER_OWNERS),
+                        "SaleDate": sale_date,
+                    }
+                    ids.append(property_id)
+                self.search_keys[key] = ids
+            return [{"PropertyId": property_id} for property_id in self.search_keys[key]]
+
+    def detail(self, property_id):
+        with self.lock:
+            detail = self.details.get(property_id)
+        if not detail:
+            return None
+        return {
+            "SubjectProperty": {"PropertyId": detail["PropertyId"], "SitusAddress": detail["SitusAddress"]},
+            "OwnerInformation": {"OwnerNames": detail["OwnerNames"]},
+            "OwnerTransferInformation": {"SellerName": detail["SellerName"], "SaleDate": detail["SaleDate"]},
+        }
+
+
+class FakeApiServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # The worker opens a new connection per request from dozens of threads.
+    request_queue_size = 256
+
+
+def make_handler(state):
+    class FakeApiHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, status, body):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _read_json(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            return json.loads(self.rfile.read(length) or b"{}")
+
+        def do_GET(self):
+            if state.latency:
+                time.sleep(state.latency)
+            if self.path.startswith("/v2/public/contacts"):
+                state.count("contacts")
+                token = self.headers.get("authorization", "").replace("Bearer ", "")
+                self._send_json(200, {"data": state.contacts_for(token)})
+            else:
+                self._send_json(404, {"Message": "Not found"})
+
+        def do_POST(self):
+            if state.latency:
+                time.sleep(state.latency)
+            payload = self._read_json()
+            if self.path == "/api/Login/AuthenticateClient":
+                state.count("auth")
+                self._send_json(200, "fake-datatree-token")
+            elif self.path == "/api/Report/GetReport" and payload.get("SearchType") == "Filter":
+                state.count("search")
+                results = state.search(payload["SearchRequest"]["Filters"])
+                if results:
+                    self._send_json(200, {"LitePropertyList": results})
+                else:
+                    self._send_json(400, {"Message": "No matching property found."})
+            elif self.path == "/api/Report/GetReport":
+                state.count("detail")
+                report = state.detail(payload.get("PropertyId"))
+                self._send_json(200, {"Reports": [{"Data": report}] if report else []})
+            else:
+                self._send_json(404, {"Message": "Not found"})
+
+    return FakeApiHandler
+
+
+def run_scenario(scenario):
+    """Run one scenario in this process and return its metrics."""
+    state = FakeApiState(
+        contacts_per_owner=scenario["contacts"],
+        latency=scenario["latency_ms"] / 1000.0,
+        properties_per_search=scenario["properties_per_search"],
+        hit_rate=scenario["hit_rate"],
+        seed=scenario["seed"],
+    )
+    server = FakeApiServer(("127.0.0.1", 0), make_handler(state))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    os.environ["DATABASE_URL"] = scenario["db_url"]
+    os.environ["DATATREE_BASE_URL"] = base_url
+    os.environ["KVCORE_BASE_URL"] = base_url
+    os.environ["DATA_DIR"] = scenario["data_dir"]
+    os.environ.setdefault("DATATREE_CLIENT_ID", "bench")
+    os.environ.setdefault("DATATREE_CLIENT_SECRET", "bench")
+
+    quiet = open(os.devnull, "w") if not scenario["verbose"] else sys.stdout
+    sys.path.insert(0, WORKER_DIR)
+    with contextlib.redirect_stdout(quiet):
+        import KvCore_DT_scan_matches as scan
+
+        scan.Base.metadata.drop_all(bind=scan.engine)
+        scan.Base.metadata.create_all(bind=scan.engine)
+        db = scan.SessionLocal()
+        try:
+            for i in range(scenario["owners"]):
+                db.add(scan.CrmOwner(
+                    name=f"Bench Owner {i}",
+                    email=f"owner{i}@bench.example.com",
+                    token=f"bench-{i}",
+                    companycode="BENCH",
+                    password="not-a-real-hash",
+                    seen_property_ids=[],
+                    states_counties=[
+                        {"state_FIPS": 48, "county_FIPS": 1 + 2 * c}
+                        for c in range(scenario["counties"])
+                    ],
+                ))
+            db.commit()
+        finally:
+            db.close()
+        scan.CRM_owners = scan.load_crm_owners()
+
+        # Keep the benchmark off the real SMTP server.
+        scan.report_mailer.enqueue = lambda crm_owner, file_path: None
+        scan.metrics.enable()
+        scan.metrics.reset()
+
+        with state.lock:
+            for kind in state.counts:
+                state.counts[kind] = 0
+
+        started = time.perf_counter()
+        scan.search_datatree_thread()
+        wall_time = time.perf_counter() - started
+        stages = scan.metrics.summary()["run"]["stages"]
+
+        db = scan.SessionLocal()
+        try:
+            matches = db.query(scan.SeenProperties).count()
+        finally:
+            db.close()
+
+    server.shutdown()
+    total_contacts = scenario["owners"] * scenario["contacts"]
+    requests_issued = sum(state.counts.values())
+    return {
+        "scenario": {k: scenario[k] for k in ("owners", "contacts", "counties", "latency_ms")},
+        "wall_time_s": round(wall_time, 4),
+        "requests_issued": requests_issued,
+        "requests_by_kind": dict(state.counts),
+        "requests_per_contact": round(requests_issued / total_contacts, 2) if total_contacts else 0,
+        "db_write_time_s": round(stages.get("db_write", {}).get("seconds", 0.0), 4),
+        "db_write_calls": stages.get("db_write", {}).get("calls", 0),
+        "stages": stages,
+        "matches": matches,
+        "matches_per_second": round(matches / wall_time, 2) if wall_time > 0 else 0,
+        # ru_maxrss is reported in kilobytes on Linux.
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def parse_list(value, cast=int):
+    return [cast(v) for v in value.split(",") if v.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end benchmark for the monthly scan.")
+    parser.add_argument("--owners", default="1,3", help="Comma-separated owner counts to sweep")
+    parser.add_argument("--contacts", default="10,50", help="Comma-separated contacts per owner to sweep")
+    parser.add_argument("--counties", default="1,3", help="Comma-separated counties per owner to sweep")
+    parser.add_argument("--latency-ms", default="0,25", help="Comma-separated fake API latencies (ms) to sweep")
+    parser.add_argument("--properties-per-search", type=int, default=2, help="Properties returned by a successful search")
+    parser.add_argument("--hit-rate", type=float, default=0.3, help="Fraction of searches that return properties")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for the fake data")
+    parser.add_argument("--db-url", default=None, help="Disposable database URL (default: a temporary SQLite file)")
+    parser.add_argument("--output", default=None, help="Write the JSON report to this file instead of stdout")
+    parser.add_argument("--verbose", action="store_true", help="Keep the worker's own output")
+    parser.add_argument("--run-one", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_one:
+        print(json.dumps(run_scenario(json.loads(args.run_one))))
+        return
+
+    results = []
+    combos = itertools.product(
+        parse_list(args.owners), parse_list(args.contacts),
+        parse_list(args.counties), parse_list(args.latency_ms, float),
+    )
+    for owners, contacts, counties, latency_ms in combos:
+        with tempfile.TemporaryDirectory(prefix="rect-bench-") as tmp:
+            db_url = args.db_url
+            if not db_url:
+                db_path = os.path.join(tmp, "bench.db")
+                # WAL lets the worker's threads read while another one writes.
+                sqlite3.connect(db_path).execute("PRAGMA journal_mode=WAL").close()
+                db_url = f"sqlite:///{db_path}"
+            scenario = {
+                "owners": owners, "contacts": contacts, "counties": counties, "latency_ms": latency_ms,
+                "properties_per_search": args.properties_per_search, "hit_rate": args.hit_rate,
+                "seed": args.seed, "db_url": db_url, "data_dir": tmp, "verbose": args.verbose,
+            }
+            completed = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--run-one", json.dumps(scenario)],
+                capture_output=True, text=True,
+            )
+            lines = completed.stdout.strip().splitlines()
+            if args.verbose:
+                print("\n".join(lines[:-1]), file=sys.stderr)
+            if completed.returncode != 0 or not lines:
+                print(f"Scenario {scenario} failed:\n{completed.stderr}", file=sys.stderr)
+                sys.exit(completed.returncode or 1)
+            result = json.loads(lines[-1])
+            results.append(result)
+            print(f"owners={owners} contacts={contacts} counties={counties} latency={latency_ms}ms "
+                  f"-> {result.get('wall_time_s')}s, {result.get('matches')} matches", file=sys.stderr)
+
+    report = {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": sys.version.split()[0],
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
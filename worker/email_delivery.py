@@ -0,0 +1,310 @@
+"""
+Queued delivery of the monthly report emails.
+
+Scanning threads call `ReportMailer.enqueue(...)`, which writes a small JSON
+job file to the outbox directory and returns immediately. A pool of sender
+threads picks jobs up in due-time order, each keeping one authenticated SMTP
+connection open and reusing it for every message it sends. Failed sends are
+retried with exponential backoff; jobs that run out of attempts are moved to
+`outbox/failed/` for inspection. Because every job lives on disk until it is
+delivered, a crash or an SMTP outage only delays emails: pending jobs are
+picked up again the next time the worker starts.
+
+Configuration (environment):
+    SMTP_POOL_SIZE=2                 sender threads / SMTP connections
+    EMAIL_MAX_ATTEMPTS=5             attempts before a job is moved to failed/
+    EMAIL_RETRY_BASE_SECONDS=30      first retry delay, doubled on each attempt
+    EMAIL_DRAIN_TIMEOUT=900          seconds to wait for the outbox at the end of a run
+"""
+import heapq
+import json
+import os
+import smtplib
+import ssl
+import threading
+import time
+import uuid
+
+from scan_logging import get_logger
+from scan_metrics import metrics
+
+logger = get_logger("scan.email")
+
+# Errors that will not go away by retrying the same message.
+PERMANENT_ERRORS = (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, FileNotFoundError)
+
+
+class ReportMailer:
+    """Persistent outbox plus a pool of sender threads with reused SMTP connections."""
+
+    def __init__(self, outbox_dir, build_message, smtp_server, smtp_port, username, password,
+                 logo_path=None, pool_size=2, max_attempts=5, retry_base_seconds=30.0):
+        self.outbox_dir = outbox_dir
+        self.failed_dir = os.path.join(outbox_dir, "failed")
+        self.build_message = build_message
+        self.smtp_server = smtp_server
+        self.smtp_port = smtp_port
+        self.username = username
+        self.password = password
+        self.pool_size = max(1, int(pool_size))
+        self.max_attempts = max(1, int(max_attempts))
+        self.retry_base_seconds = float(retry_base_seconds)
+        self.logo_path = logo_path
+        self._logo_bytes = None
+        self._logo_loaded = False
+
+        # Jobs as (next_attempt_at, seq, job), a heap guarded by _cond. Senders sleep
+        # on _cond until the earliest job is due; _schedule and stop wake them.
+        self._heap = []
+        self._seq = 0
+        self._outstanding = 0
+        self._job_ids = set()
+        self._cond = threading.Condition()
+        self._threads = []
+        self._running = 0
+        self._stopping = False
+
+    # ------------------------------------------------------------------
+    # Outbox
+    # ------------------------------------------------------------------
+    def _job_path(self, job_id):
+        return os.path.join(self.outbox_dir, f"{job_id}.json")
+
+    def _persist(self, job):
+        path = self._job_path(job["id"])
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(job, f)
+        os.replace(tmp_path, path)
+
+    def _schedule(self, job):
+        with self._cond:
+            self._seq += 1
+            heapq.heappush(self._heap, (job["next_attempt_at"], self._seq, job))
+            self._cond.notify_all()
+
+    def enqueue(self, crm_owner, file_path):
+        """Queue the report at `file_path` for `crm_owner`. Returns the job id."""
+        os.makedirs(self.outbox_dir, exist_ok=True)
+        job = {
+            "id": uuid.uuid4().hex,
+            "owner_id": crm_owner["id"],
+            "owner_name": crm_owner["Name"],
+            "to": crm_owner["email"],
+            "file_path": file_path,
+            "attempts": 0,
+            "next_attempt_at": time.time(),
+            "created_at": time.time(),
+            "last_error": None,
+        }
+        self._persist(job)
+        with self._cond:
+            self._job_ids.add(job["id"])
+            self._outstanding += 1
+        self._schedule(job)
+        logger.info("Queued report email to %s", job["to"], extra={"owner_id": job["owner_id"]})
+        return job["id"]
+
+    def load_pending(self):
+        """Re-queue jobs left in the outbox by a previous run."""
+        os.makedirs(self.outbox_dir, exist_ok=True)
+        loaded = 0
+        for name in sorted(os.listdir(self.outbox_dir)):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.outbox_dir, name)) as f:
+                    job = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.error("(X) Unreadable outbox entry %s: %s", name, e)
+                continue
+            with self._cond:
+                # Skip jobs this process already queued through enqueue().
+                if job["id"] in self._job_ids:
+                    continue
+                self._job_ids.add(job["id"])
+                self._outstanding += 1
+            self._schedule(job)
+            loaded += 1
+        if loaded:
+            logger.info("Re-queued %d undelivered report email(s) from %s", loaded, self.outbox_dir)
+        return loaded
+
+    def _finish(self, job, delivered):
+        path = self._job_path(job["id"])
+        try:
+            if delivered:
+                os.remove(path)
+            else:
+                os.makedirs(self.failed_dir, exist_ok=True)
+                self._persist(job)
+                os.replace(path, os.path.join(self.failed_dir, os.path.basename(path)))
+        except OSError as e:
+            logger.error("(X) Could not update outbox entry %s: %s", path, e)
+        with self._cond:
+            self._job_ids.discard(job["id"])
+            self._outstanding -= 1
+            self._cond.notify_all()
+
+    # ------------------------------------------------------------------
+    # Sending
+    # ------------------------------------------------------------------
+    def logo_bytes(self):
+        """The logo image, read from disk once per process."""
+        if not self._logo_loaded:
+            self._logo_loaded = True
+            if self.logo_path and os.path.exists(self.logo_path):
+                with open(self.logo_path, "rb") as f:
+                    self._logo_bytes = f.read()
+            elif self.logo_path:
+                logger.warning("(!) Logo file not found: %s", self.logo_path)
+        return self._logo_bytes
+
+    def _connect(self):
+        server = smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=60)
+        server.starttls(context=ssl.create_default_context())
+        server.login(self.username, self.password)
+        return server
+
+    @staticmethod
+    def _close(server):
+        if server is None:
+            return
+        try:
+            server.quit()
+        except Exception:
+            try:
+                server.close()
+            except Exception:
+                pass
+
+    def _deliver(self, server, job):
+        """Send `job`, reconnecting once if the pooled connection went stale. Returns the connection."""
+        message = self.build_message(job, self.logo_bytes())
+        for reconnect in (False, True):
+            if server is None:
+                server = self._connect()
+            try:
+                server.send_message(message)
+                return server
+            except smtplib.SMTPServerDisconnected:
+                self._close(server)
+                server = None
+                if reconnect:
+                    raise
+        return server
+
+    def _next_job(self):
+        """Block until a job is due and take it, or return None once stopping."""
+        with self._cond:
+            while not self._stopping:
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                delay = self._heap[0][0] - time.time()
+                if delay <= 0:
+                    return heapq.heappop(self._heap)[2]
+                self._cond.wait(delay)
+            return None
+
+    def _sender(self):
+        server = None
+        try:
+            while True:
+                job = self._next_job()
+                if job is None:
+                    return
+
+                log = logger.bind(owner_id=job["owner_id"])
+                job["attempts"] += 1
+                try:
+                    with metrics.stage("smtp", owner=job["owner_id"]):
+                        server = self._deliver(server, job)
+                except PERMANENT_ERRORS as e:
+                    job["last_error"] = str(e)
+                    metrics.incr("emails_failed", owner=job["owner_id"])
+                    log.error("(X) Report email to %s rejected: %s", job["to"], e)
+                    self._finish(job, delivered=False)
+                    continue
+                except (smtplib.SMTPException, OSError) as e:
+                    self._close(server)
+                    server = None
+                    job["last_error"] = str(e)
+                    if job["attempts"] >= self.max_attempts:
+                        metrics.incr("emails_failed", owner=job["owner_id"])
+                        log.error("(X) Giving up on report email to %s after %d attempts: %s",
+                                  job["to"], job["attempts"], e)
+                        self._finish(job, delivered=False)
+                    else:
+                        backoff = self.retry_base_seconds * (2 ** (job["attempts"] - 1))
+                        job["next_attempt_at"] = time.time() + backoff
+                        self._persist(job)
+                        self._schedule(job)
+                        metrics.incr("email_retries", owner=job["owner_id"])
+                        log.warning("(!) Report email to %s failed (attempt %d/%d), retrying in %.0fs: %s",
+                                    job["to"], job["attempts"], self.max_attempts, backoff, e)
+                    continue
+                except Exception as e:
+                    # A bad job (message that cannot be built or encoded) will fail the same
+                    # way on every attempt: move it to failed/ rather than lose the sender.
+                    self._close(server)
+                    server = None
+                    job["last_error"] = f"{type(e).__name__}: {e}"
+                    metrics.incr("emails_failed", owner=job["owner_id"])
+                    log.exception("(X) Report email to %s could not be sent: %s", job["to"], e)
+                    self._finish(job, delivered=False)
+                    continue
+
+                metrics.incr("emails_sent", owner=job["owner_id"])
+                log.info("(✓) Email with attachment sent successfully to %s!", job["to"])
+                self._finish(job, delivered=True)
+        finally:
+            self._close(server)
+            with self._cond:
+                self._running -= 1
+                self._cond.notify_all()
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def start(self):
+        """Re-queue pending outbox entries and start the sender threads."""
+        if self._threads:
+            return
+        self.load_pending()
+        self.logo_bytes()
+        for i in range(self.pool_size):
+            thread = threading.Thread(target=self._sender, name=f"smtp-sender-{i}", daemon=True)
+            with self._cond:
+                self._running += 1
+            thread.start()
+            self._threads.append(thread)
+
+    def drain(self, timeout=None):
+        """
+        Wait until every queued email is delivered or given up on (or `timeout`
+        elapses), then stop the senders. Undelivered jobs stay in the outbox.
+        Returns the number of jobs still outstanding.
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        with self._cond:
+            # Woken by _finish for every job, and by each sender as it exits.
+            while self._outstanding and self._running:
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            outstanding = self._outstanding
+        self.stop()
+        if outstanding:
+            logger.warning("(!) %d report email(s) still queued in %s; they will be retried on the next run",
+                           outstanding, self.outbox_dir)
+        return outstanding
+
+    def stop(self):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=30)
+        self._threads = []
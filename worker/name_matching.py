@@ -0,0 +1,268 @@
+"""
+Name matching used by the monthly scan.
+
+Kept free of import-time side effects (no database or API calls) so the hot
+path can be benchmarked and reused on its own.
+"""
+import logging
+import re
+from fuzzywuzzy import fuzz
+
+logger = logging.getLogger("scan.matching")
+
+def generate_name_variations(first_name, middle_name, last_name):
+    """
+    Generate conservative name combinations for flexible search.
+    More restrictive to avoid false positives.
+    """
+    # Ensure inputs are strings and alphabetic
+    first_name = str(first_name).strip() if first_name else ""
+    middle_name = str(middle_name).strip() if middle_name else ""
+    last_name = str(last_name).strip() if last_name else ""
+
+    # Validate names - be more strict
+    if not (first_name.isalpha() and last_name.isalpha() and (middle_name.isalpha() or not middle_name)):
+        logger.debug("Invalid name: %s %s %s", last_name, middle_name, first_name)
+        return []
+
+    # Exclude specific keywords and require minimum lengths
+    if (first_name.lower() in ["", ".", " ", "user", "new", "street", "avenue"] or 
+        last_name.lower() in ["", ".", " ", "user", "new", "street", "avenue"] or
+        len(first_name) < 2 or len(last_name) < 2):
+        logger.debug("Invalid or too short name: %s %s %s", last_name, middle_name, first_name)
+        return []
+
+    variations = []
+    
+    # Only create conservative variations
+    if middle_name:
+        # Full name variations
+        variations.append(f"{first_name} {middle_name} {last_name}")
+        variations.append(f"{last_name} {first_name} {middle_name}")
+        variations.append(f"{last_name} {middle_name} {first_name}")
+        
+        # First and last name only (most common)
+        variations.append(f"{first_name} {last_name}")
+        variations.append(f"{last_name} {first_name}")
+        
+        # Only add middle initial if middle name is long enough
+        if len(middle_name) > 1:
+            variations.append(f"{first_name} {middle_name[0]} {last_name}")
+            variations.append(f"{last_name} {first_name} {middle_name[0]}")
+    else:
+        # Just first and last name variations
+        variations.append(f"{first_name} {last_name}")
+        variations.append(f"{last_name} {first_name}")
+    
+    logger.debug("Conservative name variations for searching: %s", variations, extra={"sample": True})
+    return variations
+
+def normalize_name_for_matching(name):
+    """
+    Normalize a name for matching by removing common prefixes, suffixes, and formatting.
+    """
+    if not name:
+        return ""
+    
+    # Convert to uppercase and remove extra spaces
+    name = str(name).upper().strip()
+    
+    # Remove common prefixes and suffixes
+    prefixes_to_remove = [
+        "MR ", "MRS ", "MS ", "DR ", "PROF ", "REV ", "FATHER ", "SISTER ",
+        "JUDGE ", "HON ", "HONORABLE ", "SIR ", "LADY ", "LORD ", "CAPTAIN ", "MAJOR "
+    ]
+    
+    suffixes_to_remove = [
+        " JR", " SR", " III", " IV", " V", " II", " 2ND", " 3RD", " 4TH",
+        " PHD", " MD", " ESQ", " DDS", " DVM", " RN", " CPA"
+    ]
+    
+    # Remove prefixes
+    for prefix in prefixes_to_remove:
+        if name.startswith(prefix):
+            name = name[len(prefix):].strip()
+            break
+    
+    # Remove suffixes
+    for suffix in suffixes_to_remove:
+        if name.endswith(suffix):
+            name = name[:-len(suffix)].strip()
+            break
+    
+    # Remove common business entity suffixes
+    business_suffixes = [
+        " LLC", " INC", " CORP", " CORPORATION", " LTD", " LIMITED",
+        " LP", " LLP", " PLLC", " CO", " COMPANY", " ENTERPRISES",
+        " MANAGEMENT", " SERVICES", " TRUST", " ESTATE", " PROPERTIES",
+        " INVESTMENTS", " GROUP", " HOLDINGS", " VENTURES"
+    ]
+    
+    for suffix in business_suffixes:
+        if name.endswith(suffix):
+            # If it's a business entity, return empty to indicate no personal match
+            return ""
+    
+    # Remove special characters and extra spaces
+    name = re.sub(r'[^\w\s]', ' ', name)
+    name = ' '.join(name.split())
+    
+    return name
+
+def calculate_name_match_percentage(contact_details, property_name, name_type="owner"):
+    """
+    Calculate matching percentage between contact name and property owner/seller name.
+    Returns a dictionary with match percentage and details.
+    """
+    if not property_name:
+        return {"percentage": 0, "match_type": "no_name", "details": "No property name provided"}
+    
+    # Normalize the property name
+    normalized_property_name = normalize_name_for_matching(property_name)
+    
+    # If it's a business entity (returns empty after normalization), skip
+    if not normalized_property_name:
+        return {"percentage": 0, "match_type": "business_entity", "details": f"Property name appears to be business entity: {property_name}"}
+    
+    # Extract contact name parts
+    first_name = contact_details.get('first_name', '').upper().strip()
+    middle_name = contact_details.get('middle_name', '').upper().strip()
+    last_name = contact_details.get('last_name', '').upper().strip()
+    
+    if not first_name or not last_name:
+        return {"percentage": 0, "match_type": "invalid_contact", "details": "Contact name incomplete"}
+    
+    # Create different name combinations to test
+    contact_variations = []
+    
+    # Full name combinations
+    if middle_name:
+        contact_variations.extend([
+            f"{first_name} {middle_name} {last_name}",
+            f"{first_name} {last_name} {middle_name}",
+            f"{last_name} {first_name} {middle_name}",
+            f"{last_name} {middle_name} {first_name}",
+            f"{first_name} {middle_name[0]} {last_name}",  # Middle initial
+        ])
+    
+    # First and last name combinations
+    contact_variations.extend([
+        f"{first_name} {last_name}",
+        f"{last_name} {first_name}",
+        f"{last_name}, {first_name}",  # Comma separated
+    ])
+    
+    # Individual name components
+    individual_components = [first_name, last_name]
+    if middle_name:
+        individual_components.append(middle_name)
+    
+    best_match = {"percentage": 0, "match_type": "no_match", "matched_variation": "", "details": ""}
+    
+    # 1. Check for exact matches (100%)
+    for variation in contact_variations:
+        if variation == normalized_property_name:
+            return {
+                "percentage": 100,
+                "match_type": "exact_match",
+                "matched_variation": variation,
+                "details": f"Exact match found: '{variation}' = '{normalized_property_name}'"
+            }
+    
+    # 2. Check for substring matches (high percentage)
+    for variation in contact_variations:
+        if variation in normalized_property_name:
+            # Calculate how much of the property name is covered by the contact name
+            coverage = len(variation) / len(normalized_property_name)
+            percentage = min(95, int(coverage * 100))  # Cap at 95% for substring matches
+            
+            if percentage > best_match["percentage"]:
+                best_match = {
+                    "percentage": percentage,
+                    "match_type": "substring_match",
+                    "matched_variation": variation,
+                    "details": f"Substring match: '{variation}' found in '{normalized_property_name}'"
+                }
+    
+    # 3. Use fuzzy matching for partial matches
+    for variation in contact_variations:
+        # Different fuzzy matching algorithms
+        ratio = fuzz.ratio(variation, normalized_property_name)
+        token_sort_ratio = fuzz.token_sort_ratio(variation, normalized_property_name)
+        token_set_ratio = fuzz.token_set_ratio(variation, normalized_property_name)
+        
+        # Take the highest score
+        fuzzy_score = max(ratio, token_sort_ratio, token_set_ratio)
+        
+        if fuzzy_score > best_match["percentage"]:
+            best_match = {
+                "percentage": fuzzy_score,
+                "match_type": "fuzzy_match",
+                "matched_variation": variation,
+                "details": f"Fuzzy match: '{variation}' vs '{normalized_property_name}' (ratio:{ratio}, token_sort:{token_sort_ratio}, token_set:{token_set_ratio})"
+            }
+    
+    # 4. Check individual name components (lower scores)
+    component_matches = []
+    for component in individual_components:
+        if len(component) > 2 and component in normalized_property_name:
+            component_matches.append(component)
+    
+    if component_matches and best_match["percentage"] < 60:
+        # Calculate percentage based on how many components match
+        component_percentage = int((len(component_matches) / len(individual_components)) * 60)
+        if component_percentage > best_match["percentage"]:
+            best_match = {
+                "percentage": component_percentage,
+                "match_type": "component_match",
+                "matched_variation": " + ".join(component_matches),
+                "details": f"Component matches: {component_matches} found in '{normalized_property_name}'"
+            }
+    
+    return best_match
+
+def get_overall_match_score(contact_details, property_details):
+    """
+    Get overall match score for a property by checking both owner and seller names.
+    Returns the best match between the two.
+    """
+    owner_names = property_details.get("OwnerNames", "")
+    seller_name = property_details.get("SellerName", "")
+    
+    # Calculate match for owner names
+    owner_match = calculate_name_match_percentage(contact_details, owner_names, "owner")
+    
+    # Calculate match for seller name
+    seller_match = calculate_name_match_percentage(contact_details, seller_name, "seller")
+
+    # Return the best match
+    if owner_match["percentage"] > seller_match["percentage"]:
+        best_match, field_matched = owner_match, "Owner"
+    else:
+        best_match, field_matched = seller_match, "Seller"
+    best_match["field_matched"] = field_matched
+
+    # Debug logging to see both scores
+    logger.debug(
+        "Owner Match: %s%% - '%s' | Seller Match: %s%% - '%s' -> Using %s match",
+        owner_match['percentage'], owner_names, seller_match['percentage'], seller_name, field_matched,
+        extra={"sample": True},
+    )
+    return best_match
+
+def should_include_match(match_result, minimum_threshold=50):
+    """
+    Determine if a match should be included based on percentage and type.
+    """
+    percentage = match_result["percentage"]
+    match_type = match_result["match_type"]
+    
+    # Different thresholds for different match types
+    if match_type in ["exact_match", "substring_match"]:
+        return percentage >= 80
+    elif match_type == "fuzzy_match":
+        return percentage >= 70
+    elif match_type == "component_match":
+        return percentage >= minimum_threshold
+    else:
+        return False
@@ -0,0 +1,121 @@
+"""
+Leveled, non-blocking logging for the scan worker.
+
+Worker threads log through a `QueueHandler`, so emitting a record is a queue
+put; a single `QueueListener` thread formats and writes everything to stdout.
+Per-property debug lines are tagged with `extra={"sample": True}` and can be
+thinned out with LOG_SAMPLE_RATE. Records carry structured fields (owner_id,
+contact, county) bound through `get_logger(...)` / `ContextAdapter.bind(...)`.
+
+Configuration (environment):
+    LOG_LEVEL=INFO          DEBUG shows per-contact and per-property lines
+    LOG_SAMPLE_RATE=1.0     fraction of sampled debug lines to keep
+    LOG_FORMAT=text         "json" for one JSON object per line
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import time
+
+STRUCTURED_FIELDS = ("owner_id", "contact", "county")
+
+_listener = None
+
+
+class ContextAdapter(logging.LoggerAdapter):
+    """LoggerAdapter that merges its bound fields with any per-call `extra`."""
+
+    def process(self, msg, kwargs):
+        if kwargs.get("extra"):
+            kwargs["extra"] = {**self.extra, **kwargs["extra"]}
+        else:
+            kwargs["extra"] = self.extra
+        return msg, kwargs
+
+    def bind(self, **fields):
+        return ContextAdapter(self.logger, {**self.extra, **fields})
+
+
+def get_logger(name="scan", **fields):
+    return ContextAdapter(logging.getLogger(name), fields)
+
+
+class SamplingFilter(logging.Filter):
+    """Keep only `rate` of the records logged with `extra={"sample": True}`."""
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        if self.rate >= 1.0 or not getattr(record, "sample", False) or record.levelno >= logging.WARNING:
+            return True
+        return random.random() < self.rate
+
+
+class StructuredFormatter(logging.Formatter):
+    """Plain-text or JSON lines with the structured fields appended."""
+
+    def __init__(self, json_output=False):
+        super().__init__("%(asctime)s %(levelname)s [%(threadName)s] %(message)s")
+        self.json_output = json_output
+
+    def format(self, record):
+        fields = {
+            name: getattr(record, name)
+            for name in STRUCTURED_FIELDS
+            if getattr(record, name, None) not in (None, "")
+        }
+        if self.json_output:
+            entry = {
+                "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+                "level": record.levelname,
+                "logger": record.name,
+                "thread": record.threadName,
+                "message": record.getMessage(),
+                **fields,
+            }
+            if record.exc_info:
+                entry["exc_info"] = self.formatException(record.exc_info)
+            return json.dumps(entry, default=str)
+
+        line = super().format(record)
+        if fields:
+            line += " " + " ".join(f"{name}={value}" for name, value in fields.items())
+        return line
+
+
+def setup_logging():
+    """Route all logging through a queue to a single stdout writer thread. Idempotent."""
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    level = os.getenv("LOG_LEVEL", "INFO").upper()
+    sample_rate = float(os.getenv("LOG_SAMPLE_RATE", "1.0"))
+    json_output = os.getenv("LOG_FORMAT", "text").lower() == "json"
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(StructuredFormatter(json_output=json_output))
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    # Filtering on the producer side means sampled-out records never hit the queue.
+    queue_handler.addFilter(SamplingFilter(sample_rate))
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(level)
+    # Third-party HTTP clients are chatty at DEBUG.
+    for noisy in ("urllib3", "requests", "cloudscraper"):
+        logging.getLogger(noisy).setLevel(max(root.level, logging.INFO))
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    _listener.start()
+    atexit.register(_listener.stop)
+    return _listener
@@ -0,0 +1,178 @@
+"""
+Per-stage timing and counters for the monthly scan.
+
+Stages are timed with `metrics.stage(name, owner=...)` context managers and
+events are counted with `metrics.incr(name, owner=...)`. Everything is
+aggregated per owner and per run, then emitted as JSON at the end of the run
+and optionally written in Prometheus text format (for node_exporter's
+textfile collector).
+
+Configuration (environment):
+    SCAN_METRICS=1                   enable collection (disabled by default)
+    SCAN_METRICS_JSON=/path.json     write the JSON summary here instead of stdout
+    SCAN_METRICS_PROMETHEUS=/path    also write a Prometheus text file
+
+When disabled, `stage()` returns a shared no-op context manager and `incr()`
+returns immediately, so instrumented hot paths pay only a method call.
+"""
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _StageTimer:
+    __slots__ = ("metrics", "name", "owner", "started")
+
+    def __init__(self, metrics, name, owner):
+        self.metrics = metrics
+        self.name = name
+        self.owner = owner
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.metrics.record(self.name, time.perf_counter() - self.started, owner=self.owner)
+        return False
+
+
+def _new_stage():
+    return {"calls": 0, "seconds": 0.0, "max_seconds": 0.0}
+
+
+class ScanMetrics:
+    """Thread-safe stage timers and counters aggregated per owner and per run."""
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._stages = defaultdict(_new_stage)
+            self._owner_stages = defaultdict(lambda: defaultdict(_new_stage))
+            self._counters = defaultdict(int)
+            self._owner_counters = defaultdict(lambda: defaultdict(int))
+            self._started = time.time()
+
+    def enable(self, enabled=True):
+        self.enabled = enabled
+
+    def stage(self, name, owner=None):
+        """Time the enclosed block as `name`, attributed to `owner` if given."""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _StageTimer(self, name, owner)
+
+    def record(self, name, seconds, owner=None):
+        if not self.enabled:
+            return
+        with self._lock:
+            targets = [self._stages[name]]
+            if owner is not None:
+                targets.append(self._owner_stages[str(owner)][name])
+            for stage in targets:
+                stage["calls"] += 1
+                stage["seconds"] += seconds
+                if seconds > stage["max_seconds"]:
+                    stage["max_seconds"] = seconds
+
+    def incr(self, name, value=1, owner=None):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] += value
+            if owner is not None:
+                self._owner_counters[str(owner)][name] += value
+
+    def summary(self):
+        def rounded(stages):
+            return {
+                name: {"calls": s["calls"], "seconds": round(s["seconds"], 6), "max_seconds": round(s["max_seconds"], 6)}
+                for name, s in sorted(stages.items())
+            }
+
+        with self._lock:
+            owners = sorted(set(self._owner_stages) | set(self._owner_counters))
+            return {
+                "started_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(self._started)),
+                "wall_time_s": round(time.time() - self._started, 3),
+                "run": {"stages": rounded(self._stages), "counters": dict(sorted(self._counters.items()))},
+                "owners": {
+                    owner: {
+                        "stages": rounded(self._owner_stages.get(owner, {})),
+                        "counters": dict(sorted(self._owner_counters.get(owner, {}).items())),
+                    }
+                    for owner in owners
+                },
+            }
+
+    def to_prometheus(self, prefix="rect_scan"):
+        """Render the per-owner aggregates in Prometheus text exposition format."""
+        summary = self.summary()
+
+        def label(value):
+            return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+        lines = [
+            f"# HELP {prefix}_duration_seconds Wall time of the last scan run.",
+            f"# TYPE {prefix}_duration_seconds gauge",
+            f"{prefix}_duration_seconds {summary['wall_time_s']}",
+        ]
+        families = [
+            ("stage_seconds_total", "counter", "Total time spent in each scan stage.", "seconds"),
+            ("stage_calls_total", "counter", "Number of times each scan stage ran.", "calls"),
+            ("stage_max_seconds", "gauge", "Slowest single run of each scan stage.", "max_seconds"),
+        ]
+        for suffix, kind, help_text, field in families:
+            lines.append(f"# HELP {prefix}_{suffix} {help_text}")
+            lines.append(f"# TYPE {prefix}_{suffix} {kind}")
+            for owner, data in summary["owners"].items():
+                for stage, values in data["stages"].items():
+                    lines.append(f'{prefix}_{suffix}{{owner="{label(owner)}",stage="{label(stage)}"}} {values[field]}')
+
+        lines.append(f"# HELP {prefix}_events_total Scan events by owner.")
+        lines.append(f"# TYPE {prefix}_events_total counter")
+        for owner, data in summary["owners"].items():
+            for name, value in data["counters"].items():
+                lines.append(f'{prefix}_events_total{{owner="{label(owner)}",event="{label(name)}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def emit(self):
+        """Write the JSON summary (and Prometheus file if configured) for this run."""
+        if not self.enabled:
+            return None
+        summary = self.summary()
+        json_path = os.getenv("SCAN_METRICS_JSON")
+        if json_path:
+            with open(json_path, "w") as f:
+                json.dump(summary, f, indent=2)
+        else:
+            print(json.dumps(summary))
+
+        prometheus_path = os.getenv("SCAN_METRICS_PROMETHEUS")
+        if prometheus_path:
+            # Write then rename so the textfile collector never reads a partial file.
+            tmp_path = prometheus_path + ".tmp"
+            with open(tmp_path, "w") as f:
+                f.write(self.to_prometheus())
+            os.replace(tmp_path, prometheus_path)
+        return summary
+
+
+metrics = ScanMetrics(enabled=os.getenv("SCAN_METRICS", "0").lower() in ("1", "true", "yes"))
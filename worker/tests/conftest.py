@@ -0,0 +1,9 @@
+"""
+Tests for the worker modules without import-time side effects.
+
+    cd worker && python -m pytest
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
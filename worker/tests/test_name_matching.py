@@ -0,0 +1,74 @@
+"""
+Results of the name-matching hot path that benchmarks/matching_micro.py times.
+An optimization of these functions must keep them unchanged.
+"""
+import pytest
+
+from name_matching import (
+    calculate_name_match_percentage,
+    generate_name_variations,
+    get_overall_match_score,
+    normalize_name_for_matching,
+    should_include_match,
+)
+
+CONTACT = {"first_name": "John", "middle_name": "Lee", "last_name": "Smith"}
+
+
+@pytest.mark.parametrize("name, normalized", [
+    ("Dr John L Smith Jr", "JOHN L SMITH"),
+    ("  mrs   mary   o'connor ", "MARY O CONNOR"),
+    ("SMITH FAMILY TRUST", ""),
+    ("ACME HOLDINGS", ""),
+    (None, ""),
+])
+def test_normalize_name_for_matching(name, normalized):
+    assert normalize_name_for_matching(name) == normalized
+
+
+def test_generate_name_variations():
+    assert generate_name_variations("John", "", "Smith") == ["John Smith", "Smith John"]
+    assert generate_name_variations("John", "Lee", "Smith") == [
+        "John Lee Smith", "Smith John Lee", "Smith Lee John", "John Smith", "Smith John",
+        "John L Smith", "Smith John L",
+    ]
+    assert generate_name_variations("J0hn", "", "Smith") == []
+    assert generate_name_variations("New", "", "Smith") == []
+
+
+@pytest.mark.parametrize("property_name, percentage, match_type", [
+    ("SMITH JOHN LEE", 100, "exact_match"),
+    ("DR JOHN L SMITH JR", 100, "exact_match"),
+    ("JOHN SMITH & MARY SMITH", 100, "fuzzy_match"),
+    ("JON SMYTH", 84, "fuzzy_match"),
+    ("MARY SMITH", 67, "fuzzy_match"),
+    ("SMITH FAMILY TRUST", 0, "business_entity"),
+    ("", 0, "no_name"),
+])
+def test_calculate_name_match_percentage(property_name, percentage, match_type):
+    result = calculate_name_match_percentage(CONTACT, property_name)
+    assert (result["percentage"], result["match_type"]) == (percentage, match_type)
+
+
+def test_incomplete_contact_never_matches():
+    result = calculate_name_match_percentage({"first_name": "John", "last_name": ""}, "JOHN SMITH")
+    assert result["match_type"] == "invalid_contact" and not should_include_match(result)
+
+
+def test_overall_score_takes_the_better_of_owner_and_seller():
+    result = get_overall_match_score(CONTACT, {"OwnerNames": "ACME LLC", "SellerName": "JOHN SMITH"})
+    assert (result["percentage"], result["field_matched"]) == (100, "Seller")
+    result = get_overall_match_score(CONTACT, {"OwnerNames": "JON SMYTH", "SellerName": "MARY SMITH"})
+    assert (result["percentage"], result["field_matched"]) == (84, "Owner")
+
+
+@pytest.mark.parametrize("match_type, percentage, included", [
+    ("exact_match", 100, True),
+    ("substring_match", 79, False),
+    ("fuzzy_match", 70, True),
+    ("fuzzy_match", 69, False),
+    ("component_match", 50, True),
+    ("business_entity", 0, False),
+])
+def test_should_include_match(match_type, percentage, included):
+    assert should_include_match({"percentage": percentage, "match_type": match_type}) is included